@@ -0,0 +1,188 @@
+# batch.py
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from extraction import ChatParser, read_log
+from lang_data import CHAT_GRAMMAR
+from translation import Translator
+
+logger = logging.getLogger(__name__)
+
+# Fichiers pris en compte quand un dossier est passé en argument
+LOG_EXTENSIONS = (".log", ".txt")
+# Nombre de traductions menées en parallèle (les limites de débit des moteurs s'appliquent toujours)
+DEFAULT_BATCH_WORKERS = 8
+# Horodatage en début de ligne du console.log (ex: "10/18 20:15:03")
+LOG_TIMESTAMP = re.compile(r"^\s*(\d{1,2}/\d{1,2} \d{1,2}:\d{2}:\d{2}(?:\.\d+)?)")
+# Nombre maximal de messages lus d'avance en attendant que le plus ancien soit traduit
+DEFAULT_LOOKAHEAD = 1000
+# Intervalle entre deux lignes de progression sur stderr
+PROGRESS_INTERVAL = 5.0
+
+
+class ChatRecord(NamedTuple):
+    """Message de chat trouvé dans un fichier de log."""
+    file: str
+    timestamp: Optional[str]
+    player: str
+    channel: str
+    message: str
+
+
+def iter_log_files(paths: Iterable[str]) -> Iterator[str]:
+    """Retourne les fichiers à traiter : les fichiers donnés, et les logs des dossiers donnés (récursivement)."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(LOG_EXTENSIONS):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def scan_chat(paths: Iterable[str], parser: ChatParser) -> Iterator[ChatRecord]:
+    """Parse en streaming les fichiers de log et retourne leurs messages de chat, dans l'ordre."""
+    for path in iter_log_files(paths):
+        try:
+            for line in read_log(path, chat_only=True, parser=parser):
+                chat = parser.parse(line)
+                if chat is not None:
+                    timestamp = LOG_TIMESTAMP.match(line)
+                    yield ChatRecord(path, timestamp.group(1) if timestamp else None, chat.player, chat.channel, chat.message)
+        except OSError as e:
+            logger.error("Log file could not be read: %s (%s)", path, e)
+
+
+def _write_record(output: IO[str], record: ChatRecord, result: Tuple[str, bool, Optional[str], bool, str], duplicate: bool) -> None:
+    """Écrit l'objet JSON d'un message traduit."""
+    text, was_translated, original_lang, from_cache, source = result
+    is_error = text.startswith("[ERROR]")
+    output.write(json.dumps({
+        "file": record.file,
+        "timestamp": record.timestamp,
+        "player": record.player,
+        "channel": record.channel,
+        "original": record.message,
+        "translation": None if is_error else text,
+        "translated": was_translated,
+        "language": original_lang,
+        "engine": source,
+        "cached": from_cache or duplicate,
+        "error": text if is_error else None,
+    }, ensure_ascii=False) + "\n")
+
+
+def translate_logs(paths: Iterable[str], translator: Translator, output: IO[str], parser: Optional[ChatParser] = None,
+                   workers: int = DEFAULT_BATCH_WORKERS, lookahead: int = DEFAULT_LOOKAHEAD) -> Dict[str, int]:
+    """
+    Traduit tous les messages de chat de fichiers de log existants et écrit un objet JSON par message.
+
+    Le parsing est fait en streaming ; chaque message distinct n'est traduit qu'une fois, dès sa première
+    apparition, par un pool de threads (les limites de débit et le cache du traducteur s'appliquent).
+    Les résultats sont écrits dans l'ordre des logs dès que la tête de la file est traduite : au plus
+    `lookahead` messages sont lus d'avance, la mémoire ne dépend donc pas de la taille des logs.
+
+    Args:
+        paths (Iterable[str]): Fichiers de log ou dossiers en contenant.
+        translator (Translator): Le traducteur à utiliser.
+        output (IO[str]): Flux de sortie JSONL.
+        parser (Optional[ChatParser]): Parser des lignes de chat (toutes les langues de client par défaut).
+        workers (int): Nombre de traductions menées en parallèle.
+        lookahead (int): Nombre maximal de messages lus en attente d'écriture.
+
+    Returns:
+        Dict[str, int]: Le nombre de messages, de messages distincts, de traductions et d'erreurs.
+    """
+    parser = parser or ChatParser()
+    translations: Dict[str, Future] = {}
+    written = set()
+    pending: Deque[ChatRecord] = deque()
+    stats = {"messages": 0, "unique": 0, "translated": 0, "errors": 0}
+    last_progress = time.monotonic()
+
+    def write_head() -> None:
+        """Écrit le plus ancien message en attente (en attendant sa traduction si besoin)."""
+        nonlocal last_progress
+        record = pending.popleft()
+        result = translations[record.message].result()
+        duplicate = record.message in written
+        if not duplicate:
+            written.add(record.message)
+            stats["translated"] += int(result[1])
+            stats["errors"] += int(result[0].startswith("[ERROR]"))
+        _write_record(output, record, result, duplicate)
+        if time.monotonic() - last_progress >= PROGRESS_INTERVAL:
+            last_progress = time.monotonic()
+            print(f"{stats['messages'] - len(pending)} message(s) written", file=sys.stderr)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch-translation") as executor:
+        for record in scan_chat(paths, parser):
+            stats["messages"] += 1
+            pending.append(record)
+            if record.message not in translations:
+                translations[record.message] = executor.submit(translator.translate_message, record.message)
+            while pending and (len(pending) > lookahead or translations[pending[0].message].done()):
+                write_head()
+        while pending:
+            write_head()
+    stats["unique"] = len(translations)
+    logger.info("%d chat message(s) found, %d unique", stats["messages"], stats["unique"])
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée en ligne de commande (sans interface graphique)."""
+    arg_parser = argparse.ArgumentParser(
+        description="Traduit le chat de fichiers console.log existants (sans interface) et écrit le résultat en JSONL."
+    )
+    arg_parser.add_argument("paths", nargs="+", help="fichiers de log ou dossiers en contenant")
+    arg_parser.add_argument("-o", "--output", help="fichier JSONL de sortie (sortie standard par défaut)")
+    arg_parser.add_argument("-c", "--config", help="fichier de configuration JSON de l'application (moteur, clés d'API...)")
+    arg_parser.add_argument("--translator", help="moteur de traduction (remplace celui de la configuration)")
+    arg_parser.add_argument("--target", help="langue cible (remplace celle de la configuration)")
+    arg_parser.add_argument("-w", "--workers", type=int, help=f"traductions en parallèle (défaut : {DEFAULT_BATCH_WORKERS})")
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=os.environ.get("CS_TRANSLATOR_LOG_LEVEL", "WARNING").upper(),
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    )
+    config: Dict = {}
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    if args.translator:
+        config["translator"] = args.translator
+    if args.target:
+        config["target_language"] = args.target
+
+    parser = ChatParser(config.get("chat_locales"), {**CHAT_GRAMMAR, **config.get("chat_grammar", {})})
+    translator = Translator(config)
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        stats = translate_logs(
+            args.paths, translator, output, parser,
+            workers=args.workers or config.get("batch_workers", DEFAULT_BATCH_WORKERS)
+        )
+    finally:
+        if args.output:
+            output.close()
+        translator.close()
+    print(f"{stats['messages']} message(s), {stats['unique']} unique, {stats['translated']} translated, "
+          f"{stats['errors']} error(s)", file=sys.stderr)
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# batching.py
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, List, Tuple, Union
+
+from engines import EngineError
+
+logger = logging.getLogger(__name__)
+
+# Fenêtre de regroupement et tailles maximales d'un lot par défaut
+DEFAULT_BATCH_WINDOW = 0.03
+DEFAULT_BATCH_MAX_ITEMS = 10
+DEFAULT_BATCH_MAX_CHARS = 1500
+# Nombre de lots envoyés en parallèle au maximum
+BATCH_SENDERS = 4
+# Délai laissé au dispatcher pour expédier les derniers lots à la fermeture
+CLOSE_TIMEOUT = 1.0
+
+BatchResult = List[Union[str, EngineError]]
+
+
+class MicroBatcher:
+    """
+    Regroupe les messages arrivés dans une courte fenêtre en une seule requête moteur.
+
+    Chaque appel à `submit` bloque jusqu'au résultat de son propre message : le découpage des
+    résultats du lot et les erreurs par message sont transparents pour l'appelant.
+    Un lot part dès que la fenêtre expire ou que la limite de messages/caractères est atteinte.
+    """
+
+    def __init__(self, send_batch: Callable[[List[str]], BatchResult], window: float = DEFAULT_BATCH_WINDOW,
+                 max_items: int = DEFAULT_BATCH_MAX_ITEMS, max_chars: int = DEFAULT_BATCH_MAX_CHARS) -> None:
+        """
+        Args:
+            send_batch (Callable[[List[str]], BatchResult]): Envoie un lot et retourne, pour chaque texte,
+                sa traduction ou une `EngineError`. Peut lever `EngineError` si tout le lot échoue.
+            window (float): Durée de regroupement après l'arrivée du premier message, en secondes.
+            max_items (int): Nombre maximal de messages par lot.
+            max_chars (int): Nombre maximal de caractères par lot.
+        """
+        self.send_batch = send_batch
+        self.window = window
+        self.max_items = max(1, max_items)
+        self.max_chars = max_chars
+        self._pending: Deque[Tuple[str, Future]] = deque()
+        self._pending_chars = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._senders = ThreadPoolExecutor(max_workers=BATCH_SENDERS, thread_name_prefix="batch-sender")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="batch-dispatcher", daemon=True)
+        self._dispatcher.start()
+        self.batches_sent = 0
+        self.items_sent = 0
+
+    def submit(self, text: str) -> str:
+        """
+        Ajoute un message au prochain lot et attend sa traduction.
+
+        Raises:
+            EngineError: Si la traduction de ce message (ou de tout son lot) a échoué.
+        """
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise EngineError("[ERROR] Translator is shutting down")
+            self._pending.append((text, future))
+            self._pending_chars += len(text)
+            self._condition.notify()
+        return future.result()
+
+    def _is_full(self) -> bool:
+        """Indique si le lot en attente a atteint une de ses limites (appelé sous verrou)."""
+        return len(self._pending) >= self.max_items or self._pending_chars >= self.max_chars
+
+    def _dispatch_loop(self) -> None:
+        """Attend le premier message, laisse la fenêtre se remplir, puis expédie le lot."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._pending:
+                    return
+                deadline = time.monotonic() + self.window
+                while not self._is_full() and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._take_batch()
+            try:
+                self._senders.submit(self._send, batch)
+            except RuntimeError:
+                # Pool déjà arrêté par `close` : le lot ne partira plus
+                for _, future in batch:
+                    future.set_exception(EngineError("[ERROR] Translator is shutting down"))
+                return
+
+    def _take_batch(self) -> List[Tuple[str, Future]]:
+        """Retire de la file le prochain lot, dans les limites de taille (appelé sous verrou)."""
+        batch, chars = [], 0
+        while self._pending and len(batch) < self.max_items:
+            text, future = self._pending[0]
+            if batch and chars + len(text) > self.max_chars:
+                break
+            batch.append(self._pending.popleft())
+            chars += len(text)
+        self._pending_chars -= chars
+        return batch
+
+    def _send(self, batch: List[Tuple[str, Future]]) -> None:
+        """Envoie un lot et distribue les résultats (ou les erreurs) à chaque message."""
+        texts = [text for text, _ in batch]
+        try:
+            results = self.send_batch(texts)
+            if len(results) != len(batch):
+                raise EngineError(f"[ERROR] Batch returned {len(results)} results for {len(batch)} messages")
+        except Exception as e:
+            error = e if isinstance(e, EngineError) else EngineError(f"[ERROR] Batch failed: {e}")
+            results = [error] * len(batch)
+
+        self.batches_sent += 1
+        self.items_sent += len(batch)
+        logger.debug("Batch of %d message(s) sent", len(batch))
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def close(self) -> None:
+        """
+        Expédie les messages en attente puis arrête le dispatcher. Les messages qui n'ont pas pu
+        partir à temps reçoivent une erreur : aucun appelant ne reste bloqué dans `submit`.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._dispatcher.join(timeout=CLOSE_TIMEOUT)
+        with self._condition:
+            abandoned = list(self._pending)
+            self._pending.clear()
+            self._pending_chars = 0
+        for _, future in abandoned:
+            future.set_exception(EngineError("[ERROR] Translator is shutting down"))
+        self._senders.shutdown(wait=False)
@@ -0,0 +1,85 @@
+# benchmarks/bench_parser.py
+#
+# Micro-benchmark du parser de lignes de chat (lignes/seconde).
+#   python benchmarks/bench_parser.py [chemin/vers/console.log]
+# Sans argument, un log synthétique (spam console + chat) est généré.
+
+import os
+import random
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import DEFAULT_PARSER  # noqa: E402
+
+LEGACY_TAGS = ['[GÉNÉRAL]', '[T]', '[AT]', '[ALL]', '[CT]']
+REPEAT = 5
+
+
+def legacy_parse(line: str) -> Optional[Tuple[str, str]]:
+    """Ancienne implémentation (is_player_chat + extract_player_and_message), pour comparaison."""
+    if not (any(tag in line for tag in LEGACY_TAGS) and "\xa0" in line):
+        return None
+    chat_line = line.replace('\u200e', '')
+    try:
+        _, content_after_tag = chat_line.split(']', 1)
+        content_after_tag = content_after_tag.strip()
+        player_name_part, player_message = content_after_tag.split('\xa0: ', 1)
+        player_name = player_name_part.split('﹫')[0].replace('[MORT(E)]', '').replace('[DEAD]', '').strip()
+        return player_name, player_message.strip()
+    except (ValueError, IndexError):
+        return None
+
+
+def synthetic_log(count: int = 200_000, chat_ratio: float = 0.1) -> List[str]:
+    """Génère un log mêlant spam console et lignes de chat."""
+    rng = random.Random(42)
+    noise = [
+        "10/18 20:15:03  CL:  CCSGO_BlurTarget - Unable to find panel with the given id \"CSGOMainMenu\"!",
+        "10/18 20:15:03  [Client] CCSGameMovement::Debug: ent 1 pos=(1.0, 2.0, 3.0)",
+        "10/18 20:15:03  Shutdown prop cache",
+        "10/18 20:15:03  [SteamNetSockets] Ping measurement completed",
+    ]
+    chat = [
+        "10/18 20:15:03  [ALL] Bob\u200e﹫T Spawn\xa0: gg wp everyone",
+        "10/18 20:15:03  [GÉNÉRAL] [MORT(E)] Jean\u200e﹫Milieu\xa0: on rush B ?",
+        "10/18 20:15:03  [CT] Ivan [DEAD]\u200e﹫CT Spawn\xa0: привет как дела",
+    ]
+    return [rng.choice(chat) if rng.random() < chat_ratio else rng.choice(noise) for _ in range(count)]
+
+
+def bench(name: str, parse: Callable[[str], object], lines: List[str]) -> float:
+    """Mesure le meilleur débit sur plusieurs passes et l'affiche."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for line in lines:
+            parse(line)
+        best = min(best, time.perf_counter() - start)
+    rate = len(lines) / best
+    print(f"{name:<10} {rate:>14,.0f} lines/s")
+    return rate
+
+
+def _as_pair(chat) -> Optional[Tuple[str, str]]:
+    return (chat.player, chat.message) if chat else None
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8", errors="ignore") as f:
+            lines = [line.strip() for line in f]
+    else:
+        lines = synthetic_log()
+
+    mismatches = sum(1 for line in lines if legacy_parse(line) not in (None, _as_pair(DEFAULT_PARSER.parse(line))))
+    print(f"{len(lines)} lines, {sum(1 for line in lines if DEFAULT_PARSER.parse(line))} chat, {mismatches} mismatch(es)")
+    legacy = bench("legacy", legacy_parse, lines)
+    compiled = bench("compiled", DEFAULT_PARSER.parse, lines)
+    print(f"speedup    {compiled / legacy:>14.2f}x")
+
+
+if __name__ == "__main__":
+    main()
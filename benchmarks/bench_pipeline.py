@@ -0,0 +1,254 @@
+# benchmarks/bench_pipeline.py
+#
+# Benchmark de bout en bout du pipeline (lecture du log -> traduction -> queue de l'UI), avec des
+# moteurs simulés : aucun appel réseau, résultats reproductibles.
+#   python benchmarks/bench_pipeline.py [--engine DeepL] [--latency 0.2] [--error-rate 0.05] [--rate-limit 5] ...
+#   python benchmarks/bench_pipeline.py --json results.json                 # sauvegarde les résultats
+#   python benchmarks/bench_pipeline.py --baseline results.json             # échoue en cas de régression
+#
+# Étapes mesurées (débit, latences p50/p95/p99) :
+#   follow_log          écriture d'une ligne de chat dans le log -> ligne lue par follow_log
+#   pipeline            ligne lue -> résultat poussé vers la queue de l'UI (file, détection, traduction)
+#   end_to_end          écriture dans le log -> résultat dans la queue de l'UI
+#   process_log_line    appels successifs de process_log_line sur les lignes de chat
+#   translate_message   appels successifs de Translator.translate_message sur les messages
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from queue import Empty, Queue
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_engines import MockEnginePool  # noqa: E402
+from replay import CHAT_MESSAGES, build_arg_parser, replayer_from_args, synthetic_chat_line  # noqa: E402
+
+from engines import DEEPL_ENGINE, GEMINI_ENGINE, GOOGLE_ENGINE  # noqa: E402
+from extraction import DEFAULT_PARSER, follow_log, process_log_line  # noqa: E402
+from pipeline import DEFAULT_WORKERS, TranslationPipeline  # noqa: E402
+from translation import Translator  # noqa: E402
+
+# Délai laissé à follow_log pour ouvrir le log (et se placer à la fin) avant le début de l'écriture
+STARTUP_GRACE = 0.5
+# Métriques comparées à la référence : une hausse de latence ou une baisse de débit au-delà de la tolérance échoue
+COMPARED_LATENCIES = ("p95_ms", "p99_ms")
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentile (rang le plus proche) d'une liste triée."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(stage: str, latencies: Iterable[float], elapsed: float) -> Dict[str, float]:
+    """Résume une série de latences (en secondes) : nombre, débit et percentiles en millisecondes."""
+    values = sorted(latencies)
+    return {
+        "stage": stage,
+        "count": len(values),
+        "throughput": len(values) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+    }
+
+
+def make_translator(args: argparse.Namespace, workdir: str, name: str) -> Tuple[Translator, MockEnginePool]:
+    """Crée un traducteur branché sur des moteurs simulés, avec un cache et un suivi d'usage vierges."""
+    behavior = {
+        "latency": args.latency, "jitter": args.jitter, "slow_rate": args.slow_rate,
+        "slow_latency": args.slow_latency, "error_rate": args.error_rate, "rate_limit": args.rate_limit or None,
+    }
+    engines = MockEnginePool({"*": behavior}, dict(CHAT_MESSAGES), seed=args.seed)
+    config = {
+        "translator": args.engine,
+        "target_language": args.target,
+        "token_deepl": "mock",
+        "token_google_gemini": "mock",
+        "local_detection": not args.remote_detection,
+        "cache_path": os.path.join(workdir, f"{name}_cache.db"),
+        "usage_path": os.path.join(workdir, f"{name}_usage.json"),
+    }
+    if args.client_rate:
+        config["rate_limits"] = {
+            engine: {"rate": args.client_rate, "burst": int(args.client_rate * 2)}
+            for engine in (GOOGLE_ENGINE, DEEPL_ENGINE, GEMINI_ENGINE)
+        }
+    return Translator(config, engines), engines
+
+
+def bench_end_to_end(args: argparse.Namespace, workdir: str) -> Tuple[List[Dict[str, float]], Dict]:
+    """Rejoue du trafic dans un log suivi par follow_log et alimentant un `TranslationPipeline`."""
+    log_path = os.path.join(workdir, "console.log")
+    open(log_path, "wb").close()
+    translator, engines = make_translator(args, workdir, "end_to_end")
+    output_queue: Queue = Queue()
+    pipeline = TranslationPipeline(translator, output_queue, workers=args.workers, max_staleness=args.max_staleness or None)
+    stop = threading.Event()
+    read_times: List[float] = []
+    output_times: Dict[int, float] = {}
+
+    def read() -> None:
+        for line in follow_log(log_path, stop, chat_only=True):
+            chat = DEFAULT_PARSER.parse(line)
+            if chat is not None:
+                read_times.append(time.perf_counter())
+                pipeline.submit(chat.player, chat.message, chat.channel)
+
+    def collect() -> None:
+        while not stop.is_set():
+            try:
+                item = output_queue.get(timeout=0.1)
+            except Empty:
+                continue
+            if not item[-1]:  # Les traductions partielles (streaming) ne terminent pas un message
+                output_times[item[-2][1]] = time.perf_counter()
+
+    pipeline.start()
+    threads = [threading.Thread(target=read, daemon=True), threading.Thread(target=collect, daemon=True)]
+    for thread in threads:
+        thread.start()
+    time.sleep(STARTUP_GRACE)
+
+    replayer = replayer_from_args(log_path, args)
+    replayer.start()
+    replayer.join()
+    deadline = time.perf_counter() + args.drain_timeout
+    while len(output_times) < len(replayer.chat_times) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    stop.set()
+    pipeline.stop()
+    for thread in threads:
+        thread.join(1.0)
+
+    written = replayer.chat_times
+    if len(output_times) < len(written):
+        print(f"[WARNING] {len(written) - len(output_times)} message(s) still pending after {args.drain_timeout:.0f} s")
+    elapsed = (max(output_times.values()) - written[0]) if output_times and written else 0.0
+    read = list(zip(written, read_times))
+    done = [(written[seq], read_times[seq], end) for seq, end in output_times.items() if seq < len(read_times)]
+    stages = [
+        summarize("follow_log", (r - w for w, r in read), elapsed),
+        summarize("pipeline", (end - r for _, r, end in done), elapsed),
+        summarize("end_to_end", (end - w for w, _, end in done), elapsed),
+    ]
+    details = {
+        "lines_written": replayer.lines_written,
+        "stale": pipeline.stats()["stale"],
+        "cache": translator.cache_stats(),
+        "routing": {key: value for key, value in translator.routing_stats().items() if key != "engines"},
+        "engines": engines.stats(),
+    }
+    translator.close()
+    return stages, details
+
+
+def bench_calls(stage: str, call: Callable[[str], object], items: List[str]) -> Dict[str, float]:
+    """Mesure des appels successifs (un seul appelant, comme l'ancienne boucle de lecture)."""
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        call_start = time.perf_counter()
+        call(item)
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(stage, latencies, time.perf_counter() - start)
+
+
+def bench_sequential(args: argparse.Namespace, workdir: str) -> List[Dict[str, float]]:
+    """Mesure process_log_line et translate_message sur les mêmes messages synthétiques, cache vierge."""
+    rng = random.Random(args.seed)
+    chat = [synthetic_chat_line(rng) for _ in range(args.messages)]
+    stages = []
+    translator, _ = make_translator(args, workdir, "process_log_line")
+    stages.append(bench_calls("process_log_line", lambda line: process_log_line(line, translator), [line for line, _ in chat]))
+    translator.close()
+    translator, _ = make_translator(args, workdir, "translate_message")
+    stages.append(bench_calls("translate_message", translator.translate_message, [message for _, message in chat]))
+    translator.close()
+    return stages
+
+
+def compare(stages: List[Dict[str, float]], baseline_path: str, tolerance: float) -> List[str]:
+    """Compare les résultats à une référence sauvegardée ; retourne les régressions constatées."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {stage["stage"]: stage for stage in json.load(f)["stages"]}
+    regressions = []
+    for stage in stages:
+        reference = baseline.get(stage["stage"])
+        if reference is None:
+            continue
+        for key in COMPARED_LATENCIES:
+            if reference[key] > 0 and stage[key] > reference[key] * (1 + tolerance):
+                regressions.append(f"{stage['stage']} {key}: {reference[key]:.1f} -> {stage[key]:.1f}")
+        if stage["throughput"] < reference["throughput"] * (1 - tolerance):
+            regressions.append(f"{stage['stage']} throughput: {reference['throughput']:.1f} -> {stage['throughput']:.1f}/s")
+    return regressions
+
+
+def print_report(stages: List[Dict[str, float]]) -> None:
+    """Affiche le tableau des résultats."""
+    print(f"{'stage':<18} {'count':>7} {'msg/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage in stages:
+        print(f"{stage['stage']:<18} {stage['count']:>7} {stage['throughput']:>10.1f} "
+              f"{stage['p50_ms']:>9.1f} {stage['p95_ms']:>9.1f} {stage['p99_ms']:>9.1f}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline de traduction avec moteurs simulés.",
+                                     parents=[build_arg_parser()])
+    engines = parser.add_argument_group("mock engines")
+    engines.add_argument("--engine", default=GOOGLE_ENGINE, choices=[GOOGLE_ENGINE, DEEPL_ENGINE, GEMINI_ENGINE])
+    engines.add_argument("--target", default="FR", help="langue cible")
+    engines.add_argument("--latency", type=float, default=0.15, help="latence médiane d'un appel (s)")
+    engines.add_argument("--jitter", type=float, default=0.05, help="écart-type de la latence (s)")
+    engines.add_argument("--slow-rate", type=float, default=0.02, help="part des appels lents")
+    engines.add_argument("--slow-latency", type=float, default=2.0, help="latence des appels lents (s)")
+    engines.add_argument("--error-rate", type=float, default=0.0, help="part des appels en erreur")
+    engines.add_argument("--rate-limit", type=float, default=0, help="requêtes/s acceptées avant les 429 (0 = illimité)")
+    engines.add_argument("--client-rate", type=float, default=0, help="limite de débit côté client (0 = valeurs par défaut)")
+    engines.add_argument("--remote-detection", action="store_true", help="désactive la détection locale")
+    run = parser.add_argument_group("run")
+    run.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    run.add_argument("--max-staleness", type=float, default=10.0, help="ancienneté maximale d'un message (0 = illimitée)")
+    run.add_argument("--messages", type=int, default=300, help="messages des benchmarks séquentiels")
+    run.add_argument("--drain-timeout", type=float, default=30.0, help="attente maximale des derniers messages (s)")
+    run.add_argument("--skip-sequential", action="store_true", help="ne mesure que le bout en bout")
+    run.add_argument("--json", help="fichier où sauvegarder les résultats")
+    run.add_argument("--baseline", help="résultats de référence (--json d'une exécution précédente)")
+    run.add_argument("--tolerance", type=float, default=0.2, help="écart toléré par rapport à la référence")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="cs-translator-bench-") as workdir:
+        stages, details = bench_end_to_end(args, workdir)
+        if not args.skip_sequential:
+            stages += bench_sequential(args, workdir)
+
+    print_report(stages)
+    print(f"lines written: {details['lines_written']}, stale: {details['stale']}, routing: {details['routing']}")
+    for name, counters in details["engines"].items():
+        print(f"  {name}: {counters}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "stages": stages, "details": details}, f, indent=2, ensure_ascii=False)
+    if args.baseline:
+        regressions = compare(stages, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"[REGRESSION] {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
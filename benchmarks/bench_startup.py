@@ -0,0 +1,78 @@
+# benchmarks/bench_startup.py
+#
+# Temps de démarrage de l'application, mesuré dans des processus Python neufs (médiane de plusieurs essais).
+#   python benchmarks/bench_startup.py [--runs 10] [--window] [--module main]
+#
+# Deux variantes sont comparées :
+#   lazy   import de l'application seule : les SDK des moteurs ne sont chargés qu'à l'usage (comportement actuel)
+#   eager  import préalable de tous les SDK, comme quand engines.py les importait au chargement (ancien comportement)
+# Avec --window, la mesure va jusqu'à l'affichage de la première fenêtre (il faut un écran).
+# Pour le détail module par module : python -X importtime main.py 2> importtime.log
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines import ENGINE_SDKS  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALL_SDKS = [module for modules in ENGINE_SDKS.values() for module in modules]
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+for name in {preload!r}:
+    __import__(name)
+import {module}
+{window}
+print(time.perf_counter() - start)
+"""
+WINDOW_SNIPPET = "app = {module}.App(); app.update()"
+
+
+def measure(module: str, preload: List[str], window: bool) -> Optional[float]:
+    """Lance un processus neuf et retourne son temps de démarrage en secondes (None si l'import échoue)."""
+    code = SNIPPET.format(preload=preload, module=module, window=WINDOW_SNIPPET.format(module=module) if window else "")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1], file=sys.stderr)
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def bench(name: str, module: str, preload: List[str], window: bool, runs: int) -> Optional[float]:
+    """Mesure une variante plusieurs fois et affiche la médiane."""
+    times = []
+    for _ in range(runs):
+        elapsed = measure(module, preload, window)
+        if elapsed is None:
+            print(f"{name:<6} unavailable")
+            return None
+        times.append(elapsed)
+    median = statistics.median(times)
+    print(f"{name:<6} {median * 1000:>9.1f} ms  (min {min(times) * 1000:.1f}, max {max(times) * 1000:.1f})")
+    return median
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Temps de démarrage, avec et sans chargement anticipé des SDK.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--module", default="main", help="module importé (ex: translation pour se passer de l'interface)")
+    parser.add_argument("--window", action="store_true", help="mesurer jusqu'à l'affichage de la fenêtre")
+    args = parser.parse_args()
+
+    target = "time to first window" if args.window else f"import {args.module}"
+    print(f"{target}, median of {args.runs} runs")
+    lazy = bench("lazy", args.module, [], args.window, args.runs)
+    eager = bench("eager", args.module, ALL_SDKS, args.window, args.runs)
+    if lazy and eager:
+        print(f"saved  {(eager - lazy) * 1000:>9.1f} ms  ({eager / lazy:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
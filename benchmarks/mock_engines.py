@@ -0,0 +1,181 @@
+# benchmarks/mock_engines.py
+#
+# Moteurs de traduction locaux pour les benchmarks : latence, taux d'erreur et limite de débit
+# (réponses 429) configurables, sans réseau ni clé d'API. Ils remplacent les clients réels via
+# l'`EnginePool` passé au `Translator` : `_translate_with_engine` (routeur, batching) et
+# `_detect_language_async` passent par eux exactement comme par les vrais SDK.
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines import DetectedTranslation, EngineError, EnginePool  # noqa: E402
+from lang_detect import LocalDetector, load_detector  # noqa: E402
+
+# Comportement par défaut d'un moteur simulé (latences en secondes, taux entre 0 et 1, débit en requêtes/s)
+DEFAULT_MOCK_BEHAVIOR = {
+    "latency": 0.15,         # Latence médiane d'un appel
+    "jitter": 0.05,          # Écart-type de la latence
+    "slow_rate": 0.02,       # Part des appels anormalement lents (queue de latence)
+    "slow_latency": 2.0,     # Latence de ces appels lents
+    "error_rate": 0.0,       # Part des appels en erreur
+    "rate_limit": None,      # Débit accepté par le service ; au-delà il répond 429 (None = illimité)
+    "quota_chars": None,     # Caractères acceptés avant l'erreur de quota (None = illimité)
+}
+
+
+class MockEngine:
+    """
+    Moteur simulé, compatible avec les moteurs de `engines.py` (Google, DeepL et Gemini à la fois).
+
+    La "traduction" préfixe le texte par la langue cible ; la détection utilise la langue connue du
+    message (messages synthétiques) ou, à défaut, le détecteur local.
+    """
+
+    def __init__(self, name: str, behavior: Optional[Dict] = None, languages: Optional[Dict[str, str]] = None,
+                 seed: int = 0) -> None:
+        """
+        Args:
+            name (str): Nom du moteur simulé.
+            behavior (Optional[Dict]): Surcharges de `DEFAULT_MOCK_BEHAVIOR`.
+            languages (Optional[Dict[str, str]]): Langue connue de certains messages (texte -> code).
+            seed (int): Graine du tirage des latences et des erreurs.
+        """
+        self.name = name
+        self.behavior = {**DEFAULT_MOCK_BEHAVIOR, **(behavior or {})}
+        self.languages = languages or {}
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+        self.chars = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # Fenêtre glissante d'une seconde des appels acceptés, pour simuler la limite de débit du service
+        self._recent: List[float] = []
+        self._detector: Optional[LocalDetector] = None
+        try:
+            self._detector = load_detector()
+        except (OSError, ValueError):
+            pass
+
+    def _admit(self, chars: int) -> float:
+        """
+        Décide du sort d'un appel : lève l'erreur simulée éventuelle, sinon retourne sa latence.
+
+        Raises:
+            EngineError: Refus pour excès de débit (429), quota épuisé ou erreur aléatoire.
+        """
+        behavior = self.behavior
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            if behavior["rate_limit"] is not None:
+                self._recent = [t for t in self._recent if now - t < 1.0]
+                if len(self._recent) >= behavior["rate_limit"]:
+                    self.throttled += 1
+                    raise EngineError(f"[ERROR] {self.name}: 429 Too Many Requests", rate_limited=True)
+                self._recent.append(now)
+            if behavior["quota_chars"] is not None and self.chars + chars > behavior["quota_chars"]:
+                self.errors += 1
+                raise EngineError(f"[ERROR] {self.name} quota may be exceeded", quota=True)
+            if self._rng.random() < behavior["error_rate"]:
+                self.errors += 1
+                raise EngineError(f"[ERROR] {self.name}: simulated failure")
+            self.chars += chars
+            if self._rng.random() < behavior["slow_rate"]:
+                return behavior["slow_latency"]
+            return max(0.0, self._rng.gauss(behavior["latency"], behavior["jitter"]))
+
+    def _language(self, text: str) -> str:
+        """Langue "détectée" d'un texte."""
+        lang_code = self.languages.get(text)
+        if lang_code is None and self._detector is not None:
+            lang_code = self._detector.detect(text)[0]
+        return lang_code or "en"
+
+    @staticmethod
+    def _translate_text(text: str, target_language: str) -> str:
+        """Traduction simulée, reconnaissable dans les résultats."""
+        return f"[{target_language.lower()}] {text}"
+
+    # --- Interface des moteurs réels ---
+
+    async def detect_async(self, text: str) -> Tuple[str, float]:
+        """Détecte la langue d'un texte (méthode asynchrone, comme googletrans)."""
+        await asyncio.sleep(self._admit(0))
+        return self._language(text), 0.99
+
+    def translate(self, text: str, target_language: str) -> str:
+        """Traduit un texte vers la langue cible."""
+        time.sleep(self._admit(len(text)))
+        return self._translate_text(text, target_language)
+
+    def translate_batch(self, texts: List[str], target_language: str) -> List[Union[str, EngineError]]:
+        """Traduit un lot de textes en un seul appel."""
+        time.sleep(self._admit(sum(len(text) for text in texts)))
+        return [self._translate_text(text, target_language) for text in texts]
+
+    def translate_stream(self, text: str, target_language: str, on_partial: Callable[[str], None]) -> str:
+        """Traduit un texte en streaming, mot par mot, la latence étant répartie entre les fragments."""
+        latency = self._admit(len(text))
+        words = self._translate_text(text, target_language).split(" ")
+        for i in range(1, len(words) + 1):
+            time.sleep(latency / len(words))
+            on_partial(" ".join(words[:i]))
+        return " ".join(words)
+
+    def detect_and_translate_batch(self, texts: List[str], target_language: str) -> List[Union[DetectedTranslation, EngineError]]:
+        """Détecte la langue et traduit un lot de textes en un seul appel (réponse structurée Gemini)."""
+        time.sleep(self._admit(sum(len(text) for text in texts)))
+        results = []
+        for text in texts:
+            lang_code = self._language(text)
+            already_in_target = lang_code == target_language.lower()
+            results.append((lang_code, already_in_target, text if already_in_target else self._translate_text(text, target_language)))
+        return results
+
+    def get_usage(self) -> Tuple[int, Optional[int]]:
+        """Retourne (caractères consommés, limite), comme l'API DeepL."""
+        return self.chars, self.behavior["quota_chars"]
+
+    def stats(self) -> Dict[str, int]:
+        """Retourne les compteurs d'appels du moteur simulé."""
+        return {"calls": self.calls, "errors": self.errors, "throttled": self.throttled, "chars": self.chars}
+
+
+class MockEnginePool(EnginePool):
+    """`EnginePool` dont tous les moteurs sont simulés ; à passer au `Translator` via son argument `engines`."""
+
+    def __init__(self, behaviors: Optional[Dict[str, Dict]] = None, languages: Optional[Dict[str, str]] = None,
+                 seed: int = 0) -> None:
+        """
+        Args:
+            behaviors (Optional[Dict[str, Dict]]): Comportement par moteur ; la clé "*" s'applique à tous.
+            languages (Optional[Dict[str, str]]): Langue connue de certains messages (texte -> code).
+            seed (int): Graine des tirages.
+        """
+        super().__init__()
+        self.behaviors = behaviors or {}
+        self.languages = languages or {}
+        self.seed = seed
+
+    def get(self, name: str, token: Optional[str] = None) -> MockEngine:
+        """Retourne le moteur simulé demandé (aucune clé d'API n'est nécessaire)."""
+        with self._lock:
+            engine = self._engines.get((name, None))
+            if engine is None:
+                behavior = {**self.behaviors.get("*", {}), **self.behaviors.get(name, {})}
+                engine = MockEngine(name, behavior, self.languages, seed=self.seed + len(self._engines))
+                self._engines[(name, None)] = engine
+            return engine
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Retourne les compteurs de chaque moteur simulé."""
+        with self._lock:
+            return {key[0]: engine.stats() for key, engine in self._engines.items()}
@@ -0,0 +1,215 @@
+# benchmarks/replay.py
+#
+# Rejoue du trafic console.log dans un fichier, à débit contrôlé, comme le ferait le jeu.
+#   python benchmarks/replay.py <fichier de sortie> [--source console.log] [--duration 60] [--chat-rate 2] ...
+# Sans --source, le trafic est synthétique : spam console continu, rafales de spam au chargement
+# des maps et rafales de chat. Pointer l'application sur le fichier de sortie permet aussi de la
+# tester sans lancer le jeu.
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import DEFAULT_PARSER  # noqa: E402
+
+# Durée d'un pas d'écriture (les lignes d'un même pas sont écrites et flushées ensemble)
+TICK = 0.01
+
+# Messages de chat synthétiques et leur langue : beaucoup de répétitions, comme en partie
+CHAT_MESSAGES: List[Tuple[str, str]] = [
+    ("gg", "en"), ("gg wp", "en"), ("ez", "en"), ("nice shot", "en"), ("rush B", "en"), ("eco round", "en"),
+    ("привет", "ru"), ("го б", "ru"), ("кто на б?", "ru"), ("давай быстрее", "ru"), ("спасибо", "ru"),
+    ("hadi gel", "tr"), ("kolay gelsin", "tr"), ("dobra robota", "pl"), ("graj na A", "pl"),
+    ("vamos por B", "es"), ("buena ronda", "es"), ("bora galera", "pt"), ("schöner Schuss", "de"),
+    ("on rush B ?", "fr"), ("bien joué", "fr"), ("дякую", "uk"), ("1", "en"), ("?", "en"),
+]
+# Poids des messages : les premiers de chaque langue reviennent beaucoup plus souvent
+CHAT_WEIGHTS = [1.0 / (1 + i % 6) for i in range(len(CHAT_MESSAGES))]
+PLAYERS = ["Bob", "Ivan", "Jean", "Mehmet", "Kasia", "Lucas", "Anna", "s1mple fan", "Zé"]
+LOCATIONS = ["T Spawn", "CT Spawn", "Milieu", "Site A", "Site B", "Tunnels"]
+CHAT_TAGS = [("[ALL]", ""), ("[GÉNÉRAL]", ""), ("[T]", ""), ("[CT]", ""), ("[ALL]", "[DEAD] "), ("[GÉNÉRAL]", "[MORT(E)] ")]
+NOISE_LINES = [
+    "CL:  CCSGO_BlurTarget - Unable to find panel with the given id \"CSGOMainMenu\"!",
+    "[Client] CCSGameMovement::Debug: ent 1 pos=(1.0, 2.0, 3.0)",
+    "[SteamNetSockets] Ping measurement completed",
+    "ChangeGameUIState: CSGO_GAME_UI_STATE_INGAME -> CSGO_GAME_UI_STATE_INGAME",
+]
+MAP_LOAD_LINES = [
+    "Shutdown prop cache",
+    "[ResourceSystem] Loading resource: maps/de_mirage/models/props/crate_{n}.vmdl_c",
+    "Precache: materials/particle/smoke_{n}.vmat_c",
+    "CL:  Mapped string table entry {n}",
+]
+
+
+def synthetic_chat_line(rng: random.Random) -> Tuple[str, str]:
+    """Retourne une ligne de chat synthétique et le message qu'elle contient."""
+    message = rng.choices(CHAT_MESSAGES, CHAT_WEIGHTS)[0][0]
+    tag, dead = rng.choice(CHAT_TAGS)
+    line = f"{time.strftime('%m/%d %H:%M:%S')}  {tag} {dead}{rng.choice(PLAYERS)}\u200e﹫{rng.choice(LOCATIONS)}\xa0: {message}"
+    return line, message
+
+
+class LogReplayer:
+    """
+    Écrit du trafic console.log dans un fichier, à débit contrôlé, dans un thread dédié.
+
+    L'instant d'écriture (`time.perf_counter`) de chaque ligne de chat est enregistré dans
+    `chat_times`, dans l'ordre : il sert de point de départ aux mesures de latence de bout en bout.
+    """
+
+    def __init__(self, path: str, duration: float = 30.0, chat_rate: float = 2.0, noise_rate: float = 50.0,
+                 burst_every: Optional[float] = 10.0, burst_size: int = 20, map_load_every: Optional[float] = 15.0,
+                 map_load_lines: int = 5000, source: Optional[str] = None, source_rate: float = 200.0,
+                 seed: int = 42) -> None:
+        """
+        Args:
+            path (str): Fichier de log à alimenter (créé ou complété).
+            duration (float): Durée de l'écriture en secondes.
+            chat_rate (float): Messages de chat par seconde, hors rafales.
+            noise_rate (float): Lignes de spam console par seconde.
+            burst_every (Optional[float]): Intervalle entre deux rafales de chat (None = pas de rafale).
+            burst_size (int): Nombre de messages d'une rafale de chat.
+            map_load_every (Optional[float]): Intervalle entre deux chargements de map (None = aucun).
+            map_load_lines (int): Nombre de lignes de spam écrites d'un coup à chaque chargement de map.
+            source (Optional[str]): Log enregistré à rejouer à la place du trafic synthétique.
+            source_rate (float): Débit de relecture du log enregistré, en lignes par seconde.
+            seed (int): Graine du trafic synthétique.
+        """
+        self.path = path
+        self.duration = duration
+        self.chat_rate = chat_rate
+        self.noise_rate = noise_rate
+        self.burst_every = burst_every
+        self.burst_size = burst_size
+        self.map_load_every = map_load_every
+        self.map_load_lines = map_load_lines
+        self.source = source
+        self.source_rate = source_rate
+        self.chat_times: List[float] = []
+        self.lines_written = 0
+        self._rng = random.Random(seed)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-replayer", daemon=True)
+
+    def _synthetic_ticks(self) -> Iterator[List[str]]:
+        """Produit, pas par pas, les lignes synthétiques à écrire."""
+        rng = self._rng
+        chat_credit = noise_credit = 0.0
+        next_burst = self.burst_every
+        next_map_load = self.map_load_every
+        for step in range(int(self.duration / TICK)):
+            elapsed = step * TICK
+            lines: List[str] = []
+            stamp = time.strftime('%m/%d %H:%M:%S')
+            if next_map_load is not None and elapsed >= next_map_load:
+                lines += [f"{stamp}  {rng.choice(MAP_LOAD_LINES).format(n=i)}" for i in range(self.map_load_lines)]
+                next_map_load += self.map_load_every
+            noise_credit += self.noise_rate * TICK
+            while noise_credit >= 1:
+                lines.append(f"{stamp}  {rng.choice(NOISE_LINES)}")
+                noise_credit -= 1
+            chat_credit += self.chat_rate * TICK
+            chat_count = int(chat_credit)
+            chat_credit -= chat_count
+            if next_burst is not None and elapsed >= next_burst:
+                chat_count += self.burst_size
+                next_burst += self.burst_every
+            lines += [synthetic_chat_line(rng)[0] for _ in range(chat_count)]
+            yield lines
+
+    def _recorded_ticks(self) -> Iterator[List[str]]:
+        """Produit, pas par pas, les lignes du log enregistré (relu en boucle jusqu'à la fin de la durée)."""
+        with open(self.source, "r", encoding="utf-8", errors="ignore") as f:
+            recorded = [line.rstrip("\r\n") for line in f]
+        if not recorded:
+            return
+        credit = 0.0
+        position = 0
+        for _ in range(int(self.duration / TICK)):
+            credit += self.source_rate * TICK
+            count = int(credit)
+            credit -= count
+            lines = [recorded[(position + i) % len(recorded)] for i in range(count)]
+            position += count
+            yield lines
+
+    def _run(self) -> None:
+        """Boucle d'écriture : un pas toutes les `TICK` secondes, sans dérive."""
+        ticks = self._recorded_ticks() if self.source else self._synthetic_ticks()
+        with open(self.path, "ab") as f:
+            deadline = time.perf_counter()
+            for lines in ticks:
+                if self._stop.is_set():
+                    return
+                if lines:
+                    written_at = time.perf_counter()
+                    f.write(("\n".join(lines) + "\n").encode("utf-8"))
+                    f.flush()
+                    self.chat_times.extend(written_at for line in lines if DEFAULT_PARSER.parse(line))
+                    self.lines_written += len(lines)
+                deadline += TICK
+                time.sleep(max(0.0, deadline - time.perf_counter()))
+
+    def start(self) -> None:
+        """Lance l'écriture en arrière-plan."""
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Attend la fin de l'écriture."""
+        self._thread.join(timeout)
+
+    def stop(self) -> None:
+        """Interrompt l'écriture."""
+        self._stop.set()
+        self.join()
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Options communes du trafic rejoué (utilisées aussi par bench_pipeline.py)."""
+    parser = argparse.ArgumentParser(add_help=False)
+    traffic = parser.add_argument_group("traffic")
+    traffic.add_argument("--source", help="console.log enregistré à rejouer (sinon trafic synthétique)")
+    traffic.add_argument("--source-rate", type=float, default=200.0, help="lignes/s du log enregistré")
+    traffic.add_argument("--duration", type=float, default=30.0, help="durée du trafic en secondes")
+    traffic.add_argument("--chat-rate", type=float, default=2.0, help="messages de chat par seconde")
+    traffic.add_argument("--noise-rate", type=float, default=50.0, help="lignes de spam console par seconde")
+    traffic.add_argument("--burst-every", type=float, default=10.0, help="secondes entre deux rafales de chat (0 = aucune)")
+    traffic.add_argument("--burst-size", type=int, default=20, help="messages par rafale de chat")
+    traffic.add_argument("--map-load-every", type=float, default=15.0, help="secondes entre deux chargements de map (0 = aucun)")
+    traffic.add_argument("--map-load-lines", type=int, default=5000, help="lignes de spam par chargement de map")
+    traffic.add_argument("--seed", type=int, default=42)
+    return parser
+
+
+def replayer_from_args(path: str, args: argparse.Namespace) -> LogReplayer:
+    """Construit un `LogReplayer` à partir des options de `build_arg_parser`."""
+    return LogReplayer(
+        path, duration=args.duration, chat_rate=args.chat_rate, noise_rate=args.noise_rate,
+        burst_every=args.burst_every or None, burst_size=args.burst_size,
+        map_load_every=args.map_load_every or None, map_load_lines=args.map_load_lines,
+        source=args.source, source_rate=args.source_rate, seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rejoue du trafic console.log dans un fichier.", parents=[build_arg_parser()])
+    parser.add_argument("output", help="fichier de log à alimenter")
+    args = parser.parse_args()
+    replayer = replayer_from_args(args.output, args)
+    replayer.start()
+    try:
+        replayer.join()
+    except KeyboardInterrupt:
+        replayer.stop()
+    print(f"{replayer.lines_written} lines written, {len(replayer.chat_times)} chat")
+
+
+if __name__ == "__main__":
+    main()
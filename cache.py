@@ -0,0 +1,402 @@
+# cache.py
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Clé de cache : (message normalisé, moteur, langue cible)
+CacheKey = Tuple[str, str, str]
+# Valeur de cache : (texte traduit, traduction effectuée, langue d'origine)
+CacheValue = Tuple[str, bool, Optional[str]]
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_cache.db")
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_MEMORY_ENTRIES = 5_000
+DEFAULT_MEMORY_BYTES = 8 * 1024 * 1024
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def _estimate_size(obj: object) -> int:
+    """Estime grossièrement la taille mémoire d'une clé ou valeur de cache (tuples de chaînes)."""
+    if isinstance(obj, tuple):
+        return sys.getsizeof(obj) + sum(_estimate_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Cache mémoire borné (nombre d'entrées et/ou octets) avec éviction LRU et TTL optionnel.
+
+    Les compteurs de hits, miss, évictions et expirations sont exposés via `stats()`.
+    Toutes les opérations sont protégées par un verrou et restent en O(1).
+    """
+
+    def __init__(self, max_entries: Optional[int] = DEFAULT_MEMORY_ENTRIES,
+                 max_bytes: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        """
+        Initialise le cache.
+
+        Args:
+            max_entries (Optional[int]): Nombre maximal d'entrées (None = illimité).
+            max_bytes (Optional[int]): Budget mémoire approximatif en octets (None = illimité).
+            ttl (Optional[float]): Durée de vie d'une entrée en secondes (None = pas d'expiration).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[K, Tuple[V, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: K) -> Optional[V]:
+        """Retourne la valeur associée à la clé (et la marque comme récente), ou None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, created, _ = entry
+            if self.ttl and time.time() - created > self.ttl:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V, created: Optional[float] = None) -> None:
+        """
+        Ajoute ou remplace une entrée, puis évince les plus anciennes si le budget est dépassé.
+
+        Args:
+            key (K): La clé.
+            value (V): La valeur.
+            created (Optional[float]): Date de création (pour le TTL), maintenant par défaut.
+        """
+        size = _estimate_size(key) + _estimate_size(value) if self.max_bytes else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, created if created is not None else time.time(), size)
+            self._bytes += size
+            while self._data and (
+                (self.max_entries is not None and len(self._data) > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                oldest_key = next(iter(self._data))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def pop(self, key: K) -> None:
+        """Supprime une entrée si elle existe."""
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def _remove(self, key: K) -> None:
+        """Supprime une entrée (appelé sous verrou)."""
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        """Vide le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Retourne les compteurs du cache et son taux de hit."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _InFlightCall(Generic[V]):
+    """Appel en cours partagé par `SingleFlight`."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[V] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Déduplication des appels concurrents : pour une même clé, un seul appel est exécuté
+    et les appelants arrivés entre-temps attendent et partagent son résultat.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[K, _InFlightCall[V]] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: K, fn: Callable[[], V]) -> Tuple[V, bool]:
+        """
+        Exécute `fn` pour la clé donnée, sauf si un appel identique est déjà en cours.
+
+        Returns:
+            Tuple[V, bool]: Le résultat, et True s'il provient de l'appel d'un autre thread.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _InFlightCall()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class PersistentCache:
+    """
+    Cache de traductions persistant sur disque (SQLite en mode WAL).
+
+    Un `LRUCache` borné sert de premier niveau : les entrées les plus récemment utilisées y sont
+    chargées à l'ouverture, ce qui permet de répondre aux phrases fréquentes sans aucun accès disque.
+    La taille sur disque est plafonnée avec une éviction LRU, et un TTL optionnel fait expirer les vieilles entrées.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl: Optional[float] = None, memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 memory_bytes: Optional[int] = DEFAULT_MEMORY_BYTES) -> None:
+        """
+        Ouvre (ou crée) la base de cache et précharge les entrées récentes.
+
+        Args:
+            path (str): Chemin du fichier SQLite.
+            max_entries (int): Nombre maximal d'entrées conservées sur disque.
+            ttl (Optional[float]): Durée de vie d'une entrée en secondes (None = pas d'expiration).
+            memory_entries (int): Nombre maximal d'entrées gardées en mémoire (et préchargées au démarrage).
+            memory_bytes (Optional[int]): Budget mémoire approximatif du premier niveau, en octets.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._memory: LRUCache[CacheKey, CacheValue] = LRUCache(memory_entries, memory_bytes, ttl)
+        self._touched: Dict[CacheKey, float] = {}
+        self._count = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self.disk_hits = 0
+        self.disk_evictions = 0
+
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " message TEXT NOT NULL, engine TEXT NOT NULL, target TEXT NOT NULL,"
+                " text TEXT NOT NULL, translated INTEGER NOT NULL, lang TEXT,"
+                " created REAL NOT NULL, last_used REAL NOT NULL,"
+                " PRIMARY KEY (message, engine, target))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)")
+            self._purge_expired()
+            self._count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            self._warm_load(memory_entries)
+        except sqlite3.Error as e:
+            # Le cache disque est un bonus : en cas de problème on continue en mémoire seulement
+            logger.error("Persistent cache unavailable (%s): %s", path, e)
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except sqlite3.Error:
+                    pass
+            self._conn = None
+
+    def _purge_expired(self) -> None:
+        """Supprime les entrées dont le TTL est dépassé."""
+        if self.ttl:
+            self._conn.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,))
+
+    def _warm_load(self, limit: int) -> None:
+        """Charge en mémoire les entrées les plus récemment utilisées."""
+        rows = self._conn.execute(
+            "SELECT message, engine, target, text, translated, lang, created FROM translations"
+            " ORDER BY last_used DESC LIMIT ?", (limit,)
+        ).fetchall()
+        # Parcours du plus ancien au plus récent pour que l'ordre LRU en mémoire soit le bon
+        for message, engine, target, text, translated, lang, created in reversed(rows):
+            self._memory.put((message, engine, target), (text, bool(translated), lang), created=created)
+
+    def get(self, key: CacheKey) -> Optional[CacheValue]:
+        """Retourne la valeur associée à la clé, ou None si absente, expirée ou illisible."""
+        value = self._memory.get(key)
+        if value is not None:
+            # La date d'utilisation est écrite en différé pour garder les lectures rapides
+            with self._lock:
+                self._touched[key] = time.time()
+            return value
+
+        with self._lock:
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT text, translated, lang, created FROM translations"
+                    " WHERE message = ? AND engine = ? AND target = ?", key
+                ).fetchone()
+                if row is None:
+                    return None
+                value, created = (row[0], bool(row[1]), row[2]), row[3]
+                if self.ttl and time.time() - created > self.ttl:
+                    self._delete(key)
+                    return None
+            except sqlite3.Error as e:
+                # Base verrouillée ou corrompue : traité comme une absence du cache
+                logger.error("Persistent cache read failed: %s", e)
+                return None
+            self.disk_hits += 1
+            self._touched[key] = time.time()
+
+        self._memory.put(key, value, created=created)
+        return value
+
+    def put(self, key: CacheKey, value: CacheValue) -> None:
+        """Enregistre une traduction dans le cache (mémoire et disque)."""
+        now = time.time()
+        self._memory.put(key, value, created=now)
+        with self._lock:
+            self._touched.pop(key, None)
+            if self._conn is None:
+                return
+            try:
+                exists = self._conn.execute(
+                    "SELECT 1 FROM translations WHERE message = ? AND engine = ? AND target = ?", key
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO translations"
+                    " (message, engine, target, text, translated, lang, created, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, value[0], int(value[1]), value[2], now, now)
+                )
+                if not exists:
+                    self._count += 1
+                self._flush_touched()
+                if self._count > self.max_entries:
+                    self._evict()
+            except sqlite3.Error as e:
+                logger.error("Persistent cache write failed: %s", e)
+
+    def _delete(self, key: CacheKey) -> None:
+        """Supprime une entrée du cache (appelé sous verrou)."""
+        self._memory.pop(key)
+        self._touched.pop(key, None)
+        if self._conn is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM translations WHERE message = ? AND engine = ? AND target = ?", key
+            )
+            self._count -= cursor.rowcount
+
+    def _flush_touched(self) -> None:
+        """Écrit sur disque les dates d'utilisation accumulées depuis le dernier flush."""
+        if not self._touched or self._conn is None:
+            return
+        touched, self._touched = self._touched, {}
+        self._conn.executemany(
+            "UPDATE translations SET last_used = ? WHERE message = ? AND engine = ? AND target = ?",
+            [(used, *key) for key, used in touched.items()]
+        )
+
+    def _evict(self) -> None:
+        """Supprime les entrées les moins récemment utilisées (par paquets de 10 % pour amortir le coût)."""
+        excess = self._count - self.max_entries + max(1, self.max_entries // 10)
+        rows = self._conn.execute(
+            "SELECT message, engine, target FROM translations ORDER BY last_used ASC LIMIT ?", (excess,)
+        ).fetchall()
+        self._conn.executemany(
+            "DELETE FROM translations WHERE message = ? AND engine = ? AND target = ?", rows
+        )
+        for row in rows:
+            self._memory.pop(tuple(row))
+        self._count -= len(rows)
+        self.disk_evictions += len(rows)
+
+    def entries(self, target: Optional[str] = None) -> List[Tuple[CacheKey, CacheValue]]:
+        """Retourne les entrées du disque (éventuellement d'une seule langue cible), des plus récemment utilisées aux plus anciennes."""
+        with self._lock:
+            if self._conn is None:
+                return []
+            self._flush_touched()
+            rows = self._conn.execute(
+                "SELECT message, engine, target, text, translated, lang FROM translations"
+                " WHERE ? IS NULL OR target = ? ORDER BY last_used DESC", (target, target)
+            ).fetchall()
+        return [((message, engine, row_target), (text, bool(translated), lang))
+                for message, engine, row_target, text, translated, lang in rows]
+
+    def stats(self) -> Dict[str, float]:
+        """Retourne les compteurs du cache mémoire, complétés par ceux du niveau disque."""
+        stats = self._memory.stats()
+        memory_hits = stats["hits"]
+        # Un miss mémoire rattrapé par le disque reste un hit du point de vue de l'appelant
+        stats["memory_hits"] = memory_hits
+        stats["disk_hits"] = self.disk_hits
+        stats["hits"] = memory_hits + self.disk_hits
+        stats["misses"] = max(0, stats["misses"] - self.disk_hits)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["disk_entries"] = len(self)
+        stats["disk_evictions"] = self.disk_evictions
+        return stats
+
+    def close(self) -> None:
+        """Écrit les dernières dates d'utilisation et ferme la base."""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._flush_touched()
+            except sqlite3.Error as e:
+                logger.error("Persistent cache flush failed: %s", e)
+            self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        """Retourne le nombre d'entrées connues du cache."""
+        return self._count if self._conn is not None else len(self._memory)
@@ -0,0 +1,140 @@
+# chat_view.py
+
+from collections import deque
+from typing import Deque, Dict, Iterable, NamedTuple, Optional, Set, Tuple
+
+import customtkinter
+
+# Nombre de messages conservés à l'écran par défaut (les plus anciens sont supprimés)
+DEFAULT_HISTORY_LIMIT = 500
+
+
+class ChatRow(NamedTuple):
+    """Message prêt à être affiché dans la vue de chat."""
+    entry_id: Optional[Tuple[int, int]]  # Identifiant (session, numéro) du message côté pipeline, ou None
+    player: str
+    is_error: bool
+    info: Optional[str]      # Mention "Traduit par ...", ou None
+    message: str
+    partial: bool
+
+
+class ChatView(customtkinter.CTkTextbox):
+    """
+    Zone de chat à un seul widget texte : chaque message est un bloc de texte stylé par des tags.
+
+    L'historique est un buffer circulaire : au-delà de `history_limit` messages, les plus anciens
+    sont supprimés, le coût d'affichage ne grossit donc pas avec la durée de la session. Chaque lot
+    de messages est inséré en une seule passe, suivie d'un seul défilement. Un message encore en
+    cours de streaming est délimité par deux marques et réécrit sur place à chaque mise à jour.
+    """
+
+    def __init__(self, master, history_limit: int = DEFAULT_HISTORY_LIMIT, font: Tuple = ("Arial", 12),
+                 colors: Optional[Dict[str, str]] = None, **kwargs) -> None:
+        """
+        Args:
+            master: Le widget parent.
+            history_limit (int): Nombre maximal de messages conservés.
+            font (Tuple): Police des messages ; les noms sont en gras et les mentions en italique.
+            colors (Optional[Dict[str, str]]): Couleurs des tags "player", "error" et "info".
+        """
+        super().__init__(master, wrap="word", font=font, **kwargs)
+        self.history_limit = history_limit
+        colors = colors or {}
+        family, size = font[0], font[1]
+        # Les polices ne sont pas autorisées par CTkTextbox.tag_config : on passe par le widget tk sous-jacent
+        self._textbox.tag_config("player", foreground=colors.get("player", "cyan"), font=(family, size, "bold"))
+        self._textbox.tag_config("error", foreground=colors.get("error", "red"), font=(family, size, "bold"))
+        self._textbox.tag_config("info", foreground=colors.get("info", "gray60"), font=(family, size, "italic"))
+        self._textbox.tag_config("message", spacing3=8)
+        self.configure(state="disabled")
+        # Blocs affichés, du plus ancien au plus récent (numéros internes des marques)
+        self._blocks: Deque[int] = deque()
+        # Mêmes blocs, pour tester en temps constant qu'un bloc est encore affiché
+        self._live_blocks: Set[int] = set()
+        # Messages en cours de streaming : identifiant pipeline -> numéro de bloc
+        self._streaming: Dict[Tuple[int, int], int] = {}
+        self._next_block = 0
+
+    @staticmethod
+    def _segments(row: ChatRow) -> Tuple[str, ...]:
+        """Découpe un message en segments (texte, tag) pour une insertion en un seul appel."""
+        segments = ("[ERREUR]" if row.is_error else row.player, "error" if row.is_error else "player", "\n", "")
+        if row.info:
+            segments += (f"{row.info}\n", "info")
+        return segments + (row.message, "message")
+
+    def add_rows(self, rows: Iterable[ChatRow]) -> None:
+        """Affiche un lot de messages (nouveaux ou mises à jour), puis défile une seule fois vers le bas."""
+        at_bottom = self._textbox.yview()[1] >= 0.999
+        self.configure(state="normal")
+        for row in rows:
+            block = self._streaming.get(row.entry_id) if row.entry_id is not None else None
+            if block is not None and block in self._live_blocks:
+                self._replace(block, row)
+            else:
+                block = self._append(row)
+            if row.partial:
+                self._streaming[row.entry_id] = block
+            elif row.entry_id is not None:
+                self._streaming.pop(row.entry_id, None)
+        self._trim()
+        self.configure(state="disabled")
+        # On ne force pas le défilement si l'utilisateur est remonté dans l'historique
+        if at_bottom:
+            self._textbox.see("end")
+
+    def _append(self, row: ChatRow) -> int:
+        """Ajoute un bloc en fin de zone et pose ses marques de début et de fin (avant le saut de ligne final)."""
+        block = self._next_block
+        self._next_block += 1
+        start = self._textbox.index("end-1c")
+        self._textbox.insert("end-1c", *self._segments(row))
+        self._textbox.mark_set(f"b{block}.start", start)
+        self._textbox.mark_set(f"b{block}.end", "end-1c")
+        self._textbox.mark_gravity(f"b{block}.start", "left")
+        self._textbox.mark_gravity(f"b{block}.end", "left")
+        self._textbox.insert("end-1c", "\n")
+        self._blocks.append(block)
+        self._live_blocks.add(block)
+        return block
+
+    def _replace(self, block: int, row: ChatRow) -> None:
+        """Réécrit un bloc existant sur place (mise à jour d'une traduction en streaming)."""
+        start, end = f"b{block}.start", f"b{block}.end"
+        self._textbox.delete(start, end)
+        # Le temps de l'insertion, la marque de fin glisse derrière le texte inséré
+        self._textbox.mark_gravity(end, "right")
+        self._textbox.insert(start, *self._segments(row))
+        self._textbox.mark_gravity(end, "left")
+
+    def _trim(self) -> None:
+        """Supprime les blocs les plus anciens au-delà de la limite d'historique."""
+        excess = len(self._blocks) - self.history_limit
+        if excess <= 0:
+            return
+        removed = [self._blocks.popleft() for _ in range(excess)]
+        # Une seule suppression pour tous les blocs retirés (saut de ligne final compris)
+        self._textbox.delete("1.0", f"b{removed[-1]}.end+1c")
+        for block in removed:
+            self._textbox.mark_unset(f"b{block}.start", f"b{block}.end")
+        self._live_blocks.difference_update(removed)
+        self._streaming = {entry_id: block for entry_id, block in self._streaming.items() if block in self._live_blocks}
+
+    def reset_streaming(self) -> None:
+        """
+        Oublie les messages en cours de streaming (au démarrage d'une nouvelle session d'écoute) :
+        une mise à jour de la nouvelle session ne doit jamais réécrire un bloc de la précédente.
+        """
+        self._streaming.clear()
+
+    def clear(self) -> None:
+        """Efface tout l'historique."""
+        self.configure(state="normal")
+        self._textbox.delete("1.0", "end")
+        for block in self._blocks:
+            self._textbox.mark_unset(f"b{block}.start", f"b{block}.end")
+        self.configure(state="disabled")
+        self._blocks.clear()
+        self._live_blocks.clear()
+        self._streaming.clear()
@@ -0,0 +1,464 @@
+# engines.py
+
+import asyncio
+import concurrent.futures
+import importlib
+import json
+import logging
+import re
+import threading
+import time
+from types import ModuleType
+from typing import Callable, Coroutine, Dict, Iterable, List, Optional, Tuple, Union
+
+from lang_data import LANG_MAP_GEMINI
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ENGINE = "Google Translator"
+DEEPL_ENGINE = "DeepL"
+GEMINI_ENGINE = "Gemini"
+# Moteurs dotés d'une vraie API de lot (une requête pour plusieurs textes) : seuls eux sont micro-batchés
+BATCH_ENGINES = (DEEPL_ENGINE, GEMINI_ENGINE)
+
+# SDK de chaque moteur : importés seulement quand le moteur est utilisé (ou préchargés en arrière-plan),
+# pour ne pas retarder l'ouverture de la fenêtre ni imposer l'installation des SDK des moteurs inutilisés
+ENGINE_SDKS = {
+    GOOGLE_ENGINE: ("googletrans",),
+    DEEPL_ENGINE: ("deepl",),
+    GEMINI_ENGINE: ("google.genai", "google.genai.types"),
+}
+
+# Durée maximale d'un appel à un moteur : au-delà, l'appel est abandonné et compté comme un échec
+# du moteur, ce qui déclenche la bascule au lieu de bloquer un thread (et la sortie ordonnée) indéfiniment
+ENGINE_TIMEOUT = 10.0
+
+GEMINI_MODEL = "gemini-2.0-flash-lite"
+# Budget de tokens de sortie Gemini par message traduit
+GEMINI_TOKENS_PER_MESSAGE = 100
+
+# Schéma de la réponse structurée (détection + traduction en un seul appel)
+GEMINI_STRUCTURED_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "id": {"type": "INTEGER"},
+            "source_language": {"type": "STRING"},
+            "already_in_target": {"type": "BOOLEAN"},
+            "translation": {"type": "STRING"},
+        },
+        "required": ["id", "source_language", "already_in_target", "translation"],
+    },
+}
+
+# Résultat d'une détection + traduction : (code langue source, déjà dans la langue cible, traduction)
+DetectedTranslation = Tuple[Optional[str], bool, str]
+
+# Ligne numérotée d'une réponse Gemini en lot : "3. texte traduit"
+_NUMBERED_LINE = re.compile(r"^\s*(\d+)\s*[.):-]\s*(.*)$")
+
+
+class EngineError(Exception):
+    """Erreur d'un moteur de traduction. Le message est déjà formaté pour l'affichage ("[ERROR] ...")."""
+
+    def __init__(self, message: str, quota: bool = False, rate_limited: bool = False) -> None:
+        """
+        Args:
+            message (str): Message d'erreur affichable.
+            quota (bool): True si le quota du service est épuisé.
+            rate_limited (bool): True si le service a refusé la requête pour excès de débit (429).
+        """
+        super().__init__(message)
+        self.quota = quota
+        self.rate_limited = rate_limited
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Indique si une exception d'un SDK correspond à un refus pour excès de débit (HTTP 429)."""
+    status = getattr(error, "code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    text = str(error).lower()
+    return "429" in text or "too many requests" in text or "resource_exhausted" in text
+
+
+def import_sdk(module_name: str) -> ModuleType:
+    """
+    Importe le SDK d'un moteur (les imports suivants sont immédiats).
+
+    Raises:
+        EngineError: Si le SDK n'est pas installé.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise EngineError(f"[ERROR] Python package '{module_name}' is not installed ({e})") from e
+
+
+class AsyncLoopThread:
+    """Boucle d'événements asyncio persistante, exécutée dans un thread dédié et démarrée à la demande."""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Démarre la boucle et son thread au premier appel."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="engine-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = ENGINE_TIMEOUT) -> any:
+        """
+        Exécute une coroutine sur la boucle persistante et attend son résultat (appel bloquant).
+
+        Raises:
+            EngineError: Si la coroutine n'a pas abouti après `timeout` secondes (elle est alors annulée).
+        """
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError as e:
+            future.cancel()
+            raise EngineError(f"[ERROR] Engine call timed out after {timeout:g} s") from e
+
+    def stop(self) -> None:
+        """Arrête la boucle et attend la fin de son thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=2.0)
+            loop.close()
+
+
+class GoogleEngine:
+    """Google Translate (googletrans), avec un client HTTP keep-alive partagé par la détection et la traduction."""
+
+    name = GOOGLE_ENGINE
+
+    def __init__(self, loop: AsyncLoopThread) -> None:
+        self._loop = loop
+        self._client = None
+
+    def _get_client(self):
+        """Crée le client googletrans au premier usage (toujours depuis la boucle persistante)."""
+        if self._client is None:
+            self._client = import_sdk("googletrans").Translator()
+        return self._client
+
+    async def detect_async(self, text: str) -> Tuple[str, float]:
+        """Détecte la langue d'un texte (méthode asynchrone)."""
+        detection = await self._get_client().detect(text)
+        return detection.lang, detection.confidence
+
+    async def translate_async(self, text: str, target_language: str) -> str:
+        """Traduit un texte (méthode asynchrone)."""
+        result = await self._get_client().translate(text, dest=target_language.lower())
+        return result.text.strip()
+
+    def translate(self, text: str, target_language: str) -> str:
+        """Traduit un texte vers la langue cible."""
+        try:
+            return self._loop.run(self.translate_async(text, target_language))
+        except EngineError:
+            raise
+        except Exception as e:
+            raise EngineError(f"[ERROR] GoogleTrans: {e}", rate_limited=is_rate_limit_error(e)) from e
+
+    def translate_batch(self, texts: List[str], target_language: str) -> List[Union[str, EngineError]]:
+        """
+        Traduit un lot de textes. googletrans n'a pas d'API de lot : les requêtes partent
+        en parallèle sur la boucle persistante, en un seul aller-retour vers cette boucle (un dépassement
+        de `ENGINE_TIMEOUT` fait échouer tout le lot)
+        (Google ne fait donc pas partie de `BATCH_ENGINES` : le traducteur ne lui envoie pas de lots).
+        """
+        async def _gather():
+            return await asyncio.gather(
+                *(self.translate_async(text, target_language) for text in texts), return_exceptions=True
+            )
+
+        results = self._loop.run(_gather())
+        return [
+            EngineError(f"[ERROR] GoogleTrans: {result}", rate_limited=is_rate_limit_error(result))
+            if isinstance(result, Exception) else result
+            for result in results
+        ]
+
+
+class DeepLEngine:
+    """DeepL, via un unique `deepl.Translator` dont la session HTTP est réutilisée."""
+
+    name = DEEPL_ENGINE
+
+    def __init__(self, token: str) -> None:
+        self._deepl = import_sdk("deepl")
+        # Délai par requête, sans nouvelles tentatives internes : les reprises passent par le routeur (bascule)
+        self._deepl.http_client.min_connection_timeout = ENGINE_TIMEOUT
+        self._deepl.http_client.max_network_retries = 0
+        self._client = self._deepl.Translator(token)
+
+    def translate(self, text: str, target_language: str) -> str:
+        """Traduit un texte vers la langue cible."""
+        try:
+            result = self._client.translate_text(text, target_lang=target_language)
+            return result.text.strip()
+        except self._deepl.DeepLException as e:
+            if "quota" in str(e).lower():
+                raise EngineError("[ERROR] DeepL quota may be exceeded", quota=True) from e
+            raise EngineError(f"[ERROR] DeepL API: {e}", rate_limited=is_rate_limit_error(e)) from e
+
+    def translate_batch(self, texts: List[str], target_language: str) -> List[Union[str, EngineError]]:
+        """Traduit un lot de textes en une seule requête (l'API DeepL accepte une liste)."""
+        try:
+            results = self._client.translate_text(texts, target_lang=target_language)
+            return [result.text.strip() for result in results]
+        except self._deepl.DeepLException as e:
+            if "quota" in str(e).lower():
+                raise EngineError("[ERROR] DeepL quota may be exceeded", quota=True) from e
+            raise EngineError(f"[ERROR] DeepL API: {e}", rate_limited=is_rate_limit_error(e)) from e
+
+    def get_usage(self) -> Tuple[int, Optional[int]]:
+        """Retourne (caractères consommés, limite) sur la période de facturation en cours."""
+        try:
+            character = self._client.get_usage().character
+        except self._deepl.DeepLException as e:
+            raise EngineError(f"[ERROR] DeepL API: {e}") from e
+        if character is None:
+            raise EngineError("[ERROR] DeepL API: no character usage reported")
+        return character.count, character.limit
+
+
+class GeminiEngine:
+    """Gemini, via un unique `genai.Client` réutilisé pour tous les messages."""
+
+    name = GEMINI_ENGINE
+
+    def __init__(self, token: str) -> None:
+        self._types = import_sdk("google.genai.types")
+        # Délai par requête (en millisecondes) : un appel bloqué échoue et laisse le routeur basculer
+        self._client = import_sdk("google.genai").Client(
+            api_key=token, http_options=self._types.HttpOptions(timeout=int(ENGINE_TIMEOUT * 1000))
+        )
+
+    @staticmethod
+    def build_prompt(text: str, full_lang_name: str) -> str:
+        """Construit le prompt de traduction."""
+        return (
+            f"Translate the following text into {full_lang_name} ONLY. "
+            "You MUST return ONLY the translated text, nothing else, no explanations, no original text."
+            "Translate all slang, insults, or vulgar language as-is. Do not censor or omit anything."
+            "Translate naturally, not literally — use fluent, native-level phrasing."
+            "If you cannot translate a word, keep it as is but still provide the translation of the rest."
+            f"If the text is already in {full_lang_name}, return it UNCHANGED.\n\n"
+            f"Here is the text:\n\n{text}"
+        )
+
+    @staticmethod
+    def build_batch_prompt(texts: List[str], full_lang_name: str) -> str:
+        """Construit le prompt de traduction d'un lot de messages numérotés."""
+        numbered = "\n".join(f"{i}. {' '.join(text.split())}" for i, text in enumerate(texts, 1))
+        return (
+            f"Translate each of the following {len(texts)} numbered chat messages into {full_lang_name} ONLY. "
+            f"You MUST return exactly {len(texts)} lines, each formatted as '<number>. <translation>', "
+            "with the same numbering, nothing else, no explanations, no original text."
+            "Translate all slang, insults, or vulgar language as-is. Do not censor or omit anything."
+            "Translate naturally, not literally — use fluent, native-level phrasing."
+            "If you cannot translate a word, keep it as is but still provide the translation of the rest."
+            f"If a message is already in {full_lang_name}, return it UNCHANGED.\n\n"
+            f"Here are the messages:\n\n{numbered}"
+        )
+
+    @staticmethod
+    def build_structured_prompt(texts: List[str], full_lang_name: str) -> str:
+        """Construit le prompt de détection + traduction en JSON d'un lot de messages numérotés."""
+        numbered = "\n".join(f"{i}. {' '.join(text.split())}" for i, text in enumerate(texts, 1))
+        return (
+            f"For each of the following {len(texts)} numbered chat messages, return a JSON object with: "
+            "'id' (the message number), 'source_language' (ISO 639-1 code of the message language, lowercase), "
+            f"'already_in_target' (true if the message is already in {full_lang_name}) and "
+            f"'translation' (the message translated into {full_lang_name}, or the original if already in {full_lang_name}). "
+            "Translate all slang, insults, or vulgar language as-is. Do not censor or omit anything."
+            "Translate naturally, not literally — use fluent, native-level phrasing."
+            "If you cannot translate a word, keep it as is but still provide the translation of the rest.\n\n"
+            f"Here are the messages:\n\n{numbered}"
+        )
+
+    def _full_lang_name(self, target_language: str) -> str:
+        """Retourne le nom de langue attendu par le prompt, ou lève une erreur si non supportée."""
+        full_lang_name = LANG_MAP_GEMINI.get(target_language.upper())
+        if not full_lang_name:
+            raise EngineError(f"[ERROR] Language '{target_language}' not supported by Gemini integration")
+        return full_lang_name
+
+    def _generate(self, prompt: str, max_output_tokens: int, structured: bool = False) -> str:
+        """Envoie un prompt à Gemini et retourne le texte de la réponse (JSON si `structured`)."""
+        if structured:
+            config = self._types.GenerateContentConfig(
+                temperature=0.2, max_output_tokens=max_output_tokens,
+                response_mime_type="application/json", response_schema=GEMINI_STRUCTURED_SCHEMA
+            )
+        else:
+            config = self._types.GenerateContentConfig(temperature=0.2, max_output_tokens=max_output_tokens)
+        try:
+            response = self._client.models.generate_content(model=GEMINI_MODEL, contents=prompt, config=config)
+            return response.text.strip()
+        except Exception as e:
+            raise EngineError(f"[ERROR] Gemini API: {e}", rate_limited=is_rate_limit_error(e)) from e
+
+    def translate(self, text: str, target_language: str) -> str:
+        """Traduit un texte vers la langue cible."""
+        full_lang_name = self._full_lang_name(target_language)
+        return self._generate(self.build_prompt(text, full_lang_name), GEMINI_TOKENS_PER_MESSAGE)
+
+    def translate_stream(self, text: str, target_language: str, on_partial: Callable[[str], None]) -> str:
+        """
+        Traduit un texte en streaming : `on_partial` reçoit le texte accumulé à chaque fragment,
+        ce qui permet d'afficher les premiers mots dès le premier token.
+
+        Returns:
+            str: La traduction complète.
+        """
+        full_lang_name = self._full_lang_name(target_language)
+        parts: List[str] = []
+        try:
+            stream = self._client.models.generate_content_stream(
+                model=GEMINI_MODEL, contents=self.build_prompt(text, full_lang_name),
+                config=self._types.GenerateContentConfig(temperature=0.2, max_output_tokens=GEMINI_TOKENS_PER_MESSAGE)
+            )
+            for chunk in stream:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    on_partial("".join(parts).strip())
+        except Exception as e:
+            raise EngineError(f"[ERROR] Gemini API: {e}", rate_limited=is_rate_limit_error(e)) from e
+        return "".join(parts).strip()
+
+    def translate_batch(self, texts: List[str], target_language: str) -> List[Union[str, EngineError]]:
+        """Traduit un lot de messages en un seul prompt numéroté, puis redécoupe la réponse ligne par ligne."""
+        if len(texts) == 1:
+            return [self.translate(texts[0], target_language)]
+
+        full_lang_name = self._full_lang_name(target_language)
+        answer = self._generate(self.build_batch_prompt(texts, full_lang_name), GEMINI_TOKENS_PER_MESSAGE * len(texts))
+        translations: Dict[int, str] = {}
+        for line in answer.splitlines():
+            match = _NUMBERED_LINE.match(line)
+            if match:
+                translations.setdefault(int(match.group(1)), match.group(2).strip())
+        return [
+            translations.get(i) or EngineError("[ERROR] Gemini API: message missing from batch answer")
+            for i in range(1, len(texts) + 1)
+        ]
+
+    def detect_and_translate_batch(self, texts: List[str], target_language: str) -> List[Union[DetectedTranslation, EngineError]]:
+        """
+        Détecte la langue et traduit un lot de messages en un seul appel, via une réponse JSON structurée.
+
+        Returns:
+            List[Union[DetectedTranslation, EngineError]]: Pour chaque message, (langue source, déjà dans la
+            langue cible, traduction) ou l'erreur correspondante.
+        """
+        full_lang_name = self._full_lang_name(target_language)
+        answer = self._generate(
+            self.build_structured_prompt(texts, full_lang_name), GEMINI_TOKENS_PER_MESSAGE * len(texts), structured=True
+        )
+        try:
+            items = json.loads(answer)
+        except ValueError as e:
+            raise EngineError(f"[ERROR] Gemini API: invalid JSON answer ({e})") from e
+        if isinstance(items, dict):
+            items = [items]
+
+        by_id: Dict[int, DetectedTranslation] = {}
+        for item in items:
+            try:
+                by_id[int(item["id"])] = (
+                    (item.get("source_language") or "").lower() or None,
+                    bool(item.get("already_in_target")),
+                    str(item["translation"]).strip(),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+        return [
+            by_id.get(i) or EngineError("[ERROR] Gemini API: message missing from JSON answer")
+            for i in range(1, len(texts) + 1)
+        ]
+
+
+class EnginePool:
+    """
+    Possède la boucle asyncio persistante et les clients de chaque moteur.
+
+    Les clients sont créés paresseusement au premier usage puis réutilisés (connexions keep-alive)
+    pendant toute la vie de l'application, y compris entre deux sessions d'écoute.
+    """
+
+    def __init__(self) -> None:
+        self.loop = AsyncLoopThread()
+        self._engines: Dict[Tuple[str, Optional[str]], object] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def google(self) -> GoogleEngine:
+        """Le moteur Google, utilisé aussi pour la détection de langue."""
+        return self.get(GOOGLE_ENGINE)
+
+    def get(self, name: str, token: Optional[str] = None):
+        """
+        Retourne le moteur demandé, en le créant au premier appel.
+
+        Args:
+            name (str): Nom du moteur ("Google Translator", "DeepL" ou "Gemini").
+            token (Optional[str]): Clé d'API du moteur, si nécessaire.
+
+        Raises:
+            EngineError: Si la clé d'API requise est absente.
+        """
+        if name == DEEPL_ENGINE and not token:
+            raise EngineError("[ERROR] DeepL token is missing")
+        if name == GEMINI_ENGINE and not token:
+            raise EngineError("[ERROR] Gemini token is missing")
+
+        key = (name, token) if name in (DEEPL_ENGINE, GEMINI_ENGINE) else (GOOGLE_ENGINE, None)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                if name == DEEPL_ENGINE:
+                    engine = DeepLEngine(token)
+                elif name == GEMINI_ENGINE:
+                    engine = GeminiEngine(token)
+                else:
+                    # Moteur par défaut -> Google Translator (parce que c'est gratos)
+                    engine = GoogleEngine(self.loop)
+                self._engines[key] = engine
+                logger.debug("Engine client created: %s", key[0])
+            return engine
+
+    def prewarm(self, names: Iterable[str]) -> None:
+        """
+        Importe à l'avance les SDK des moteurs donnés (à appeler dans un thread d'arrière-plan),
+        pour que le premier message traduit ne paie pas leur chargement.
+        """
+        for name in dict.fromkeys(names):
+            start = time.perf_counter()
+            try:
+                for module_name in ENGINE_SDKS.get(name, ()):
+                    import_sdk(module_name)
+            except EngineError as e:
+                logger.warning("%s could not be prewarmed: %s", name, e)
+                continue
+            logger.debug("%s SDK loaded in %.0f ms", name, (time.perf_counter() - start) * 1000)
+
+    def close(self) -> None:
+        """Libère les clients et arrête la boucle persistante."""
+        with self._lock:
+            self._engines.clear()
+        self.loop.stop()
@@ -1,63 +1,261 @@
 # extraction.py
 
 import os
-import time
+import re
 from threading import Event
-from typing import Optional, Tuple
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Tuple
 
+from lang_data import CHAT_GRAMMAR, CHAT_IGNORED_CHARS, CHAT_LOCATION_SEPARATOR, CHAT_MESSAGE_SEPARATOR
+from log_watcher import create_watcher
 from translation import Translator
 
-TAGS = ['[GÉNÉRAL]', '[T]', '[AT]', '[ALL]', '[CT]']
+# Délai maximal entre deux vérifications de stop_event quand le fichier ne bouge pas
+STOP_CHECK_INTERVAL = 0.25
+# Taille des blocs lus d'un coup dans le log
+READ_CHUNK_SIZE = 64 * 1024
 
 
-def follow_log(path: str, stop_event: Event):
-    """Générateur qui lit en continu les nouvelles lignes d'un fichier de log."""
+class ChatLine(NamedTuple):
+    """Message de chat extrait d'une ligne de log."""
+    channel: str  # "all" ou "team"
+    dead: bool
+    player: str
+    message: str
+
+
+class ChatParser:
+    """
+    Parser de lignes de chat compilé à partir de la grammaire de `lang_data.CHAT_GRAMMAR`.
+
+    Toutes les étiquettes et marqueurs des langues retenues sont fusionnés en une seule expression
+    régulière : une passe par ligne suffit à rejeter ce qui n'est pas du chat et à capturer canal,
+    état mort, joueur et message, sans chaîne intermédiaire.
+    """
+
+    def __init__(self, locales: Optional[Iterable[str]] = None, grammar: Dict[str, Dict[str, List[str]]] = CHAT_GRAMMAR) -> None:
+        """
+        Args:
+            locales (Optional[Iterable[str]]): Langues du client à reconnaître (toutes celles de la grammaire par défaut).
+            grammar (Dict[str, Dict[str, List[str]]]): Table {langue: {"all": [...], "team": [...], "dead": [...]}}.
+        """
+        selected = [grammar[locale] for locale in (locales or grammar) if locale in grammar]
+        self.channels: Dict[str, str] = {}
+        dead_markers = set()
+        for rules in selected:
+            for channel in ("all", "team"):
+                for tag in rules.get(channel, []):
+                    self.channels.setdefault(tag, channel)
+            dead_markers.update(rules.get("dead", []))
+        self.tags = list(self.channels)
+        # Étiquettes encodées, pour le préfiltrage des lignes avant tout décodage
+        self.tag_bytes = tuple(tag.encode("utf-8") for tag in self.tags)
+        self.pattern = self._compile(self.tags, sorted(dead_markers))
+
+    @staticmethod
+    def _compile(tags: List[str], dead_markers: List[str]) -> Pattern:
+        """Construit l'expression régulière unique de la grammaire."""
+        def alternation(items: List[str]) -> str:
+            # Les plus longs d'abord pour que "[AT]" ne soit jamais pris pour "[T]"
+            return "|".join(re.escape(item) for item in sorted(items, key=len, reverse=True)) or "(?!)"
+
+        ignored = re.escape(CHAT_IGNORED_CHARS)
+        gap = rf"[\s{ignored}]*"
+        dead = rf"(?:{alternation(dead_markers)})"
+        location = re.escape(CHAT_LOCATION_SEPARATOR)
+        separator = re.escape(CHAT_MESSAGE_SEPARATOR)
+        return re.compile(
+            rf"[^\[]*(?P<tag>{alternation(tags)}){gap}"
+            rf"(?P<dead_before>{dead})?{gap}"
+            rf"(?P<player>[^{location}\xa0]*?){gap}"
+            rf"(?P<dead_after>{dead})?{gap}"
+            rf"(?:{location}[^\xa0]*)?{separator}\s*"
+            rf"(?P<message>\S.*?)\s*$"
+        )
+
+    def parse(self, line: str) -> Optional[ChatLine]:
+        """Retourne le message de chat contenu dans la ligne, ou None si ce n'est pas du chat."""
+        # Rejet immédiat du spam console, qui ne contient jamais le séparateur de chat
+        if CHAT_MESSAGE_SEPARATOR not in line:
+            return None
+        match = self.pattern.match(line)
+        if match is None:
+            return None
+        tag, dead_before, player, dead_after, message = match.groups()
+        if CHAT_IGNORED_CHARS in player:
+            player = player.replace(CHAT_IGNORED_CHARS, "").strip()
+        return ChatLine(self.channels[tag], bool(dead_before or dead_after), player, message)
+
+
+DEFAULT_PARSER = ChatParser()
+TAGS = DEFAULT_PARSER.tags
+
+# Versions binaires des marqueurs de chat, pour filtrer les lignes avant tout décodage
+CHAT_MARKER_BYTES = "\xa0".encode("utf-8")
+TAGS_BYTES = DEFAULT_PARSER.tag_bytes
+
+
+def _iter_chat_lines(block: bytes, tags: Tuple[bytes, ...] = TAGS_BYTES) -> Iterator[bytes]:
+    """
+    Extrait d'un bloc de lignes complètes celles qui ressemblent à du chat (marqueur '\xa0' et une des `tags`).
+
+    On saute directement d'un marqueur '\xa0' au suivant : les lignes de spam console
+    (chargement de map, convars...) ne coûtent aucune itération Python.
+    """
+    find = block.find
+    pos = find(CHAT_MARKER_BYTES)
+    while pos != -1:
+        start = block.rfind(b"\n", 0, pos) + 1
+        end = find(b"\n", pos)
+        if end == -1:
+            end = len(block)
+        line = block[start:end]
+        if any(tag in line for tag in tags):
+            yield line
+        pos = find(CHAT_MARKER_BYTES, end)
+
+
+def _has_been_replaced(path: str, f: BinaryIO) -> bool:
+    """Indique si le fichier ouvert a été remplacé par un nouveau fichier (inode différent)."""
     try:
-        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-            f.seek(0, os.SEEK_END)
-            while not stop_event.is_set():
-                line = f.readline()
-                if line:
-                    yield line.strip()
-                else:
-                    time.sleep(0.5)  # Je mets ici une pause de 0.5s de façon arbitraire dans le but de ne pas faire trop tourner la boucle
+        return os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+    except FileNotFoundError:
+        # Fichier en cours de recréation : on garde l'ancien en attendant le nouveau
+        return False
+
+
+def follow_log(path: str, stop_event: Event, watcher_backend: Optional[str] = None, chat_only: bool = False,
+               parser: Optional[ChatParser] = None):
+    """
+    Générateur qui lit en continu les nouvelles lignes d'un fichier de log.
+
+    Le fichier est lu en binaire par gros blocs, découpé en lignes en une fois et les lignes
+    incomplètes sont reportées à la lecture suivante. Une troncature ou une recréation du fichier
+    (relance du jeu avec -condebug) est détectée et le fichier est rouvert automatiquement.
+    L'attente en fin de fichier est événementielle (inotify sous Linux) ou, à défaut,
+    un polling à backoff adaptatif : réactif pendant le chat, quasi gratuit au repos.
+
+    Args:
+        path (str): Chemin du fichier de log.
+        stop_event (Event): Événement qui arrête la lecture.
+        watcher_backend (Optional[str]): Backend d'attente forcé ("inotify" ou "polling").
+        chat_only (bool): Ne décoder et ne retourner que les lignes susceptibles d'être du chat.
+        parser (Optional[ChatParser]): Parser qui traitera les lignes ; ses étiquettes servent au filtre
+            de `chat_only` (grammaire par défaut si absent).
+    """
+    tags = (parser or DEFAULT_PARSER).tag_bytes
+    try:
+        f = open(path, 'rb')
     except FileNotFoundError:
         yield f"ERROR_FILENOTFOUND:{path}"
+        return
+
+    try:
+        with create_watcher(path, watcher_backend) as watcher:
+            f.seek(0, os.SEEK_END)
+            pending = b""
+            while not stop_event.is_set():
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    if _has_been_replaced(path, f):
+                        f.close()
+                        f = open(path, 'rb')
+                        pending = b""
+                        continue
+                    if os.fstat(f.fileno()).st_size < f.tell():
+                        # Fichier tronqué : on repart du début
+                        f.seek(0)
+                        pending = b""
+                        continue
+                    watcher.wait(STOP_CHECK_INTERVAL)
+                    continue
+
+                watcher.activity()
+                data = pending + chunk
+                cut = data.rfind(b"\n") + 1
+                block, pending = data[:cut], data[cut:]
+                if not block:
+                    continue
+                lines = _iter_chat_lines(block, tags) if chat_only else block.split(b"\n")[:-1]
+                for raw_line in lines:
+                    yield raw_line.decode('utf-8', errors='ignore').strip()
+    finally:
+        f.close()
+
+
+def read_log(path: str, chat_only: bool = False, parser: Optional[ChatParser] = None) -> Iterator[str]:
+    """
+    Générateur qui lit un fichier de log en entier, du début à la fin (traitement a posteriori).
+
+    Même découpage que `follow_log` : lecture binaire par gros blocs et, avec `chat_only`,
+    seules les lignes susceptibles d'être du chat sont décodées.
+
+    Args:
+        path (str): Chemin du fichier de log.
+        chat_only (bool): Ne décoder et ne retourner que les lignes susceptibles d'être du chat.
+        parser (Optional[ChatParser]): Parser qui traitera les lignes ; ses étiquettes servent au filtre
+            de `chat_only` (grammaire par défaut si absent).
+    """
+    tags = (parser or DEFAULT_PARSER).tag_bytes
+    with open(path, 'rb') as f:
+        pending = b""
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            data = pending + chunk
+            if not chunk:
+                # Dernière ligne, même sans saut de ligne final
+                block, pending = data + b"\n" if data else b"", b""
+            else:
+                cut = data.rfind(b"\n") + 1
+                block, pending = data[:cut], data[cut:]
+            if block:
+                lines = _iter_chat_lines(block, tags) if chat_only else block.split(b"\n")[:-1]
+                for raw_line in lines:
+                    yield raw_line.decode('utf-8', errors='ignore').strip()
+            if not chunk:
+                return
 
 
 def is_player_chat(line: str) -> bool:
     """Vérifie si la ligne contient un message de chat de joueur."""
-    return any(tag in line for tag in TAGS) and "\xa0" in line
+    return DEFAULT_PARSER.parse(line) is not None
 
 
 def extract_player_and_message(chat_line: str) -> Optional[Tuple[str, str]]:
     """Extrait le nom du joueur et le message d'une ligne de chat."""
-    chat_line = chat_line.replace('\u200e', '')
-    try:
-        _, content_after_tag = chat_line.split(']', 1)
-        content_after_tag = content_after_tag.strip()
-        player_name_part, player_message = content_after_tag.split('\xa0: ', 1)
-        player_name = player_name_part.split('﹫')[0].replace('[MORT(E)]', '').replace('[DEAD]', '').strip()
-        return player_name, player_message.strip()
-    except (ValueError, IndexError):
-        return None
+    chat = DEFAULT_PARSER.parse(chat_line)
+    return (chat.player, chat.message) if chat else None
 
 
-def process_log_line(line: str, translator: Translator) -> Optional[Tuple[str, str, bool, Optional[str], bool, bool]]:
-    """Traite une seule ligne du log en utilisant une instance de Translator existante."""
-    if not is_player_chat(line):
-        return None
+def parse_chat_line(line: str, parser: Optional[ChatParser] = None) -> Optional[ChatLine]:
+    """Retourne le message de chat complet (canal, état mort, joueur, message) de la ligne, ou None."""
+    return (parser or DEFAULT_PARSER).parse(line)
 
-    extracted = extract_player_and_message(line)
-    if not extracted:
-        return None
 
-    player_name, message = extracted
+def parse_log_line(line: str) -> Optional[Tuple[str, str]]:
+    """Retourne (joueur, message) si la ligne est un message de chat de joueur, None sinon."""
+    return extract_player_and_message(line)
 
-    final_text, was_translated, original_lang, from_cache = translator.translate_message(message)
+
+def translate_chat_message(player_name: str, message: str, translator: Translator,
+                           on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, str, bool, Optional[str], bool, bool, str]:
+    """
+    Traduit un message de chat déjà extrait et le met au format attendu par l'interface.
+    `on_partial` reçoit les traductions partielles si le moteur les diffuse en streaming.
+    """
+    final_text, was_translated, original_lang, from_cache, source = translator.translate_message(message, on_partial)
 
     is_error = final_text.startswith("[ERROR]")
     if is_error:
         player_name = "ERREUR"
 
-    return player_name, final_text, was_translated, original_lang, is_error, from_cache
+    return player_name, final_text, was_translated, original_lang, is_error, from_cache, source
+
+
+def process_log_line(line: str, translator: Translator) -> Optional[Tuple[str, str, bool, Optional[str], bool, bool, str]]:
+    """Traite une seule ligne du log en utilisant une instance de Translator existante."""
+    extracted = parse_log_line(line)
+    if not extracted:
+        return None
+
+    player_name, message = extracted
+    return translate_chat_message(player_name, message, translator)
@@ -35,4 +35,16 @@ LANG_CODES_TO_NAMES = {
     'te': 'Télougou', 'th': 'Thaï', 'ti': 'Tigrigna', 'ts': 'Tsonga', 'tr': 'Turc',
     'tk': 'Turkmène', 'ak': 'Twi', 'uk': 'Ukrainien', 'vi': 'Vietnamien', 'xh': 'Xhosa',
     'yi': 'Yiddish', 'yo': 'Yoruba', 'zu': 'Zoulou'
-}
\ No newline at end of file
+}
+# Grammaire des lignes de chat de la console, par langue du client du jeu :
+# "all" / "team" : étiquettes de canal, "dead" : marqueurs de joueur mort.
+# Pour un client dans une autre langue, il suffit d'ajouter une entrée.
+CHAT_GRAMMAR = {
+    "fr": {"all": ["[GÉNÉRAL]"], "team": ["[T]", "[AT]"], "dead": ["[MORT(E)]"]},
+    "en": {"all": ["[ALL]"], "team": ["[T]", "[CT]"], "dead": ["[DEAD]"]},
+}
+# Séparateurs d'une ligne de chat : "[TAG] joueur﹫position\xa0: message"
+CHAT_LOCATION_SEPARATOR = "﹫"
+CHAT_MESSAGE_SEPARATOR = "\xa0:"
+# Caractères invisibles que la console insère autour du nom du joueur
+CHAT_IGNORED_CHARS = "\u200e"
@@ -0,0 +1,205 @@
+# lang_detect.py
+
+import json
+import math
+import os
+import sys
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lang_profiles.json")
+
+# Tailles des n-grammes de caractères utilisés par le modèle
+NGRAM_SIZES = (1, 2, 3)
+# Nombre de n-grammes conservés par langue dans le fichier de profils
+PROFILE_SIZE = 400
+# En dessous de ce nombre de lettres, la confiance est réduite proportionnellement (messages trop courts)
+MIN_RELIABLE_LETTERS = 12
+
+# Scripts propres à une seule langue (du point de vue du chat CS) : pas besoin du modèle n-gramme
+SCRIPT_LANGS = {
+    "greek": "el", "hebrew": "he", "arabic": "ar", "hangul": "ko", "kana": "ja", "han": "zh",
+    "thai": "th", "georgian": "ka", "armenian": "hy", "devanagari": "hi",
+}
+# Probabilités a priori au sein du cyrillique : le russe domine très largement le chat CS
+CYRILLIC_PRIORS = {"ru": 0.85, "uk": 0.1, "bg": 0.05}
+# Lettres qui trahissent une langue précise au sein d'un script partagé
+LETTER_HINTS = {
+    "uk": set("іїєґ"),
+    "ru": set("ыэё"),
+    "fa": set("پچژگ"),
+}
+
+
+def _char_script(char: str) -> Optional[str]:
+    """Retourne le nom du script d'un caractère alphabétique, ou None."""
+    code = ord(char)
+    if code < 0x0250:
+        return "latin"
+    if 0x0400 <= code <= 0x052F:
+        return "cyrillic"
+    if 0x0370 <= code <= 0x03FF:
+        return "greek"
+    if 0x0590 <= code <= 0x05FF:
+        return "hebrew"
+    if 0x0600 <= code <= 0x06FF or 0x0750 <= code <= 0x077F:
+        return "arabic"
+    if 0x0900 <= code <= 0x097F:
+        return "devanagari"
+    if 0x0E00 <= code <= 0x0E7F:
+        return "thai"
+    if 0x10A0 <= code <= 0x10FF:
+        return "georgian"
+    if 0x0530 <= code <= 0x058F:
+        return "armenian"
+    if 0x3040 <= code <= 0x30FF:
+        return "kana"
+    if 0xAC00 <= code <= 0xD7AF or 0x1100 <= code <= 0x11FF:
+        return "hangul"
+    if 0x4E00 <= code <= 0x9FFF:
+        return "han"
+    if 0x1E00 <= code <= 0x1EFF:
+        return "latin"
+    return None
+
+
+def classify_script(text: str) -> Tuple[Optional[str], int]:
+    """
+    Détermine le script dominant d'un texte.
+
+    Returns:
+        Tuple[Optional[str], int]: Le script dominant (ou None s'il n'y a aucune lettre) et le nombre de lettres.
+    """
+    counts: Counter = Counter()
+    for char in text:
+        if char.isalpha():
+            script = _char_script(char)
+            if script:
+                counts[script] += 1
+    if not counts:
+        return None, 0
+    # Un seul caractère kana suffit à distinguer le japonais du chinois
+    if counts["kana"]:
+        return "kana", sum(counts.values())
+    return counts.most_common(1)[0][0], sum(counts.values())
+
+
+def extract_ngrams(text: str) -> List[str]:
+    """Découpe un texte en n-grammes de caractères (mots entourés d'espaces, casse ignorée)."""
+    ngrams = []
+    for word in text.lower().split():
+        word = "".join(char for char in word if char.isalpha() or char == "'")
+        if not word:
+            continue
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            ngrams.extend(padded[i:i + size] for i in range(len(padded) - size + 1) if padded[i:i + size] != " ")
+    return ngrams
+
+
+def build_profile(text: str, size: int = PROFILE_SIZE) -> Dict:
+    """
+    Construit le profil n-gramme d'une langue à partir d'un corpus d'exemple.
+
+    Returns:
+        Dict: {"ngrams": {n-gramme: log-probabilité}, "floor": log-probabilité des n-grammes inconnus}.
+    """
+    counts = Counter(extract_ngrams(text))
+    total = sum(counts.values())
+    return {
+        "ngrams": {gram: round(math.log(count / total), 3) for gram, count in counts.most_common(size)},
+        "floor": round(math.log(0.5 / total), 3),
+    }
+
+
+class LocalDetector:
+    """
+    Détecteur de langue hors ligne : classification par script, puis modèle n-gramme de caractères.
+
+    Il sert à éviter l'appel réseau de détection pour les messages évidents ; en dessous du seuil
+    de confiance, l'appelant se rabat sur le détecteur distant.
+    """
+
+    def __init__(self, profiles: Dict[str, Dict]) -> None:
+        """
+        Args:
+            profiles (Dict[str, Dict]): Profils par code de langue, tels que produits par `build_profile`.
+        """
+        self.profiles = profiles
+        self.cyrillic_langs = [lang for lang in profiles if lang in ("ru", "uk", "bg")]
+        self.latin_langs = [lang for lang in profiles if lang not in self.cyrillic_langs]
+
+    def _score(self, text: str, candidates: List[str],
+               priors: Optional[Dict[str, float]] = None) -> Tuple[Optional[str], float]:
+        """Compare le texte aux profils candidats et retourne la meilleure langue avec sa probabilité."""
+        ngrams = extract_ngrams(text)
+        if not ngrams or not candidates:
+            return None, 0.0
+
+        # Log-vraisemblances ramenées au nombre de n-grammes pour que le softmax ne sature pas
+        scale = 3.0 / math.sqrt(len(ngrams))
+        scores = {}
+        for lang in candidates:
+            profile = self.profiles[lang]
+            table, floor = profile["ngrams"], profile["floor"]
+            scores[lang] = sum(table.get(gram, floor) for gram in ngrams) * scale
+            if priors:
+                scores[lang] += math.log(priors.get(lang, 0.01))
+
+        best = max(scores, key=scores.get)
+        total = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / total
+
+    def detect(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        Détecte la langue d'un texte.
+
+        Returns:
+            Tuple[Optional[str], float]: Le code de langue (ou None) et une confiance entre 0 et 1.
+        """
+        script, letters = classify_script(text)
+        if script is None:
+            return None, 0.0
+
+        length_factor = min(1.0, letters / MIN_RELIABLE_LETTERS)
+        if script in SCRIPT_LANGS:
+            if script == "arabic" and any(char in LETTER_HINTS["fa"] for char in text):
+                return "fa", 0.9 * length_factor
+            return SCRIPT_LANGS[script], 0.95
+
+        if script == "cyrillic":
+            lowered = text.lower()
+            for lang in ("uk", "ru"):
+                if any(char in LETTER_HINTS[lang] for char in lowered):
+                    return lang, max(0.9, length_factor)
+            lang, confidence = self._score(text, self.cyrillic_langs, CYRILLIC_PRIORS)
+            if lang in (None, "ru"):
+                # À défaut d'indice contraire, le cyrillique du chat CS est très majoritairement du russe
+                return "ru", max(confidence, 0.85)
+            return lang, confidence * length_factor
+
+        lang, confidence = self._score(text, self.latin_langs)
+        return lang, confidence * length_factor
+
+
+@lru_cache(maxsize=None)
+def load_detector(path: str = PROFILES_PATH) -> LocalDetector:
+    """Charge (une seule fois par processus) le détecteur à partir du fichier de profils."""
+    with open(path, "r", encoding="utf-8") as f:
+        return LocalDetector(json.load(f))
+
+
+if __name__ == "__main__":
+    # Régénère le fichier de profils depuis un dossier de corpus <code langue>.txt :
+    # python lang_detect.py chemin/vers/corpus
+    corpus_dir = sys.argv[1]
+    profiles = {}
+    for filename in sorted(os.listdir(corpus_dir)):
+        lang, ext = os.path.splitext(filename)
+        if ext == ".txt":
+            with open(os.path.join(corpus_dir, filename), "r", encoding="utf-8") as f:
+                profiles[lang] = build_profile(f.read())
+    with open(PROFILES_PATH, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"{len(profiles)} profiles written to {PROFILES_PATH}")
@@ -0,0 +1,180 @@
+# log_watcher.py
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Bornes du backoff adaptatif du mode polling (en secondes)
+POLL_MIN_DELAY = 0.005
+POLL_MAX_DELAY = 0.1
+POLL_BACKOFF_FACTOR = 1.5
+
+# Constantes inotify (cf. <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_INOTIFY_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """
+    Attente de modifications par polling, avec un backoff adaptatif.
+
+    Le délai repart au minimum dès qu'une activité est signalée, puis grandit
+    progressivement tant que le fichier ne bouge pas, pour ne presque rien consommer au repos.
+    """
+
+    def __init__(self, min_delay: float = POLL_MIN_DELAY, max_delay: float = POLL_MAX_DELAY) -> None:
+        """
+        Initialise le watcher.
+
+        Args:
+            min_delay (float): Délai de polling juste après une activité.
+            max_delay (float): Délai de polling maximal au repos.
+        """
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._delay = min_delay
+        self._wakeup = threading.Event()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Attend la prochaine vérification du fichier.
+
+        Returns:
+            bool: Toujours True (le polling ne sait pas si le fichier a changé).
+        """
+        self._wakeup.wait(min(self._delay, timeout))
+        self._delay = min(self._delay * POLL_BACKOFF_FACTOR, self.max_delay)
+        return True
+
+    def activity(self) -> None:
+        """Signale que des données ont été lues : on repasse au délai minimal."""
+        self._delay = self.min_delay
+
+    def close(self) -> None:
+        """Débloque une éventuelle attente en cours."""
+        self._wakeup.set()
+
+    def __enter__(self) -> "PollingWatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class InotifyWatcher:
+    """
+    Attente de modifications via inotify (Linux) : le thread dort jusqu'à ce que le noyau signale une écriture.
+
+    C'est le dossier qui est surveillé (filtré sur le nom du fichier), ce qui permet aussi
+    de voir passer une recréation du fichier.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialise le watcher sur le fichier donné.
+
+        Args:
+            path (str): Chemin du fichier à surveiller.
+
+        Raises:
+            OSError: Si inotify n'est pas disponible ou si la surveillance ne peut pas être posée.
+        """
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._name = os.path.basename(path).encode()
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.path.dirname(os.path.abspath(path)).encode()
+        if libc.inotify_add_watch(self._fd, directory, _INOTIFY_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, "inotify_add_watch failed")
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Attend une modification du fichier, au plus `timeout` secondes.
+
+        Returns:
+            bool: True si le fichier a (probablement) changé, False si le délai a expiré.
+        """
+        if self._fd < 0:
+            return False
+        try:
+            ready, _, _ = select.select([self._fd], [], [], timeout)
+        except (OSError, ValueError):
+            return False
+        return bool(ready) and self._drain()
+
+    def _drain(self) -> bool:
+        """Consomme les événements en attente et indique si l'un d'eux concerne notre fichier."""
+        relevant = False
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except (BlockingIOError, OSError):
+                return relevant
+            if not buffer:
+                return relevant
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buffer):
+                _, _, _, name_len = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+                if name == self._name:
+                    relevant = True
+
+    def activity(self) -> None:
+        """Sans objet pour inotify (pas de backoff)."""
+
+    def close(self) -> None:
+        """Libère le descripteur inotify."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> "InotifyWatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def create_watcher(path: str, backend: Optional[str] = None):
+    """
+    Crée le meilleur watcher disponible pour le fichier donné.
+
+    Args:
+        path (str): Chemin du fichier surveillé.
+        backend (Optional[str]): "inotify", "polling" ou None (choix automatique).
+
+    Returns:
+        InotifyWatcher | PollingWatcher: Le watcher, utilisable comme context manager.
+    """
+    if backend != "polling" and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(path)
+        except OSError as e:
+            logger.info("inotify unavailable, falling back to polling: %s", e)
+    return PollingWatcher()
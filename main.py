@@ -1,8 +1,10 @@
 # main.py
 
 import json
+import logging
 import os
 import threading
+import time
 from queue import Empty, Queue
 from tkinter import filedialog, messagebox
 from typing import List, Optional
@@ -10,8 +12,14 @@ from typing import List, Optional
 import customtkinter
 
 # Autrs modules
-from extraction import follow_log, process_log_line
-from translation import Translator
+from chat_view import DEFAULT_HISTORY_LIMIT, ChatRow, ChatView
+from extraction import ChatParser, follow_log
+from engines import GOOGLE_ENGINE, EnginePool
+from lang_data import CHAT_GRAMMAR
+from metrics import DEFAULT_EXPORT_INTERVAL, METRICS, STAGES, Metrics, MetricsExporter, TraceId
+from pipeline import DEFAULT_WORKERS, TranslationPipeline
+from scheduler import DEFAULT_MAX_STALENESS
+from translation import PHRASEBOOK_SOURCE, Translator
 
 # --- CONSTANTES DE STYLE ---
 FONT_TITLE = ("Arial", 24, "bold")
@@ -19,6 +27,7 @@ FONT_LABEL = ("Arial", 12)
 FONT_LABEL_BOLD = ("Arial", 12, "bold")
 FONT_INFO = ("Arial", 12, "italic")
 FONT_CONFIG_LABEL = ("Arial", 14)
+FONT_METRICS = ("Courier New", 12)
 
 COLOR_GREEN_NORMAL = "#38573F"
 COLOR_GREEN_HOVER = "#547D54"
@@ -34,6 +43,24 @@ COLOR_BANNED_WORD_SELECTED = "#2B2B2B"
 # --- CONSTANTES DE CONFIGURATION ---
 DEFAULT_CS_PATH = r"C:\Program Files (x86)\Steam\steamapps\common\Counter-Strike Global Offensive"
 DEFAULT_TRANSLATOR = "Google Translator"
+# Budget de temps par frame pour vider la queue de messages, et cadence de rafraîchissement de l'UI
+FRAME_BUDGET = 0.008
+FRAME_INTERVAL_MS = 16
+IDLE_POLL_MS = 100
+MAX_MESSAGES_PER_FRAME = 500
+# Panneau des métriques : hauteur et intervalle de rafraîchissement
+METRICS_PANEL_HEIGHT = 220
+METRICS_REFRESH_MS = 1000
+METRICS_STAGE_LABELS = {
+    "parsed": "parsé", "detected": "langue détectée", "queued_engine": "envoyé au moteur",
+    "translated": "traduit", "enqueued": "transmis à l'interface", "rendered": "affiché",
+}
+# Délai après l'ouverture de la fenêtre avant de précharger les SDK des moteurs en arrière-plan
+PREWARM_DELAY_MS = 200
+# Niveau de log par défaut (surchargeable via la variable d'environnement CS_TRANSLATOR_LOG_LEVEL, ex: DEBUG)
+DEFAULT_LOG_LEVEL = "WARNING"
+
+logger = logging.getLogger(__name__)
 
 
 class ConfigPanel(customtkinter.CTkScrollableFrame):
@@ -48,6 +75,8 @@ class ConfigPanel(customtkinter.CTkScrollableFrame):
         self.selected_label: Optional[customtkinter.CTkLabel] = None
         self.config_path: Optional[str] = None
         self.cs_path: str = DEFAULT_CS_PATH
+        # Options avancées du fichier de config (cache, etc.) sans widget associé, conservées telles quelles
+        self.extra_config: dict = {}
 
         self._create_widgets()
 
@@ -163,6 +192,7 @@ class ConfigPanel(customtkinter.CTkScrollableFrame):
     def get_config_data(self) -> dict:
         """Retourne un dictionnaire avec la configuration actuelle."""
         return {
+            **self.extra_config,
             "exclude_english": bool(self.chk_en.get()),
             "token_deepl": self.token_deepl.get().strip(),
             "token_google_gemini": self.token_google_gemini.get().strip(),
@@ -234,6 +264,9 @@ class ConfigPanel(customtkinter.CTkScrollableFrame):
 
     def load_config_data(self, config_data: dict) -> None:
         """Charge les données d'un dictionnaire dans les widgets de configuration."""
+        widget_keys = ("exclude_english", "token_deepl", "token_google_gemini", "translator", "banned_words", "cs_path")
+        self.extra_config = {key: value for key, value in config_data.items() if key not in widget_keys}
+
         action = self.chk_en.select if config_data.get("exclude_english") else self.chk_en.deselect
         action()
 
@@ -276,6 +309,92 @@ class ConfigPanel(customtkinter.CTkScrollableFrame):
             messagebox.showerror("Error", f"Error saving configuration: {e}")
 
 
+class MetricsPanel(customtkinter.CTkFrame):
+    """Panneau repliable des métriques : latence par étape, appels et erreurs par moteur, hits de cache."""
+
+    def __init__(self, master: customtkinter.CTk, metrics: Metrics = METRICS) -> None:
+        """Initialise le panneau, replié."""
+        super().__init__(master)
+        self.grid_columnconfigure(0, weight=1)
+        self.metrics = metrics
+        self.expanded = False
+        # Rafraîchissement programmé (identifiant `after`), ou None : une seule boucle à la fois
+        self._refresh_job: Optional[str] = None
+
+        self.toggle_button = customtkinter.CTkButton(
+            self, text="▸ Métriques", command=self.toggle, anchor="w",
+            fg_color="transparent", hover_color=COLOR_BUTTON_GENERIC_HOVER
+        )
+        self.toggle_button.grid(row=0, column=0, sticky="ew")
+        self.textbox = customtkinter.CTkTextbox(self, height=METRICS_PANEL_HEIGHT, font=FONT_METRICS, wrap="none")
+        self.textbox.configure(state="disabled")
+
+    def toggle(self) -> None:
+        """Déplie ou replie le panneau ; les métriques ne sont rafraîchies que lorsqu'il est déplié."""
+        self.expanded = not self.expanded
+        self.toggle_button.configure(text=("▾" if self.expanded else "▸") + " Métriques")
+        if self.expanded:
+            self.textbox.grid(row=1, column=0, padx=5, pady=(0, 5), sticky="ew")
+            if self._refresh_job is None:
+                self._refresh()
+        else:
+            self.textbox.grid_remove()
+            if self._refresh_job is not None:
+                self.after_cancel(self._refresh_job)
+                self._refresh_job = None
+
+    def _refresh(self) -> None:
+        """Réaffiche les métriques, puis se reprogramme tant que le panneau est déplié."""
+        self._refresh_job = None
+        if not self.expanded:
+            return
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("1.0", self.format_snapshot(self.metrics.snapshot()))
+        self.textbox.configure(state="disabled")
+        self._refresh_job = self.after(METRICS_REFRESH_MS, self._refresh)
+
+    @staticmethod
+    def format_snapshot(snapshot: dict) -> str:
+        """Met en forme les métriques pour l'affichage (latences en ms sur la fenêtre glissante)."""
+        histograms = {(item["name"], tuple(sorted(item["labels"].items()))): item for item in snapshot["histograms"]}
+        counters = {(item["name"], tuple(sorted(item["labels"].items()))): item["value"] for item in snapshot["counters"]}
+
+        def row(label: str, item: Optional[dict]) -> str:
+            if item is None:
+                return f"{label:<36}{'-':>8}"
+            return (f"{label:<36}{item['window_count']:>8}{item['p50'] * 1000:>9.0f}"
+                    f"{item['p95'] * 1000:>9.0f}{item['p99'] * 1000:>9.0f}")
+
+        lines = [f"{'Étape atteinte':<36}{'n':>8}{'p50':>9}{'p95':>9}{'p99':>9}   "
+                 f"(ms depuis l'étape précédente, {snapshot['window_s'] / 60:.0f} dernières minutes)"]
+        for stage in STAGES[1:]:
+            lines.append(row(METRICS_STAGE_LABELS[stage], histograms.get(("stage_seconds", (("stage", stage),)))))
+        lines.append(row("total (lu → affiché)", histograms.get(("message_seconds", ()))))
+
+        lines.append("")
+        lines.append(f"{'Appels moteur':<36}{'n':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'erreurs':>9}")
+        for (name, labels), item in sorted(histograms.items()):
+            if name == "engine_call_seconds":
+                label_dict = dict(labels)
+                errors = counters.get(("api_errors_total", labels), 0)
+                lines.append(row(f"{label_dict['engine']} ({label_dict['kind']})", item) + f"{errors:>9.0f}")
+        for (name, labels), item in sorted(histograms.items()):
+            if name == "rate_limit_wait_seconds":
+                lines.append(row(f"attente limiteur {dict(labels)['engine']}", item))
+
+        hits = {dict(labels)["cache"]: value for (name, labels), value in counters.items() if name == "cache_hits_total"}
+        lines.append("")
+        lines.append(
+            f"Hits : cache {hits.get('translation', 0):.0f} · secours {hits.get('fallback', 0):.0f} · "
+            f"lexique {hits.get('phrasebook', 0):.0f} · "
+            f"verdicts {hits.get('verdict', 0):.0f} · fusionnés {hits.get('coalesced', 0):.0f} · "
+            f"ignorés {counters.get(('passthrough_total', ()), 0):.0f} · "
+            f"périmés {counters.get(('stale_messages_total', ()), 0):.0f} · en cours {snapshot['in_flight']}"
+        )
+        return "\n".join(lines)
+
+
 class App(customtkinter.CTk):
     """Classe principale de l'application CS Translator."""
 
@@ -291,9 +410,15 @@ class App(customtkinter.CTk):
         self.message_queue: Queue = Queue()
         self.stop_listening: threading.Event = threading.Event()
         self.listening_thread: Optional[threading.Thread] = None
+        self.pipeline: Optional[TranslationPipeline] = None
+        self.metrics_exporter: Optional[MetricsExporter] = None
+        # Boucle asyncio et clients HTTP des moteurs, partagés par toutes les sessions d'écoute
+        self.engines = EnginePool()
 
         self._setup_ui()
         self._check_message_queue()
+        # Les SDK des moteurs ne sont importés qu'à l'usage : on les précharge une fois la fenêtre affichée
+        self.after(PREWARM_DELAY_MS, self._prewarm_engines)
 
     def _setup_ui(self) -> None:
         """Configure la grille et crée tous les widgets de l'interface."""
@@ -319,16 +444,26 @@ class App(customtkinter.CTk):
         )
         self.play_button.grid(row=1, column=0, pady=(0, 10))
 
+        # Nombre de messages en attente de traduction (reste à 0 en temps normal, grimpe pendant les vagues de spam)
+        self.queue_label = customtkinter.CTkLabel(top_frame, text="", font=FONT_INFO, text_color=COLOR_INFO_TEXT)
+        self.queue_label.grid(row=2, column=0, pady=(0, 5))
+
     def _create_chat_section(self) -> None:
         """Crée la zone de chat et le bouton pour l'effacer."""
-        self.chat_frame = customtkinter.CTkScrollableFrame(self)
-        self.chat_frame.grid(row=1, column=0, padx=10, pady=(10, 0), sticky="nsew")
+        self.chat_view = ChatView(
+            self, font=FONT_LABEL,
+            colors={"player": COLOR_PLAYER_NAME, "error": COLOR_ERROR, "info": COLOR_INFO_TEXT}
+        )
+        self.chat_view.grid(row=1, column=0, padx=10, pady=(10, 0), sticky="nsew")
 
         customtkinter.CTkButton(
             self, text="Effacer l'historique", command=self.clear_chat,
             fg_color=COLOR_BUTTON_GENERIC, hover_color=COLOR_BUTTON_GENERIC_HOVER
         ).grid(row=2, column=0, padx=10, pady=10, sticky="ew")
 
+        self.metrics_panel = MetricsPanel(self)
+        self.metrics_panel.grid(row=3, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="ew")
+
     def _create_config_panel(self) -> None:
         """Instancie et positionne le panneau de configuration."""
         self.config_panel = ConfigPanel(self)
@@ -343,109 +478,184 @@ class App(customtkinter.CTk):
 
     def start_listening(self) -> None:
         """Démarre le processus d'écoute dans un thread séparé."""
+        if self.listening_thread is not None and self.listening_thread.is_alive():
+            # La session précédente se termine encore (le bouton est désactivé jusque-là)
+            return
         self.is_playing = True
-        self.stop_listening.clear()
+        # Un événement par session : relancer l'écoute ne doit pas réveiller le worker de la session précédente
+        self.stop_listening = threading.Event()
         self.play_button.configure(text="Stopper l'écoute", fg_color=COLOR_RED_NORMAL, hover_color=COLOR_RED_HOVER)
         self.config_panel.set_enabled(False)
 
         config = self.config_panel.get_config_data()
-        self.listening_thread = threading.Thread(target=self._listening_worker, args=(config,), daemon=True)
+        self.chat_view.history_limit = config.get("chat_history_limit", DEFAULT_HISTORY_LIMIT)
+        self.chat_view.reset_streaming()
+        if config.get("metrics_port") or config.get("metrics_file"):
+            self.metrics_exporter = MetricsExporter(
+                METRICS, config.get("metrics_port"), config.get("metrics_file"),
+                config.get("metrics_export_interval_s", DEFAULT_EXPORT_INTERVAL)
+            )
+            self.metrics_exporter.start()
+        self.listening_thread = threading.Thread(target=self._listening_worker, args=(config, self.stop_listening), daemon=True)
         self.listening_thread.start()
 
     def stop_listening_process(self) -> None:
-        """Arrête le processus d'écoute."""
+        """
+        Arrête le processus d'écoute. Le bouton reste désactivé tant que le worker n'a pas fini de
+        fermer sa session (pipeline, traducteur), pour qu'une relance ne la chevauche jamais.
+        """
         self.is_playing = False
         self.stop_listening.set()
-        self.play_button.configure(text="Débuter l'écoute", fg_color=COLOR_GREEN_NORMAL, hover_color=COLOR_GREEN_HOVER)
+        worker_running = self.listening_thread is not None and self.listening_thread.is_alive()
+        self.play_button.configure(
+            text="Arrêt en cours..." if worker_running else "Débuter l'écoute",
+            state="disabled" if worker_running else "normal",
+            fg_color=COLOR_GREEN_NORMAL, hover_color=COLOR_GREEN_HOVER
+        )
         self.config_panel.set_enabled(True)
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+            self.metrics_exporter = None
+
+    def _on_listening_worker_exit(self, stop_event: threading.Event) -> None:
+        """Appelé dans le thread de l'UI quand un worker d'écoute a terminé."""
+        if stop_event is self.stop_listening and self.is_playing:
+            # Le worker s'est arrêté de lui-même (log introuvable, erreur) : on ferme la session courante
+            self.stop_listening_process()
+        self.play_button.configure(text="Débuter l'écoute", state="normal")
 
-    def _listening_worker(self, config: dict) -> None:
-        """Worker exécuté en arrière-plan pour lire et traiter le fichier de log."""
+    def _listening_worker(self, config: dict, stop_event: threading.Event) -> None:
+        """Worker exécuté en arrière-plan pour lire le fichier de log et alimenter le pipeline de traduction."""
         log_path = os.path.join(config["cs_path"], "game", "csgo", "console.log")
 
-        translator = Translator(config) # On fait l'instance du traducteur ici pour qu'il garde le cache en mémoire
+        translator = Translator(config, self.engines) # On fait l'instance du traducteur ici pour qu'il garde le cache en mémoire
+        parser = ChatParser(config.get("chat_locales"), {**CHAT_GRAMMAR, **config.get("chat_grammar", {})})
+        pipeline = TranslationPipeline(
+            translator, self.message_queue,
+            workers=config.get("translation_workers", DEFAULT_WORKERS),
+            ordered=config.get("ordered_output", True),
+            parser=parser,
+            max_staleness=config.get("max_staleness_s", DEFAULT_MAX_STALENESS),
+            drop_stale=config.get("drop_stale_messages", False)
+        )
+        pipeline.start()
+        self.pipeline = pipeline
 
         try:
-            for line in follow_log(log_path, self.stop_listening):
+            for line in follow_log(log_path, stop_event, chat_only=True, parser=parser):
                 if line.startswith("ERROR_FILENOTFOUND:"):
                     path = line.split(":", 1)[1]
-                    self.message_queue.put(("ERREUR", f"Log file not found: {path}", False, None, True))
+                    self.message_queue.put(("ERREUR", f"Log file not found: {path}", False, None, True, False))
                     break
 
-                processed_data = process_log_line(line, translator)
-                if processed_data:
-                    self.message_queue.put(processed_data)
+                pipeline.submit_line(line)
 
         except Exception as e:
-            print(f"An unexpected error occurred in the listening worker: {e}")
-            self.message_queue.put(("ERREUR", f"Unexpected error: {e}", False, None, True))
+            logger.exception("An unexpected error occurred in the listening worker: %s", e)
+            self.message_queue.put(("ERREUR", f"Unexpected error: {e}", False, None, True, False))
         finally:
-            self.after(0, self.stop_listening_process)
+            if self.pipeline is pipeline:
+                self.pipeline = None
+            pipeline.stop()
+            logger.info("Pipeline stats: %s", pipeline.stats())
+            logger.info("Translation cache stats: %s", translator.cache_stats())
+            logger.info("Rate limiter stats: %s", translator.rate_limit_stats())
+            logger.info("Batching stats: %s", translator.batch_stats())
+            logger.info("Routing stats: %s", translator.routing_stats())
+            logger.info("Engine usage: %s", translator.usage_stats())
+            translator.close()
+            self.after(0, self._on_listening_worker_exit, stop_event)
+
+    def _prewarm_engines(self) -> None:
+        """Précharge en arrière-plan les SDK du moteur sélectionné et de Google (détection de langue)."""
+        if not self.config_panel.get_config_data().get("prewarm_engines", True):
+            return
+        engines = [self.config_panel.translator_var.get(), GOOGLE_ENGINE]
+        threading.Thread(target=self.engines.prewarm, args=(engines,), name="engine-prewarm", daemon=True).start()
 
     def _check_message_queue(self) -> None:
-        """Vérifie la queue de messages et met à jour l'UI."""
+        """
+        Vide la queue de messages par lots et met à jour l'UI.
+
+        Le nombre de messages traités par passage s'adapte au retard : on draine tant que le budget
+        de temps d'une frame n'est pas écoulé, on affiche le lot en une passe, et on revient à la frame
+        suivante si des messages attendent encore (sinon toutes les 100 ms).
+        """
+        deadline = time.perf_counter() + FRAME_BUDGET
+        rows: List[ChatRow] = []
         try:
-            for _ in range(10):  # Traiter max 10 messages par cycle pour ne pas bloquer l'UI (en cas de vague de spam)
-                data_tuple = self.message_queue.get_nowait()
-                self.add_chat_message(*data_tuple)
+            while len(rows) < MAX_MESSAGES_PER_FRAME and time.perf_counter() < deadline:
+                rows.append(self._to_chat_row(*self.message_queue.get_nowait()))
         except Empty:
             pass
         finally:
-            self.after(100, self._check_message_queue)
-
-    def add_chat_message(self, player_name: str, message: str, was_translated: bool, original_lang: Optional[str], is_error: bool, from_cache: bool) -> None:
+            if rows:
+                self.chat_view.add_rows(rows)
+                for row in rows:
+                    if row.entry_id is not None and not row.partial:
+                        METRICS.mark("rendered", row.entry_id)
+            self._update_queue_depth()
+            self.after(FRAME_INTERVAL_MS if not self.message_queue.empty() else IDLE_POLL_MS, self._check_message_queue)
+
+    def _update_queue_depth(self) -> None:
+        """Affiche le nombre de messages en attente de traduction."""
+        pipeline = self.pipeline
+        text = f"En attente de traduction : {pipeline.pending()}" if pipeline is not None else ""
+        # On ne reconfigure le label que si le texte change (appelé toutes les 100 ms)
+        if text != self.queue_label.cget("text"):
+            self.queue_label.configure(text=text)
+
+    def add_chat_message(self, player_name: str, message: str, was_translated: bool, original_lang: Optional[str], is_error: bool,
+                         from_cache: bool, source: Optional[str] = None, entry_id: Optional[TraceId] = None,
+                         partial: bool = False) -> None:
         """Ajoute un message formaté dans la zone de chat."""
-        msg_frame = customtkinter.CTkFrame(self.chat_frame, corner_radius=8)
-        msg_frame.grid(sticky="ew", pady=5, padx=5)
-        msg_frame.grid_columnconfigure(0, weight=1)
-
-        display_name = "[ERREUR]" if is_error else player_name
-        next_row = 0
-
-        customtkinter.CTkLabel(
-            msg_frame, text=display_name, font=FONT_LABEL_BOLD, text_color=COLOR_ERROR if is_error else COLOR_PLAYER_NAME
-        ).grid(row=next_row, column=0, sticky="w", padx=10, pady=(5, 0))
-        next_row += 1
-
-        if was_translated:
-            translator = self.config_panel.translator_var.get()
-            # On vérifie la premiere lettre pour savoir si c'est une voyelle, dans quel cas on ajoute "l'" au lieu de "le"
-            if original_lang:
-                if original_lang.lower().startswith(("a", "e", "i", "o", "u", "y")):
-                    original_lang = f"l'{original_lang}"
-                else:
-                    original_lang = f"le {original_lang}"
-
-                lang_info = f" (Depuis {original_lang})"
-            else:
-                lang_info = ""
-
-            trad_text = f"Traduit par {translator}{lang_info}"
-            # On remplace par la mention du cache si nécessaire
-            if from_cache:
-                trad_text = " (Depuis le cache)"
+        self.chat_view.add_rows([self._to_chat_row(
+            player_name, message, was_translated, original_lang, is_error, from_cache, source, entry_id, partial
+        )])
+
+    def _to_chat_row(self, player_name: str, message: str, was_translated: bool, original_lang: Optional[str], is_error: bool,
+                     from_cache: bool, source: Optional[str] = None, entry_id: Optional[TraceId] = None,
+                     partial: bool = False) -> ChatRow:
+        """
+        Met en forme un message de la queue pour la vue de chat.
+
+        Un message identifié par `entry_id` peut d'abord arriver en traductions partielles (streaming) :
+        la même entrée est alors mise à jour sur place jusqu'au résultat final.
+        """
+        if partial:
+            info = f"Traduction en cours par {source or self.config_panel.translator_var.get()}..."
+        elif was_translated:
+            info = self._translation_info(original_lang, from_cache, source)
+        else:
+            info = None
+        return ChatRow(entry_id, player_name, is_error, info, message, partial)
 
-            customtkinter.CTkLabel(
-                msg_frame, text=trad_text, font=FONT_INFO, text_color=COLOR_INFO_TEXT, justify="left"
-            ).grid(row=next_row, column=0, sticky="w", padx=10, pady=(0, 5))
-            next_row += 1
+    def _translation_info(self, original_lang: Optional[str], from_cache: bool, source: Optional[str]) -> str:
+        """Construit la mention "Traduit par ..." affichée au-dessus d'un message traduit."""
+        # On remplace par la mention du cache si nécessaire
+        if from_cache:
+            return " (Depuis le cache)"
 
-        customtkinter.CTkLabel(
-            msg_frame, text=message, font=FONT_LABEL, wraplength=self.chat_frame.winfo_width() - 50, justify="left"
-        ).grid(row=next_row, column=0, sticky="w", padx=10, pady=(0, 5))
+        if source == PHRASEBOOK_SOURCE:
+            translator = "le lexique"
+        else:
+            translator = source or self.config_panel.translator_var.get()
+        # On vérifie la premiere lettre pour savoir si c'est une voyelle, dans quel cas on ajoute "l'" au lieu de "le"
+        if original_lang:
+            if original_lang.lower().startswith(("a", "e", "i", "o", "u", "y")):
+                original_lang = f"l'{original_lang}"
+            else:
+                original_lang = f"le {original_lang}"
 
-        self.after(10, self._scroll_to_bottom)
+            lang_info = f" (Depuis {original_lang})"
+        else:
+            lang_info = ""
 
-    def _scroll_to_bottom(self):
-        """Scrolle la zone de chat tout en bas."""
-        self.chat_frame._parent_canvas.update_idletasks()
-        self.chat_frame._parent_canvas.yview_moveto(1.0)
+        return f"Traduit par {translator}{lang_info}"
 
     def clear_chat(self) -> None:
         """Efface tous les messages de la zone de chat."""
-        for widget in self.chat_frame.winfo_children():
-            widget.destroy()
-        self.chat_frame._parent_canvas.yview_moveto(0.0)
+        self.chat_view.clear()
 
     def on_closing(self) -> None:
         """Gère la fermeture propre de l'application."""
@@ -453,10 +663,15 @@ class App(customtkinter.CTk):
             self.stop_listening_process()
         if self.listening_thread and self.listening_thread.is_alive():
             self.listening_thread.join(timeout=1.0)
+        self.engines.close()
         self.destroy()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=os.environ.get("CS_TRANSLATOR_LOG_LEVEL", DEFAULT_LOG_LEVEL).upper(),
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    )
     app = App()
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
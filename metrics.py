@@ -0,0 +1,351 @@
+# metrics.py
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Étapes successives d'un message, de la lecture du log à l'affichage
+STAGES = ("read", "parsed", "detected", "queued_engine", "translated", "enqueued", "rendered")
+# Fenêtre glissante des percentiles, en secondes, et nombre maximal d'échantillons conservés par série
+DEFAULT_WINDOW = 300.0
+MAX_SAMPLES = 5000
+# Nombre maximal de messages suivis en même temps (les plus anciens sont abandonnés)
+MAX_TRACES = 10_000
+# Quantiles publiés
+QUANTILES = (0.5, 0.95, 0.99)
+# Intervalle d'écriture du fichier d'export
+DEFAULT_EXPORT_INTERVAL = 10.0
+# Réactivité de l'arrêt du serveur HTTP (l'arrêt se fait depuis le thread de l'interface)
+SERVER_POLL_INTERVAL = 0.1
+
+# Identifiant d'une série : (nom, ((label, valeur), ...))
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+# Identifiant d'un message suivi : (session d'écoute, numéro de séquence dans le pipeline)
+TraceId = Tuple[int, int]
+
+
+def _series_key(name: str, labels: Dict[str, object]) -> SeriesKey:
+    """Identifiant d'une série (labels triés, valeurs converties en texte)."""
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    """Formate des labels au format Prometheus ({a="1",b="2"})."""
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class RollingHistogram:
+    """
+    Distribution de durées sur une fenêtre glissante : percentiles des `window` dernières secondes,
+    plus le nombre et la somme cumulés depuis le démarrage.
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW, max_samples: int = MAX_SAMPLES) -> None:
+        self.window = window
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float, now: float) -> None:
+        """Ajoute une mesure (en secondes)."""
+        self._samples.append((now, value))
+        self.count += 1
+        self.total += value
+
+    def summary(self, now: float) -> Dict[str, float]:
+        """Retourne les percentiles de la fenêtre et les totaux cumulés."""
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+        values = sorted(value for _, value in self._samples)
+        summary = {"count": self.count, "sum": self.total, "window_count": len(values)}
+        for quantile in QUANTILES:
+            rank = max(0, min(len(values) - 1, round(quantile * len(values)) - 1))
+            summary[f"p{int(quantile * 100)}"] = values[rank] if values else 0.0
+        return summary
+
+
+class Metrics:
+    """
+    Registre des métriques du traducteur : histogrammes glissants de durées, compteurs, et suivi
+    de chaque message à travers les étapes de `STAGES`.
+
+    Un message est identifié par sa session d'écoute (`new_session`) et son numéro de séquence dans le
+    pipeline, qui repart de zéro à chaque session. Chaque étape enregistre le
+    temps écoulé depuis l'étape précédente atteinte (les étapes sautées, comme la détection sur un hit
+    de cache, n'apparaissent pas) ; l'affichage enregistre aussi la latence totale du message.
+    Le code qui ne connaît pas le message (le traducteur) marque les étapes du message courant de son
+    thread, déclaré par le worker avec `set_current`.
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW) -> None:
+        self.window = window
+        self.started = time.time()
+        self._histograms: Dict[SeriesKey, RollingHistogram] = {}
+        self._counters: Dict[SeriesKey, float] = {}
+        # Messages suivis : identifiant -> (début, dernière étape atteinte, instant de cette étape)
+        self._traces: "OrderedDict[TraceId, Tuple[float, str, float]]" = OrderedDict()
+        self._sessions = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # --- Mesures génériques ---
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Enregistre une durée dans l'histogramme `name`."""
+        key = _series_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = RollingHistogram(self.window)
+            histogram.observe(seconds, time.monotonic())
+
+    def increment(self, name: str, amount: float = 1, **labels) -> None:
+        """Incrémente le compteur `name`."""
+        key = _series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def track_call(self, engine: str, kind: str = "translate") -> Iterator[None]:
+        """Compte un appel d'API et mesure sa durée ; une exception est comptée comme une erreur du moteur."""
+        self.increment("api_calls_total", engine=engine, kind=kind)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.increment("api_errors_total", engine=engine, kind=kind)
+            raise
+        finally:
+            self.observe("engine_call_seconds", time.perf_counter() - start, engine=engine, kind=kind)
+
+    # --- Suivi des messages ---
+
+    def new_session(self) -> int:
+        """Retourne un nouveau numéro de session, préfixe des identifiants de messages d'un pipeline."""
+        with self._lock:
+            self._sessions += 1
+            return self._sessions
+
+    def begin(self, trace_id: TraceId, at: Optional[float] = None) -> None:
+        """Commence le suivi d'un message (étape "read" ; `at` est un instant `time.perf_counter`)."""
+        at = time.perf_counter() if at is None else at
+        with self._lock:
+            self._traces[trace_id] = (at, STAGES[0], at)
+            self._traces.move_to_end(trace_id)
+            while len(self._traces) > MAX_TRACES:
+                self._traces.popitem(last=False)
+
+    def mark(self, stage: str, trace_id: Optional[TraceId] = None) -> None:
+        """
+        Enregistre l'arrivée d'un message à une étape (message courant du thread si `trace_id` est absent).
+        L'étape "rendered" termine le suivi du message. Sans message suivi, l'appel est ignoré.
+        """
+        trace_id = self.current() if trace_id is None else trace_id
+        if trace_id is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            trace = self._traces.get(trace_id)
+            if trace is None:
+                return
+            start, _, previous = trace
+            if stage == STAGES[-1]:
+                del self._traces[trace_id]
+            else:
+                self._traces[trace_id] = (start, stage, now)
+        self.observe("stage_seconds", now - previous, stage=stage)
+        if stage == STAGES[-1]:
+            self.observe("message_seconds", now - start)
+
+    def drop(self, trace_id: TraceId) -> None:
+        """Termine sans mesure le suivi d'un message qui ne sera jamais affiché (message périmé ignoré)."""
+        with self._lock:
+            self._traces.pop(trace_id, None)
+
+    def end_session(self, session: int) -> None:
+        """
+        Abandonne le suivi des messages de la session qui n'ont pas atteint l'interface (restés en file
+        ou en cours de traduction à l'arrêt du pipeline). Ceux déjà transmis restent suivis jusqu'à l'affichage.
+        """
+        with self._lock:
+            abandoned = [trace_id for trace_id, (_, stage, _) in self._traces.items()
+                         if trace_id[0] == session and stage != "enqueued"]
+            for trace_id in abandoned:
+                del self._traces[trace_id]
+
+    def set_current(self, trace_id: Optional[TraceId]) -> None:
+        """Déclare le message traité par le thread appelant (None une fois terminé)."""
+        self._local.trace_id = trace_id
+
+    def current(self) -> Optional[TraceId]:
+        """Retourne le message traité par le thread appelant, ou None."""
+        return getattr(self._local, "trace_id", None)
+
+    # --- Lecture et export ---
+
+    def snapshot(self) -> Dict[str, object]:
+        """Retourne l'état de toutes les métriques (structure sérialisable en JSON)."""
+        now = time.monotonic()
+        with self._lock:
+            histograms = [
+                {"name": name, "labels": dict(labels), **histogram.summary(now)}
+                for (name, labels), histogram in self._histograms.items()
+            ]
+            counters = [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in self._counters.items()]
+            in_flight = len(self._traces)
+        return {
+            "uptime_s": time.time() - self.started,
+            "window_s": self.window,
+            "in_flight": in_flight,
+            "histograms": histograms,
+            "counters": counters,
+        }
+
+    def to_json(self) -> str:
+        """Exporte les métriques en JSON."""
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+
+    def to_prometheus(self) -> str:
+        """Exporte les métriques au format texte Prometheus (histogrammes publiés comme des summaries)."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        typed = set()
+        for counter in sorted(snapshot["counters"], key=lambda item: item["name"]):
+            name = f"cs_translator_{counter['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(tuple(counter['labels'].items()))} {counter['value']}")
+        for histogram in sorted(snapshot["histograms"], key=lambda item: item["name"]):
+            name = f"cs_translator_{histogram['name']}"
+            labels = tuple(histogram["labels"].items())
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for quantile in QUANTILES:
+                value = histogram[f"p{int(quantile * 100)}"]
+                lines.append(f"{name}{_format_labels(labels, ('quantile', str(quantile)))} {value:.6f}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+        lines.append("# TYPE cs_translator_messages_in_flight gauge")
+        lines.append(f"cs_translator_messages_in_flight {snapshot['in_flight']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Remet toutes les métriques à zéro."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._traces.clear()
+        self.started = time.time()
+
+
+# Registre partagé par tous les modules
+METRICS = Metrics()
+
+
+class MetricsExporter:
+    """
+    Publie les métriques, au choix ou ensemble :
+      - sur un port HTTP local (127.0.0.1) : /metrics au format Prometheus, /metrics.json en JSON ;
+      - dans un fichier réécrit périodiquement (JSON si l'extension est .json, texte Prometheus sinon).
+    """
+
+    def __init__(self, metrics: Metrics = METRICS, port: Optional[int] = None, path: Optional[str] = None,
+                 interval: float = DEFAULT_EXPORT_INTERVAL) -> None:
+        """
+        Args:
+            metrics (Metrics): Le registre à publier.
+            port (Optional[int]): Port HTTP local (None = pas de serveur).
+            path (Optional[str]): Fichier d'export (None = pas de fichier).
+            interval (float): Intervalle d'écriture du fichier, en secondes.
+        """
+        self.metrics = metrics
+        self.port = port
+        self.path = path
+        self.interval = interval
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Démarre le serveur HTTP et/ou l'écriture périodique du fichier."""
+        if self.port:
+            try:
+                self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler_class())
+            except OSError as e:
+                logger.error("Metrics server could not listen on port %s: %s", self.port, e)
+            else:
+                self._threads.append(threading.Thread(
+                    target=self._server.serve_forever, args=(SERVER_POLL_INTERVAL,), name="metrics-http", daemon=True
+                ))
+                logger.info("Metrics available on http://127.0.0.1:%d/metrics", self.port)
+        if self.path:
+            self._threads.append(threading.Thread(target=self._write_loop, name="metrics-file", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def _handler_class(self):
+        """Crée la classe de gestionnaire HTTP liée à ce registre."""
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] == "/metrics":
+                    body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path.split("?")[0] == "/metrics.json":
+                    body, content_type = metrics.to_json(), "application/json; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args) -> None:
+                logger.debug("Metrics request: " + format, *args)
+
+        return Handler
+
+    def write_file(self) -> None:
+        """Écrit les métriques dans le fichier d'export (écriture atomique)."""
+        body = self.metrics.to_json() if self.path.lower().endswith(".json") else self.metrics.to_prometheus()
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(body)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("Metrics file %s could not be written: %s", self.path, e)
+
+    def _write_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write_file()
+
+    def stop(self) -> None:
+        """Arrête le serveur et écrit une dernière fois le fichier."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+        if self.path:
+            self.write_file()
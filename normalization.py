@@ -0,0 +1,50 @@
+# normalization.py
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional, Pattern, Union
+
+# Options par défaut, surchargeables via "cache_normalization" dans la config (false = ancienne clé strip + lower)
+DEFAULT_NORMALIZATION: Dict[str, Union[bool, int]] = {
+    "nfkc": True,                        # Formes Unicode équivalentes (pleine chasse, ligatures...) unifiées
+    "collapse_whitespace": True,         # Espaces multiples / insécables réduits à un seul espace
+    "max_repeat": 2,                     # Répétitions de 3+ caractères identiques ramenées à 2 ("cykaaa" -> "cykaa"), 0 = désactivé
+    "strip_trailing_punctuation": True,  # "CYKA BLYAT!!!" -> "cyka blyat"
+    "casefold": True,                    # Casse ignorée (y compris ß, ς...)
+}
+TRAILING_PUNCTUATION = ".!?¡¿…,;:~-_*"
+
+
+@lru_cache(maxsize=8)
+def _repeat_pattern(max_repeat: int) -> Pattern:
+    """Expression qui repère les séquences de plus de `max_repeat` caractères identiques."""
+    return re.compile(rf"(.)\1{{{max_repeat},}}", re.DOTALL)
+
+
+def normalize_message(text: str, options: Optional[Dict[str, Union[bool, int]]] = None) -> str:
+    """
+    Retourne la forme canonique d'un message de chat, utilisée pour les clés de cache et de déduplication.
+
+    Les variantes d'écriture d'un même message ("cyka blyat", "CYKA BLYAT!!!", "cyka  blyat")
+    partagent ainsi la même traduction. Le texte envoyé au moteur reste le message d'origine.
+
+    Args:
+        text (str): Le message brut.
+        options (Optional[Dict[str, Union[bool, int]]]): Options à surcharger (voir `DEFAULT_NORMALIZATION`).
+    """
+    opts = DEFAULT_NORMALIZATION if options is None else {**DEFAULT_NORMALIZATION, **options}
+    if opts["nfkc"]:
+        text = unicodedata.normalize("NFKC", text)
+    if opts["casefold"]:
+        text = text.casefold()
+    if opts["collapse_whitespace"]:
+        text = " ".join(text.split())
+    else:
+        text = text.strip()
+    if opts["max_repeat"]:
+        text = _repeat_pattern(opts["max_repeat"]).sub(lambda m: m.group(1) * opts["max_repeat"], text)
+    if opts["strip_trailing_punctuation"]:
+        # On garde la ponctuation si le message n'est fait que de ponctuation
+        text = text.rstrip(TRAILING_PUNCTUATION + " ") or text
+    return text
@@ -0,0 +1,85 @@
+# passthrough.py
+
+import re
+import string
+from collections import Counter
+from typing import Iterable, Optional
+
+# Domaines de premier niveau reconnus sans "http://" ni "www." : une liste fermée, pour que des mots
+# collés par un point ("gg.wp", "ez.noob") ne passent pas pour des liens
+# (les domaines qui sont aussi des mots courants, comme "to", "me" ou "no", n'en font pas partie)
+URL_TLDS = (
+    "com", "net", "org", "info", "io", "gg", "tv", "co", "xyz", "app", "dev", "link", "ly",
+    "eu", "uk", "ru", "ua", "by", "kz", "de", "fr", "ch", "nl", "pt", "br", "pl",
+    "cz", "se", "dk", "fi", "tr", "cn", "jp", "kr",
+)
+# Messages composés uniquement d'URL : schéma, "www." ou domaine de premier niveau connu
+URL_PATTERN = re.compile(
+    rf"(?:https?://|www\.)\S+|[\w-]+(?:\.[\w-]+)*\.(?:{'|'.join(URL_TLDS)})(?:[/:?#]\S*)?", re.IGNORECASE
+)
+# Spam d'un caractère répété ("ggggg", "!!!!") : au moins 4 fois le même caractère. Les motifs plus longs
+# ne sont pas retenus : "да да да", "no no no" ou "кукуку" sont de vrais messages à traduire
+REPEATED_PATTERN = re.compile(r"(.)\1{3,}", re.DOTALL)
+# Longueur minimale (hors espaces) d'un message pour être considéré comme du spam répété
+MIN_REPEATED_LENGTH = 4
+# Ponctuation retirée autour des mots avant la comparaison avec les mots bannis
+TOKEN_STRIP = string.punctuation + "¡¿…«»“”‘’"
+
+
+def _normalize(text: str) -> str:
+    """Forme canonique utilisée pour comparer un message aux mots bannis (casse et espaces ignorés)."""
+    return " ".join(text.casefold().split())
+
+
+class PassThroughIndex:
+    """
+    Index précompilé des messages à ne jamais envoyer à un moteur de traduction.
+
+    Construit une seule fois depuis la config : les mots bannis sont normalisés dans un ensemble,
+    ce qui permet de reconnaître un message banni en entier ("gg") comme un message composé
+    uniquement de mots bannis ("gg wp ez"). S'y ajoutent des classes intégrées : nombres seuls,
+    emoji/ponctuation seuls, URL et spam de caractères répétés.
+    """
+
+    def __init__(self, banned_words: Iterable[str] = (), builtin_classes: bool = True) -> None:
+        """
+        Args:
+            banned_words (Iterable[str]): Mots ou expressions à laisser tels quels.
+            builtin_classes (bool): Active les classes intégrées (nombres, symboles, URL, répétitions).
+        """
+        self.banned = {_normalize(word) for word in banned_words if word.strip()}
+        self.banned_tokens = {word for word in self.banned if " " not in word}
+        self.builtin_classes = builtin_classes
+        self.hits: Counter = Counter()
+
+    def match(self, message: str) -> Optional[str]:
+        """
+        Indique si un message doit être laissé tel quel.
+
+        Returns:
+            Optional[str]: La raison ("banned", "banned_tokens", "number", "symbols", "url", "repeated"), ou None.
+        """
+        reason = self._classify(message)
+        if reason:
+            self.hits[reason] += 1
+        return reason
+
+    def _classify(self, message: str) -> Optional[str]:
+        normalized = _normalize(message)
+        if normalized in self.banned:
+            return "banned"
+
+        tokens = [token for token in (word.strip(TOKEN_STRIP) for word in normalized.split()) if token]
+        if self.banned_tokens and tokens and all(token in self.banned_tokens for token in tokens):
+            return "banned_tokens"
+
+        if not self.builtin_classes:
+            return None
+        if not any(char.isalpha() for char in normalized):
+            return "number" if any(char.isdigit() for char in normalized) else "symbols"
+        if all(URL_PATTERN.fullmatch(word) for word in normalized.split()):
+            return "url"
+        compact = normalized.replace(" ", "")
+        if len(compact) >= MIN_REPEATED_LENGTH and REPEATED_PATTERN.fullmatch(compact):
+            return "repeated"
+        return None
@@ -0,0 +1,149 @@
+# phrasebook.py
+
+import glob
+import json
+import logging
+import os
+import sys
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from cache import DEFAULT_CACHE_PATH, PersistentCache
+from lang_data import LANG_CODES_TO_NAMES
+from normalization import normalize_message
+
+logger = logging.getLogger(__name__)
+
+# Packs de phrases livrés avec l'application, un fichier JSON par langue source :
+# {"lang": "ru", "phrases": {"спасибо": {"fr": "merci", "en": "thanks"}, ...}}
+PHRASE_PACKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "phrase_packs")
+# Nombre maximal d'entrées exportées depuis le cache par défaut
+DEFAULT_EXPORT_LIMIT = 500
+
+# Entrée du lexique : (traduction, code de la langue source)
+PhraseEntry = Tuple[str, str]
+
+
+class Phrasebook:
+    """
+    Lexique des phrases toutes faites du chat (salutations, insultes, callouts) pour une langue cible.
+
+    Les packs sont chargés une seule fois dans une table de hachage indexée par la forme normalisée
+    des phrases : une recherche coûte un accès dict, sans détection de langue ni appel réseau.
+    Une phrase présente dans deux langues avec des traductions différentes est écartée (ambiguë).
+    """
+
+    def __init__(self, target_language: str, normalize: Callable[[str], str] = normalize_message,
+                 directories: Optional[Iterable[str]] = None) -> None:
+        """
+        Args:
+            target_language (str): Code de la langue cible (ex: "FR").
+            normalize (Callable[[str], str]): Normalisation appliquée aux phrases, identique à celle des recherches.
+            directories (Optional[Iterable[str]]): Dossiers de packs à charger (`PHRASE_PACKS_DIR` par défaut).
+        """
+        self.target = target_language.lower()
+        self.normalize = normalize
+        self._phrases: Dict[str, PhraseEntry] = {}
+        self._ambiguous = set()
+        self.hits: Counter = Counter()
+        for directory in directories or [PHRASE_PACKS_DIR]:
+            self.load_directory(directory)
+
+    def load_directory(self, directory: str) -> int:
+        """Charge tous les packs d'un dossier. Retourne le nombre de phrases ajoutées."""
+        return sum(self.load_pack(path) for path in sorted(glob.glob(os.path.join(directory, "*.json"))))
+
+    def load_pack(self, path: str) -> int:
+        """Charge un pack (seules les traductions vers la langue cible sont gardées). Retourne le nombre de phrases ajoutées."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                pack = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Phrase pack %s could not be loaded: %s", path, e)
+            return 0
+
+        added = 0
+        for phrase, translations in pack.get("phrases", {}).items():
+            translation = translations.get(self.target)
+            if translation and self._add(self.normalize(phrase), translation, pack["lang"]):
+                added += 1
+        logger.debug("Phrase pack %s: %d phrase(s) loaded", path, added)
+        return added
+
+    def _add(self, key: str, translation: str, lang: str) -> bool:
+        """Ajoute une phrase, ou l'écarte si elle entre en conflit avec une autre langue."""
+        if key in self._ambiguous:
+            return False
+        existing = self._phrases.get(key)
+        if existing is None:
+            self._phrases[key] = (translation, lang)
+            return True
+        if existing[0] != translation:
+            del self._phrases[key]
+            self._ambiguous.add(key)
+        return False
+
+    def lookup(self, normalized: str) -> Optional[PhraseEntry]:
+        """Retourne (traduction, langue source) pour un message déjà normalisé, ou None."""
+        entry = self._phrases.get(normalized)
+        if entry is not None:
+            self.hits[entry[1]] += 1
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._phrases)
+
+
+def write_pack(path: str, lang: str, phrases: Dict[str, Dict[str, str]]) -> None:
+    """Écrit un pack de phrases, une phrase par ligne pour rester lisible et facile à relire en diff."""
+    lines = [f"  {json.dumps(phrase, ensure_ascii=False)}: {json.dumps(translations, ensure_ascii=False)}"
+             for phrase, translations in phrases.items()]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{\n "lang": %s,\n "phrases": {\n%s\n }\n}\n' % (json.dumps(lang), ",\n".join(lines)))
+
+
+def export_from_cache(lang: str, target_language: str, output_path: str, cache_path: str = DEFAULT_CACHE_PATH,
+                      limit: int = DEFAULT_EXPORT_LIMIT) -> int:
+    """
+    Crée (ou complète) un pack de phrases à partir des traductions les plus récemment utilisées du cache.
+
+    Args:
+        lang (str): Code de la langue source à exporter (ex: "ru").
+        target_language (str): Code de la langue cible des traductions (ex: "FR").
+        output_path (str): Fichier du pack à écrire ; s'il existe déjà, ses phrases sont conservées.
+        cache_path (str): Base de cache à lire.
+        limit (int): Nombre maximal de phrases exportées.
+
+    Returns:
+        int: Le nombre de phrases ajoutées au pack.
+    """
+    phrases: Dict[str, Dict[str, str]] = {}
+    if os.path.exists(output_path):
+        with open(output_path, "r", encoding="utf-8") as f:
+            phrases = json.load(f).get("phrases", {})
+
+    lang_name = LANG_CODES_TO_NAMES.get(lang, lang)
+    target = target_language.lower()
+    added = 0
+    cache = PersistentCache(cache_path)
+    try:
+        for (message, _, _), (text, translated, source_lang) in cache.entries(target_language.upper()):
+            if added >= limit:
+                break
+            if translated and source_lang == lang_name and target not in phrases.get(message, {}):
+                phrases.setdefault(message, {})[target] = text
+                added += 1
+    finally:
+        cache.close()
+
+    write_pack(output_path, lang, phrases)
+    return added
+
+
+if __name__ == "__main__":
+    # Exporte les traductions du cache vers un pack :
+    # python phrasebook.py <langue source> <langue cible> [fichier de sortie] [base de cache]
+    source, target_lang = sys.argv[1], sys.argv[2]
+    output = sys.argv[3] if len(sys.argv) > 3 else os.path.join(PHRASE_PACKS_DIR, f"{source}_cache.json")
+    count = export_from_cache(source, target_lang, output, sys.argv[4] if len(sys.argv) > 4 else DEFAULT_CACHE_PATH)
+    print(f"{count} phrase(s) exported to {output}")
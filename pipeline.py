@@ -0,0 +1,192 @@
+# pipeline.py
+
+import logging
+import threading
+import time
+from queue import Queue
+from typing import Dict, List, Optional, Tuple
+
+from extraction import DEFAULT_PARSER, ChatParser, translate_chat_message
+from metrics import METRICS
+from scheduler import DEFAULT_MAX_STALENESS, MessageScheduler, ScheduledMessage
+from translation import Translator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 200
+# Délai maximal d'attente d'une place dans la file avant de revérifier l'arrêt
+SUBMIT_POLL_INTERVAL = 0.25
+
+
+class TranslationPipeline:
+    """
+    Pipeline de traduction concurrent.
+
+    La lecture et le parsing alimentent une file de travail bornée à priorités (`MessageScheduler` :
+    chat d'équipe d'abord, nouveaux joueurs ensuite, messages périmés affichés sans traduction ou ignorés) ;
+    un pool de workers traite détection et traduction en parallèle. Par défaut une étape de sortie remet les
+    résultats dans l'ordre d'arrivée des messages avant de les pousser vers la queue de l'UI,
+    sinon chaque message est affiché dès qu'il est prêt.
+
+    Les éléments poussés vers l'UI sont les arguments de `App.add_chat_message` suivis de l'identifiant
+    du message (session, numéro de séquence) et d'un drapeau "partiel" : les traductions streamées
+    mettent à jour la même entrée. Le numéro de session rend les identifiants uniques d'un pipeline à l'autre.
+    En mode ordonné, seuls les partiels du message en tête de sortie sont transmis, pour ne pas
+    afficher un message avant ses prédécesseurs.
+    """
+
+    def __init__(self, translator: Translator, output_queue: Queue, workers: int = DEFAULT_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING, ordered: bool = True, parser: Optional[ChatParser] = None,
+                 max_staleness: Optional[float] = DEFAULT_MAX_STALENESS, drop_stale: bool = False) -> None:
+        """
+        Initialise le pipeline (les workers ne sont lancés que par `start`).
+
+        Args:
+            translator (Translator): Le traducteur partagé par les workers.
+            output_queue (Queue): Queue de sortie vers l'interface.
+            workers (int): Nombre de traductions menées en parallèle.
+            max_pending (int): Taille maximale de la file de travail (contre-pression sur la lecture).
+            ordered (bool): Conserver l'ordre des messages en sortie (sinon affichage dès que prêt).
+            parser (Optional[ChatParser]): Parser des lignes de chat (toutes les langues de client par défaut).
+            max_staleness (Optional[float]): Attente maximale d'un message avant traduction, en secondes (None = illimitée).
+            drop_stale (bool): Ignorer les messages périmés au lieu de les afficher sans traduction.
+        """
+        self.translator = translator
+        self.parser = parser or DEFAULT_PARSER
+        self.output_queue = output_queue
+        self.ordered = ordered
+        self.drop_stale = drop_stale
+        self.scheduler = MessageScheduler(max_pending, max_staleness)
+        self._workers: List[threading.Thread] = [
+            threading.Thread(target=self._worker_loop, name=f"translation-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        self._stopped = threading.Event()
+        self.session = METRICS.new_session()
+        self._next_sequence = 0
+        # Étape de sortie ordonnée : résultats terminés en attente de leurs prédécesseurs
+        self._output_lock = threading.Lock()
+        self._next_to_emit = 0
+        self._completed: Dict[int, Tuple] = {}
+
+    def start(self) -> None:
+        """Lance les workers."""
+        for worker in self._workers:
+            worker.start()
+
+    def submit_line(self, line: str) -> bool:
+        """
+        Parse une ligne de log et, s'il s'agit d'un message de chat, le met en file de traduction.
+
+        Returns:
+            bool: True si la ligne a été mise en file.
+        """
+        read_at = time.perf_counter()
+        chat = self.parser.parse(line)
+        if chat is None:
+            return False
+        return self.submit(chat.player, chat.message, chat.channel, read_at)
+
+    def submit(self, player_name: str, message: str, channel: str = "all", read_at: Optional[float] = None) -> bool:
+        """
+        Met un message de chat en file de traduction (bloque si la file est pleine).
+
+        Args:
+            player_name (str): Le joueur.
+            message (str): Le message.
+            channel (str): Le canal ("team" est prioritaire sur "all").
+            read_at (Optional[float]): Instant de lecture de la ligne (`time.perf_counter`), pour les métriques.
+
+        Returns:
+            bool: True si le message a été mis en file, False si le pipeline est arrêté.
+        """
+        # Le suivi commence avant la mise en file : un worker peut prendre le message immédiatement
+        METRICS.begin((self.session, self._next_sequence), read_at)
+        if read_at is not None:
+            METRICS.mark("parsed", (self.session, self._next_sequence))
+        item = ScheduledMessage(self._next_sequence, player_name, message, channel)
+        while not self._stopped.is_set():
+            if self.scheduler.put(item, timeout=SUBMIT_POLL_INTERVAL):
+                self._next_sequence += 1
+                return True
+        return False
+
+    def _worker_loop(self) -> None:
+        """Boucle d'un worker : traduit les messages de la file jusqu'à l'arrêt."""
+        while not self._stopped.is_set():
+            scheduled = self.scheduler.get()
+            if scheduled is None or self._stopped.is_set():
+                return
+            item, stale = scheduled
+            sequence, player_name, message = item.sequence, item.player, item.message
+            if stale:
+                # Message d'un round probablement terminé : pas d'appel moteur
+                logger.debug("Stale message from %s not translated: %s", player_name, message)
+                METRICS.increment("stale_messages_total")
+                if self.drop_stale:
+                    METRICS.drop((self.session, sequence))
+                self._emit(sequence, None if self.drop_stale else (player_name, message, False, None, False, False, None))
+                continue
+            on_partial = lambda text, seq=sequence, name=player_name: self._emit_partial(seq, name, text)
+            METRICS.set_current((self.session, sequence))
+            try:
+                result = translate_chat_message(player_name, message, self.translator, on_partial)
+            except Exception as e:
+                logger.exception("Translation worker failed on '%s': %s", message, e)
+                result = ("ERREUR", f"Unexpected error: {e}", False, None, True, False, None)
+            finally:
+                METRICS.set_current(None)
+            if result[2]:
+                self.scheduler.mark_seen(player_name)
+            self._emit(sequence, result)
+
+    def _emit_partial(self, sequence: int, player_name: str, text: str) -> None:
+        """Pousse une traduction partielle vers l'UI si elle peut être affichée sans casser l'ordre."""
+        if self._stopped.is_set():
+            return
+        update = (player_name, text, True, None, False, False, self.translator.engine, (self.session, sequence), True)
+        if not self.ordered:
+            self.output_queue.put(update)
+            return
+        with self._output_lock:
+            if sequence == self._next_to_emit:
+                self.output_queue.put(update)
+
+    def _emit(self, sequence: int, result: Optional[Tuple]) -> None:
+        """
+        Pousse un résultat vers l'UI, en respectant l'ordre d'arrivée si demandé.
+        Un résultat None (message ignoré) libère seulement sa place dans l'ordre de sortie.
+        """
+        if self._stopped.is_set():
+            return
+        if not self.ordered:
+            if result is not None:
+                self.output_queue.put(result + ((self.session, sequence), False))
+                METRICS.mark("enqueued", (self.session, sequence))
+            return
+        with self._output_lock:
+            self._completed[sequence] = result
+            while self._next_to_emit in self._completed:
+                ready = self._completed.pop(self._next_to_emit)
+                if ready is not None:
+                    self.output_queue.put(ready + ((self.session, self._next_to_emit), False))
+                    METRICS.mark("enqueued", (self.session, self._next_to_emit))
+                self._next_to_emit += 1
+
+    def pending(self) -> int:
+        """Nombre de messages en attente de traduction."""
+        return len(self.scheduler)
+
+    def stats(self) -> Dict[str, int]:
+        """Retourne le nombre de messages en attente et de messages périmés non traduits."""
+        return {"pending": len(self.scheduler), "stale": self.scheduler.stale}
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        """Arrête le pipeline : les messages encore en file sont abandonnés."""
+        self._stopped.set()
+        self.scheduler.close()
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.join(timeout)
+        METRICS.end_session(self.session)
@@ -0,0 +1,149 @@
+# rate_limit.py
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from engines import DEEPL_ENGINE, GEMINI_ENGINE, GOOGLE_ENGINE
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Débit (requêtes/s) et rafale par défaut de chaque moteur, surchargeables via "rate_limits" dans la config
+DEFAULT_RATE_LIMITS = {
+    GOOGLE_ENGINE: {"rate": 3.0, "burst": 6},
+    DEEPL_ENGINE: {"rate": 5.0, "burst": 10},
+    GEMINI_ENGINE: {"rate": 0.5, "burst": 5},
+}
+INITIAL_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe : `rate` jetons par seconde, au plus `burst` jetons accumulés.
+
+    Chaque appelant réserve son jeton sous verrou puis dort hors verrou : plusieurs workers
+    peuvent attendre en même temps sans se bloquer mutuellement.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """
+        Args:
+            rate (float): Nombre de jetons regagnés par seconde.
+            burst (int): Capacité maximale du seau.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Réserve un jeton et retourne le délai à attendre avant de pouvoir l'utiliser (en secondes)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            # Jetons négatifs = dette : on attend le temps de la rembourser
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class RateLimiter:
+    """
+    Limiteur de débit d'un moteur : token bucket plus backoff adaptatif.
+
+    Quand le service répond 429 ou quota dépassé, le backoff double (jusqu'à `MAX_BACKOFF`)
+    et bloque tous les appels jusqu'à son expiration ; il se réinitialise au premier succès.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int) -> None:
+        """
+        Args:
+            name (str): Nom du moteur (pour les logs).
+            rate (float): Débit soutenu autorisé, en requêtes par seconde.
+            burst (int): Nombre de requêtes autorisées d'un coup après une période calme.
+        """
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self._lock = threading.Lock()
+        self._backoff = 0.0
+        self._blocked_until = 0.0
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttle_events = 0
+
+    def acquire(self) -> float:
+        """
+        Attend l'autorisation d'envoyer une requête.
+
+        Returns:
+            float: Temps d'attente effectif, en secondes.
+        """
+        wait = self.bucket.reserve()
+        with self._lock:
+            wait = max(wait, self._blocked_until - time.monotonic())
+            self.requests += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        METRICS.observe("rate_limit_wait_seconds", max(0.0, wait), engine=self.name)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def report_success(self) -> None:
+        """Signale une requête réussie : le backoff est levé."""
+        if self._backoff:
+            with self._lock:
+                self._backoff = 0.0
+
+    def report_throttled(self) -> None:
+        """Signale un refus du service (429 / quota) : le backoff est doublé."""
+        with self._lock:
+            self._backoff = min(MAX_BACKOFF, self._backoff * 2 if self._backoff else INITIAL_BACKOFF)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + self._backoff)
+            self.throttle_events += 1
+        logger.warning("%s is throttling requests, backing off for %.1f s", self.name, self._backoff)
+
+    def metrics(self) -> Dict[str, float]:
+        """Retourne les métriques du limiteur (attentes et événements de throttling)."""
+        return {
+            "requests": self.requests,
+            "total_wait": self.total_wait,
+            "avg_wait": self.total_wait / self.requests if self.requests else 0.0,
+            "max_wait": self.max_wait,
+            "throttle_events": self.throttle_events,
+            "backoff": self._backoff,
+        }
+
+
+class RateLimiterRegistry:
+    """Un `RateLimiter` par moteur, créé au premier usage avec les limites par défaut ou celles de la config."""
+
+    def __init__(self, overrides: Optional[Dict[str, Dict[str, float]]] = None) -> None:
+        """
+        Args:
+            overrides (Optional[Dict[str, Dict[str, float]]]): Limites par moteur, ex: {"DeepL": {"rate": 2, "burst": 4}}.
+        """
+        self.overrides = overrides or {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, engine_name: str) -> RateLimiter:
+        """Retourne le limiteur du moteur demandé."""
+        with self._lock:
+            limiter = self._limiters.get(engine_name)
+            if limiter is None:
+                limits = {**DEFAULT_RATE_LIMITS.get(engine_name, DEFAULT_RATE_LIMITS[GOOGLE_ENGINE]),
+                          **self.overrides.get(engine_name, {})}
+                limiter = RateLimiter(engine_name, float(limits["rate"]), int(limits["burst"]))
+                self._limiters[engine_name] = limiter
+            return limiter
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Retourne les métriques de tous les limiteurs créés."""
+        with self._lock:
+            return {name: limiter.metrics() for name, limiter in self._limiters.items()}
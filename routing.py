@@ -0,0 +1,233 @@
+# routing.py
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from engines import EngineError
+
+logger = logging.getLogger(__name__)
+
+# Délai sans réponse du moteur principal avant d'envoyer le même message au moteur suivant (hedging)
+DEFAULT_HEDGE_AFTER = 0.8
+# Poids des nouvelles mesures dans les moyennes mobiles exponentielles (EWMA) de santé
+HEALTH_ALPHA = 0.2
+# En dessous de ce score de santé, un moteur est considéré dégradé et passe après les autres
+DEGRADED_SCORE = 0.5
+# Un moteur dégradé est retenté en priorité après ce délai, pour détecter son rétablissement
+PROBE_INTERVAL = 30.0
+# Un moteur dont le quota est épuisé est écarté pendant cette durée
+QUOTA_COOLDOWN = 600.0
+ROUTER_THREADS = 8
+
+
+class EngineHealth:
+    """
+    Santé d'un moteur : moyennes mobiles exponentielles du taux de succès et de la latence.
+
+    Le score vaut 1 pour un moteur qui répond toujours et tend vers 0 quand les erreurs s'enchaînent.
+    Un moteur dont la latence moyenne dépasse `slow_after` est lent : comme un moteur dégradé, il passe
+    après les autres, et n'est retenté en tête qu'une fois tous les `PROBE_INTERVAL`.
+    """
+
+    def __init__(self, name: str, slow_after: Optional[float] = None) -> None:
+        self.name = name
+        self.slow_after = slow_after
+        self.score = 1.0
+        self.latency: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+        self.wins = 0
+        self._last_seen = 0.0
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float) -> None:
+        """Enregistre une réponse réussie et sa latence (en secondes)."""
+        with self._lock:
+            self.successes += 1
+            self.score += HEALTH_ALPHA * (1.0 - self.score)
+            self._last_seen = time.monotonic()
+            if self.latency is None or (self._is_slow() and latency <= self.slow_after):
+                # Première mesure, ou moteur lent qui répond de nouveau vite : on repart de cette mesure
+                self.latency = latency
+            else:
+                self.latency += HEALTH_ALPHA * (latency - self.latency)
+
+    def record_failure(self, quota: bool = False) -> None:
+        """Enregistre un échec ; un quota épuisé écarte le moteur pendant `QUOTA_COOLDOWN`."""
+        with self._lock:
+            self.failures += 1
+            self.score -= HEALTH_ALPHA * self.score
+            self._last_seen = time.monotonic()
+            if quota:
+                self._down_until = self._last_seen + QUOTA_COOLDOWN
+
+    def is_down(self) -> bool:
+        """Indique si le moteur est écarté (quota épuisé)."""
+        return time.monotonic() < self._down_until
+
+    def _is_slow(self) -> bool:
+        """Indique si la latence moyenne dépasse `slow_after`."""
+        return self.slow_after is not None and self.latency is not None and self.latency > self.slow_after
+
+    def is_healthy(self) -> bool:
+        """
+        Indique si le moteur peut être placé en tête : score suffisant et latence sous `slow_after`,
+        ou délai de nouvelle tentative écoulé (un seul message sert alors de sonde).
+        """
+        if self.score >= DEGRADED_SCORE and not self._is_slow():
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_seen > PROBE_INTERVAL:
+                self._last_seen = now
+                return True
+            return False
+
+    def snapshot(self) -> Dict[str, float]:
+        """Retourne l'état de santé du moteur."""
+        return {
+            "score": round(self.score, 3),
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "successes": self.successes,
+            "failures": self.failures,
+            "wins": self.wins,
+            "slow": self._is_slow(),
+            "down": self.is_down(),
+        }
+
+
+class EngineRouter:
+    """
+    Routage d'un message entre plusieurs moteurs, pour borner la latence de queue (p99).
+
+    Le message part vers le premier moteur en bonne santé ; si aucune réponse n'arrive après
+    `hedge_after` secondes, il est aussi envoyé au suivant et la première réponse gagne. En cas
+    d'erreur (quota, réseau...), le moteur suivant prend le relais immédiatement. Les requêtes
+    perdantes sont annulées si elles n'ont pas encore démarré ; sinon leur résultat met à jour la santé
+    du moteur et, s'il a réussi, est transmis à `on_late` (l'appel est payé, autant le mettre en cache).
+    Un moteur dont la latence moyenne dépasse `hedge_after` passe après les moteurs plus rapides.
+    """
+
+    def __init__(self, call: Callable[[str, str], str], engines: Iterable[str],
+                 hedge_after: Optional[float] = DEFAULT_HEDGE_AFTER) -> None:
+        """
+        Args:
+            call (Callable[[str, str], str]): Traduit un texte avec le moteur nommé (moteur, texte) ;
+                lève `EngineError` en cas d'échec.
+            engines (Iterable[str]): Moteurs par ordre de préférence (le premier est le moteur principal).
+            hedge_after (Optional[float]): Délai avant l'envoi au moteur suivant, en secondes (None = pas de hedging).
+        """
+        self.call = call
+        self.engines: List[str] = list(dict.fromkeys(engines))
+        self.hedge_after = hedge_after
+        self.health: Dict[str, EngineHealth] = {name: EngineHealth(name, hedge_after) for name in self.engines}
+        self.hedges = 0
+        self.failovers = 0
+        self._executor = ThreadPoolExecutor(max_workers=ROUTER_THREADS, thread_name_prefix="engine-router")
+
+    def candidates(self, exclude: Iterable[str] = ()) -> List[str]:
+        """Moteurs à essayer, dans l'ordre : les moteurs sains par préférence, puis les dégradés ou lents."""
+        usable = [name for name in self.engines if name not in exclude and not self.health[name].is_down()]
+        healthy = [name for name in usable if self.health[name].is_healthy()]
+        return healthy + [name for name in usable if name not in healthy]
+
+    def _launch(self, name: str, text: str) -> Future:
+        """Envoie le texte à un moteur ; la santé du moteur est mise à jour à la fin de l'appel."""
+        start = time.monotonic()
+        future = self._executor.submit(self.call, name, text)
+
+        def record(done: Future) -> None:
+            if done.cancelled():
+                return
+            error = done.exception()
+            if error is None:
+                self.health[name].record_success(time.monotonic() - start)
+            else:
+                self.health[name].record_failure(isinstance(error, EngineError) and error.quota)
+
+        future.add_done_callback(record)
+        return future
+
+    @staticmethod
+    def _deliver_late(done: Future, name: str, on_late: Callable[[str, str], None]) -> None:
+        """Transmet la réponse réussie d'une requête perdante à `on_late`."""
+        if done.cancelled() or done.exception() is not None:
+            return
+        try:
+            on_late(name, done.result())
+        except Exception as e:
+            logger.exception("Late result of %s could not be handled: %s", name, e)
+
+    def translate(self, text: str, exclude: Iterable[str] = (),
+                  on_late: Optional[Callable[[str, str], None]] = None) -> Tuple[str, str]:
+        """
+        Traduit un texte avec le premier moteur qui répond.
+
+        Args:
+            text (str): Le texte à traduire.
+            exclude (Iterable[str]): Moteurs à ne pas utiliser pour ce message.
+            on_late (Optional[Callable[[str, str], None]]): Reçoit (moteur, traduction) des requêtes
+                perdantes qui finissent par réussir.
+
+        Returns:
+            Tuple[str, str]: La traduction et le nom du moteur qui l'a produite.
+
+        Raises:
+            EngineError: Si tous les moteurs ont échoué (dernière erreur reçue).
+        """
+        pending: Deque[str] = deque(self.candidates(exclude))
+        if not pending:
+            raise EngineError("[ERROR] No translation engine available")
+        running: Dict[Future, str] = {}
+        last_error: Optional[Exception] = None
+        name = pending.popleft()
+        running[self._launch(name, text)] = name
+
+        while running:
+            can_hedge = self.hedge_after is not None and pending
+            done, _ = wait(running, timeout=self.hedge_after if can_hedge else None, return_when=FIRST_COMPLETED)
+            if not done:
+                name = pending.popleft()
+                logger.debug("No answer after %.2f s, hedging with %s", self.hedge_after, name)
+                self.hedges += 1
+                running[self._launch(name, text)] = name
+                continue
+
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is None:
+                    for loser, loser_name in running.items():
+                        if not loser.cancel() and on_late is not None:
+                            loser.add_done_callback(lambda late, late_name=loser_name: self._deliver_late(late, late_name, on_late))
+                    self.health[name].wins += 1
+                    return future.result(), name
+                logger.debug("%s failed: %s", name, error)
+                last_error = error
+
+            if not running and pending:
+                name = pending.popleft()
+                logger.info("Failing over to %s", name)
+                self.failovers += 1
+                running[self._launch(name, text)] = name
+
+        if isinstance(last_error, EngineError):
+            raise last_error
+        raise EngineError(f"[ERROR] Translation failed: {last_error}")
+
+    def stats(self) -> Dict[str, object]:
+        """Retourne les compteurs du routeur et la santé de chaque moteur."""
+        return {
+            "hedges": self.hedges,
+            "failovers": self.failovers,
+            "engines": {name: health.snapshot() for name, health in self.health.items()},
+        }
+
+    def close(self) -> None:
+        """Arrête les threads du routeur (les appels en cours se terminent en arrière-plan)."""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,136 @@
+# scheduler.py
+
+import heapq
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional, Set, Tuple
+
+# Ancienneté maximale d'un message en attente avant qu'il ne soit plus traduit (il concerne un round déjà fini)
+DEFAULT_MAX_STALENESS = 10.0
+# Rang de priorité des canaux de chat (plus petit = plus prioritaire)
+CHANNEL_PRIORITY = {"team": 0, "all": 1}
+
+
+class ScheduledMessage:
+    """Message de chat en attente de traduction."""
+
+    __slots__ = ("sequence", "player", "message", "channel", "enqueued", "taken")
+
+    def __init__(self, sequence: int, player: str, message: str, channel: str) -> None:
+        self.sequence = sequence
+        self.player = player
+        self.message = message
+        self.channel = channel
+        self.enqueued = time.monotonic()
+        self.taken = False
+
+
+class MessageScheduler:
+    """
+    File de travail à priorités entre la lecture du log et les moteurs de traduction.
+
+    Le chat d'équipe passe avant le chat général, et les joueurs dont on n'a encore traduit aucun
+    message passent avant les autres. Un message qui attend depuis plus de `max_staleness` secondes
+    n'est plus traduit : il est rendu à part pour être affiché tel quel (ou ignoré), sans coûter d'appel.
+    La latence reste ainsi bornée pendant les vagues de spam au lieu de croître sans limite.
+    """
+
+    def __init__(self, max_pending: int, max_staleness: Optional[float] = DEFAULT_MAX_STALENESS) -> None:
+        """
+        Args:
+            max_pending (int): Nombre maximal de messages en attente (au-delà, `put` bloque).
+            max_staleness (Optional[float]): Ancienneté maximale en secondes (None = pas de limite).
+        """
+        self.max_pending = max(1, max_pending)
+        self.max_staleness = max_staleness
+        self._heap: List[Tuple[int, int, int, ScheduledMessage]] = []
+        # Ordre d'arrivée, pour repérer les messages périmés sans parcourir le tas
+        self._arrivals: Deque[ScheduledMessage] = deque()
+        self._size = 0
+        self._seen_players: Set[str] = set()
+        self._condition = threading.Condition()
+        self._closed = False
+        self.stale = 0
+
+    def put(self, item: ScheduledMessage, timeout: Optional[float] = None) -> bool:
+        """
+        Ajoute un message (bloque tant que la file est pleine).
+
+        Returns:
+            bool: False si la file est restée pleine jusqu'au timeout ou si elle a été fermée.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._closed or self._size < self.max_pending, timeout):
+                return False
+            if self._closed:
+                return False
+            priority = (CHANNEL_PRIORITY.get(item.channel, 1), int(item.player in self._seen_players), item.sequence)
+            heapq.heappush(self._heap, (*priority, item))
+            self._arrivals.append(item)
+            self._size += 1
+            self._condition.notify()
+            return True
+
+    def get(self) -> Optional[Tuple[ScheduledMessage, bool]]:
+        """
+        Retire le prochain message à traiter (bloque tant que la file est vide).
+
+        Returns:
+            Optional[Tuple[ScheduledMessage, bool]]: Le message et un booléen indiquant s'il est périmé,
+                ou None si le scheduler a été fermé.
+        """
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                stale = self._pop_stale()
+                if stale is not None:
+                    return stale, True
+                while self._heap:
+                    item = heapq.heappop(self._heap)[-1]
+                    if not item.taken:
+                        return self._take(item), False
+                self._condition.wait(self._next_expiry())
+
+    def _pop_stale(self) -> Optional[ScheduledMessage]:
+        """Retire le plus ancien message s'il a dépassé l'ancienneté maximale (appelé sous verrou)."""
+        while self._arrivals and self._arrivals[0].taken:
+            self._arrivals.popleft()
+        if self.max_staleness is None or not self._arrivals:
+            return None
+        oldest = self._arrivals[0]
+        if time.monotonic() - oldest.enqueued <= self.max_staleness:
+            return None
+        self.stale += 1
+        return self._take(oldest)
+
+    def _next_expiry(self) -> Optional[float]:
+        """Délai avant que le plus ancien message en attente ne devienne périmé (appelé sous verrou)."""
+        if self.max_staleness is None or not self._arrivals:
+            return None
+        return max(0.0, self._arrivals[0].enqueued + self.max_staleness - time.monotonic())
+
+    def _take(self, item: ScheduledMessage) -> ScheduledMessage:
+        """Marque un message comme retiré de la file (appelé sous verrou)."""
+        item.taken = True
+        self._size -= 1
+        self._condition.notify_all()
+        return item
+
+    def mark_seen(self, player: str) -> None:
+        """Signale qu'un message de ce joueur a été traduit : ses prochains messages perdent leur bonus de priorité."""
+        with self._condition:
+            self._seen_players.add(player)
+
+    def close(self) -> None:
+        """Ferme le scheduler : les messages en attente sont abandonnés et les appels bloqués se terminent."""
+        with self._condition:
+            self._closed = True
+            self._heap.clear()
+            self._arrivals.clear()
+            self._size = 0
+            self._condition.notify_all()
+
+    def __len__(self) -> int:
+        return self._size
@@ -1,150 +1,535 @@
 # translation.py
 
-import time
-import asyncio
-from typing import Coroutine, Dict, Optional, Tuple
-
-# Imports des API
-import deepl
-from deepl import DeepLException
-from google import genai
-from google.genai import types
-from googletrans import Translator as AsyncTranslator
+import logging
+import threading
+from typing import Callable, Coroutine, Dict, List, Optional, Tuple, Union
 
 # Import des autres modules
-from lang_data import LANG_CODES_TO_NAMES, LANG_MAP_GEMINI
+from batching import (DEFAULT_BATCH_MAX_CHARS, DEFAULT_BATCH_MAX_ITEMS, DEFAULT_BATCH_WINDOW, BatchResult,
+                      MicroBatcher)
+from cache import (DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, DEFAULT_MEMORY_ENTRIES, CacheKey, CacheValue, LRUCache,
+                   PersistentCache, SingleFlight)
+from engines import BATCH_ENGINES, DEEPL_ENGINE, GEMINI_ENGINE, GOOGLE_ENGINE, DetectedTranslation, EngineError, EnginePool
+from lang_data import LANG_CODES_TO_NAMES
+from lang_detect import LocalDetector, load_detector
+from metrics import METRICS
+from normalization import normalize_message
+from passthrough import PassThroughIndex
+from phrasebook import PHRASE_PACKS_DIR, Phrasebook
+from rate_limit import RateLimiterRegistry
+from routing import DEFAULT_HEDGE_AFTER, EngineRouter
+from usage import DEFAULT_LOW_VALUE_CHARS, DEFAULT_RESERVE_RATIO, DEFAULT_USAGE_PATH, UsageTracker
+
+logger = logging.getLogger(__name__)
+
+# Confiance minimale de la détection locale en dessous de laquelle on interroge le détecteur distant
+DEFAULT_LOCAL_DETECTION_THRESHOLD = 0.8
+# Cache des verdicts de détection : durée de vie (les échecs, souvent dus au réseau, expirent plus vite) et taille
+DEFAULT_VERDICT_TTL_MINUTES = 60
+DEFAULT_FAILED_VERDICT_TTL_MINUTES = 5
+DEFAULT_VERDICT_MAX_ENTRIES = 20000
+# Traductions produites par un moteur de secours : gardées en mémoire seulement, sous la clé de ce moteur,
+# le temps que le moteur principal se rétablisse
+DEFAULT_FALLBACK_CACHE_TTL_MINUTES = 10
+DEFAULT_FALLBACK_CACHE_ENTRIES = 5000
+# Source attribuée aux traductions venant du lexique de phrases
+PHRASEBOOK_SOURCE = "phrasebook"
+
+# Verdict de détection d'un message : (code de langue ou None si échec, confiance, message à laisser tel quel)
+Verdict = Tuple[Optional[str], float, bool]
 
 
 class Translator:
     """Gère la détection de langue et la traduction via différentes API, avec un système de cache."""
 
-    def __init__(self, config: Dict) -> None:
+    def __init__(self, config: Dict, engines: Optional[EnginePool] = None) -> None:
         """
         Initialise le traducteur avec la configuration fournie.
 
         Args:
             config (Dict): Le dictionnaire de configuration de l'application.
+            engines (Optional[EnginePool]): Clients des moteurs à réutiliser. Si absent, le traducteur
+                crée (et fermera) son propre pool.
         """
         self.engine = config.get("translator", "Google Translator")
         self.target_language = config.get("target_language", "FR")
         self.token_deepl = config.get("token_deepl")
         self.token_gemini = config.get("token_google_gemini")
         self.banned_words = config.get("banned_words", [])
+        # Messages jamais envoyés aux moteurs : mots bannis et classes intégrées (nombres, emoji, URL, spam)
+        self.passthrough = PassThroughIndex(self.banned_words, config.get("passthrough_builtin", True))
         self.exclude_english = config.get("exclude_english", False)
-        self.last_translation_time: float = 0.0
-        self.translation_cache: Dict[Tuple[str, str], Tuple[str, bool, Optional[str]]] = {}
+        # Avec Gemini, détection et traduction se font en un seul appel (réponse JSON structurée)
+        self.gemini_single_call = config.get("gemini_single_call", True)
+        # Avec Gemini, la traduction est streamée vers l'UI quand la langue est déjà connue localement
+        self.gemini_streaming = config.get("gemini_streaming", True)
+        self.rate_limiters = RateLimiterRegistry(config.get("rate_limits"))
+        self.local_detection_threshold = config.get("local_detection_threshold", DEFAULT_LOCAL_DETECTION_THRESHOLD)
+        self.local_detector: Optional[LocalDetector] = None
+        if config.get("local_detection", True):
+            try:
+                self.local_detector = load_detector()
+            except (OSError, ValueError) as e:
+                logger.warning("Local language detector unavailable, using remote detection only: %s", e)
+        # Micro-batching : les messages arrivés dans la même fenêtre partent en une seule requête (0 = désactivé)
+        self.batch_window = config.get("batch_window_ms", DEFAULT_BATCH_WINDOW * 1000) / 1000
+        self.batch_max_items = config.get("batch_max_items", DEFAULT_BATCH_MAX_ITEMS)
+        self.batch_max_chars = config.get("batch_max_chars", DEFAULT_BATCH_MAX_CHARS)
+        self._batchers: Dict[str, MicroBatcher] = {}
+        self._batchers_lock = threading.Lock()
+        self._owns_engines = engines is None
+        self.engines = engines if engines is not None else EnginePool()
+        # Routage : hedging vers un moteur de secours si le principal tarde, bascule en cas d'erreur ou de quota
+        hedge_after_ms = config.get("hedge_after_ms", DEFAULT_HEDGE_AFTER * 1000)
+        default_fallbacks = [GOOGLE_ENGINE] if self.engine != GOOGLE_ENGINE else []
+        fallbacks = [name for name in config.get("fallback_engines", default_fallbacks)
+                     if name == GOOGLE_ENGINE or self._engine_token(name)]
+        self.router = EngineRouter(
+            self._call_engine, [self.engine, *fallbacks],
+            hedge_after=hedge_after_ms / 1000 if hedge_after_ms else None
+        )
+        # Consommation par moteur : les messages de faible valeur quittent un moteur payant avant l'épuisement du quota
+        self.usage = UsageTracker(
+            config.get("usage_path") or DEFAULT_USAGE_PATH, config.get("usage_limits"),
+            reserve_ratio=config.get("usage_reserve_ratio", DEFAULT_RESERVE_RATIO),
+            low_value_chars=config.get("usage_low_value_chars", DEFAULT_LOW_VALUE_CHARS),
+            request_limits=config.get("usage_request_limits"),
+        )
+        if self.token_deepl and DEEPL_ENGINE in self.router.engines:
+            threading.Thread(target=self._sync_deepl_usage, name="deepl-usage", daemon=True).start()
+
+        # Le cache est persistant : il survit aux arrêts/relances de l'écoute et de l'application
+        # Le premier niveau en mémoire est borné pour que les longues sessions ne grossissent pas indéfiniment
+        ttl_days = config.get("cache_ttl_days")
+        memory_mb = config.get("cache_memory_mb", 8)
+        self.translation_cache = PersistentCache(
+            path=config.get("cache_path") or DEFAULT_CACHE_PATH,
+            max_entries=config.get("cache_max_entries", DEFAULT_MAX_ENTRIES),
+            ttl=ttl_days * 86400 if ttl_days else None,
+            memory_entries=config.get("cache_memory_entries", DEFAULT_MEMORY_ENTRIES),
+            memory_bytes=int(memory_mb * 1024 * 1024) if memory_mb else None,
+        )
+        # Traductions des moteurs de secours (hedging, bascule, préservation de quota), sous la clé de leur moteur
+        self.fallback_cache: LRUCache[CacheKey, CacheValue] = LRUCache(
+            config.get("fallback_cache_entries", DEFAULT_FALLBACK_CACHE_ENTRIES),
+            ttl=config.get("fallback_cache_ttl_minutes", DEFAULT_FALLBACK_CACHE_TTL_MINUTES) * 60
+        )
+        # Forme canonique des messages pour les clés de cache/déduplication (False = ancienne clé strip + lower)
+        normalization = config.get("cache_normalization", {})
+        self.normalization: Optional[Dict] = None if normalization is False else normalization
+        self.normalization_hits = 0
+        # Lexique des phrases toutes faites, consulté avant toute détection ou appel moteur
+        self.phrasebook: Optional[Phrasebook] = None
+        if config.get("phrasebook", True):
+            self.phrasebook = Phrasebook(
+                self.target_language, self._normalize, [PHRASE_PACKS_DIR, *config.get("phrasebook_dirs", [])]
+            )
+        # Verdicts de détection (langue, confiance, message à ignorer), séparés des traductions :
+        # les messages laissés tels quels ("ok", "merci") ne coûtent plus aucun appel une fois vus
+        verdict_entries = config.get("verdict_max_entries", DEFAULT_VERDICT_MAX_ENTRIES)
+        self.verdicts: LRUCache[str, Verdict] = LRUCache(
+            verdict_entries, ttl=config.get("verdict_ttl_minutes", DEFAULT_VERDICT_TTL_MINUTES) * 60
+        )
+        self.failed_verdicts: LRUCache[str, Verdict] = LRUCache(
+            verdict_entries, ttl=config.get("failed_verdict_ttl_minutes", DEFAULT_FAILED_VERDICT_TTL_MINUTES) * 60
+        )
+        # Les copies d'un même message arrivées pendant sa traduction attendent le résultat au lieu de refaire l'appel
+        self._inflight: SingleFlight = SingleFlight()
+
+    def cache_stats(self) -> Dict[str, float]:
+        """Retourne les compteurs du cache de traductions (hits, miss, évictions, taux de hit, requêtes fusionnées...)."""
+        stats = self.translation_cache.stats()
+        stats["coalesced"] = self._inflight.coalesced
+        stats["passthrough"] = sum(self.passthrough.hits.values())
+        stats["normalization_hits"] = self.normalization_hits
+        stats["verdict_hits"] = self.verdicts.hits + self.failed_verdicts.hits
+        stats["fallback_hits"] = self.fallback_cache.hits
+        stats["phrasebook_hits"] = sum(self.phrasebook.hits.values()) if self.phrasebook else 0
+        return stats
+
+    def rate_limit_stats(self) -> Dict[str, Dict[str, float]]:
+        """Retourne les métriques des limiteurs de débit par moteur (attentes, throttling)."""
+        return self.rate_limiters.metrics()
+
+    def routing_stats(self) -> Dict[str, object]:
+        """Retourne les compteurs de hedging/bascule et la santé de chaque moteur."""
+        return self.router.stats()
+
+    def usage_stats(self) -> Dict[str, Dict[str, object]]:
+        """Retourne la consommation du mois par moteur, le quota restant et la date d'épuisement projetée."""
+        return self.usage.stats()
+
+    def batch_stats(self) -> Dict[str, Dict[str, int]]:
+        """Retourne, par moteur, le nombre de lots envoyés et de messages qu'ils contenaient."""
+        return {
+            name: {"batches": batcher.batches_sent, "messages": batcher.items_sent}
+            for name, batcher in self._batchers.items()
+        }
+
+    def close(self) -> None:
+        """Libère les ressources du traducteur (écrit le cache sur disque, ferme les clients qu'il possède)."""
+        for batcher in self._batchers.values():
+            batcher.close()
+        self.router.close()
+        self.usage.save()
+        self.translation_cache.close()
+        if self._owns_engines:
+            self.engines.close()
 
     def _run_async(self, coro: Coroutine) -> any:
-        """Exécute une coroutine asynchrone dans une nouvelle boucle d'événements."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
+        """Exécute une coroutine asynchrone sur la boucle d'événements persistante des moteurs."""
+        return self.engines.loop.run(coro)
 
     async def _detect_language_async(self, text: str) -> Tuple[Optional[str], float]:
         """Détecte la langue d'un texte (méthode asynchrone)."""
         try:
-            translator = AsyncTranslator()
-            detection = await translator.detect(text)
-            return detection.lang, detection.confidence
+            return await self.engines.google.detect_async(text)
         except Exception as e:
-            print(f"[ERROR] Language detection failed: {e}")
+            logger.error("Language detection failed: %s", e)
+            METRICS.increment("api_errors_total", engine=GOOGLE_ENGINE, kind="detect")
             return None, 0.0
 
-    def _translate_with_engine(self, text: str) -> str:
+    def _detect_language(self, text: str) -> Tuple[Optional[str], float]:
         """
-        Traduit un texte en utilisant le moteur configuré.
-        Retourne le texte traduit ou un message d'erreur formaté.
+        Détecte la langue d'un texte : d'abord en local (sans réseau), puis via le détecteur distant
+        si la confiance locale est insuffisante.
         """
-        if self.engine == "DeepL":
-            if not self.token_deepl: return "[ERROR] DeepL token is missing"
-            try:
-                translator = deepl.Translator(self.token_deepl)
-                result = translator.translate_text(text, target_lang=self.target_language)
-                return result.text.strip()
-            except DeepLException as e:
-                return "[ERROR] DeepL quota may be exceeded" if "quota" in str(e).lower() else f"[ERROR] DeepL API: {e}"
-
-        if self.engine == "Gemini":
-            if not self.token_gemini: return "[ERROR] Gemini token is missing"
-            try:
-                client = genai.Client(api_key=self.token_gemini)
-                full_lang_name = LANG_MAP_GEMINI.get(self.target_language.upper())
-                if not full_lang_name: return f"[ERROR] Language '{self.target_language}' not supported by Gemini integration"
-
-                prompt = (
-                    f"Translate the following text into {full_lang_name} ONLY. "
-                    "You MUST return ONLY the translated text, nothing else, no explanations, no original text."
-                    "Translate all slang, insults, or vulgar language as-is. Do not censor or omit anything."
-                    "Translate naturally, not literally — use fluent, native-level phrasing."
-                    "If you cannot translate a word, keep it as is but still provide the translation of the rest."
-                    f"If the text is already in {full_lang_name}, return it UNCHANGED.\n\n"
-                    f"Here is the text:\n\n{text}"
-                )
-                response = client.models.generate_content(
-                    model="gemini-2.0-flash-lite", contents=prompt,
-                    config=types.GenerateContentConfig(temperature=0.2, max_output_tokens=100)
+        if self.local_detector is not None:
+            lang_code, confidence = self.local_detector.detect(text)
+            if lang_code and confidence >= self.local_detection_threshold:
+                logger.debug("Local detection for '%s': %s (%.2f)", text, lang_code, confidence)
+                return lang_code, confidence
+        self.rate_limiters.get(GOOGLE_ENGINE).acquire()
+        try:
+            with METRICS.track_call(GOOGLE_ENGINE, "detect"):
+                return self._run_async(self._detect_language_async(text))
+        except EngineError as e:
+            # Détection sans réponse (délai dépassé) : traitée comme un échec de détection
+            logger.error("Language detection failed: %s", e)
+            return None, 0.0
+
+    def _cached_verdict(self, normalized: str) -> Optional[Verdict]:
+        """Retourne le verdict de détection déjà connu pour ce message, ou None."""
+        verdict = self.verdicts.get(normalized) or self.failed_verdicts.get(normalized)
+        if verdict is not None:
+            METRICS.increment("cache_hits_total", cache="verdict")
+        return verdict
+
+    def _store_verdict(self, normalized: str, lang_code: Optional[str], confidence: float) -> Verdict:
+        """Enregistre le verdict de détection d'un message (échecs compris) et le retourne."""
+        verdict = (lang_code, confidence, bool(lang_code) and self._should_skip(lang_code))
+        (self.verdicts if lang_code else self.failed_verdicts).put(normalized, verdict)
+        return verdict
+
+    def _sync_deepl_usage(self) -> None:
+        """Récupère la consommation DeepL de la période auprès du service (appelé en arrière-plan au démarrage)."""
+        try:
+            used, limit = self.engines.get(DEEPL_ENGINE, self.token_deepl).get_usage()
+        except EngineError as e:
+            logger.warning("DeepL usage could not be fetched: %s", e)
+            return
+        self.usage.sync_remote(DEEPL_ENGINE, used, limit)
+
+    def _engine_token(self, engine_name: str) -> Optional[str]:
+        """Retourne la clé d'API associée à un moteur."""
+        return {DEEPL_ENGINE: self.token_deepl, GEMINI_ENGINE: self.token_gemini}.get(engine_name)
+
+    def _send_batch(self, engine_name: str, texts: List[str], structured: bool = False) -> BatchResult:
+        """
+        Envoie un lot de messages au moteur : un seul jeton de débit et un seul aller-retour pour tout le lot.
+        Avec `structured`, le moteur (Gemini) détecte aussi la langue de chaque message.
+        """
+        limiter = self.rate_limiters.get(engine_name)
+        engine = self.engines.get(engine_name, self._engine_token(engine_name))
+        limiter.acquire()
+        try:
+            with METRICS.track_call(engine_name, "detect_translate" if structured else "translate"):
+                if structured:
+                    results = engine.detect_and_translate_batch(texts, self.target_language)
+                else:
+                    results = engine.translate_batch(texts, self.target_language)
+        except EngineError as e:
+            if e.rate_limited or e.quota:
+                limiter.report_throttled()
+            raise
+        failed = sum(1 for result in results if isinstance(result, EngineError))
+        if failed:
+            METRICS.increment("api_errors_total", failed, engine=engine_name, kind="detect_translate" if structured else "translate")
+        if any(isinstance(result, EngineError) and (result.rate_limited or result.quota) for result in results):
+            limiter.report_throttled()
+        else:
+            limiter.report_success()
+        self.usage.record(engine_name, sum(len(text) for text in texts))
+        return results
+
+    def _get_batcher(self, engine_name: str, structured: bool = False) -> Optional[MicroBatcher]:
+        """
+        Retourne le micro-batcher du moteur (créé au premier usage), ou None si le batching est désactivé
+        ou si le moteur n'a pas d'API de lot : un lot y serait N requêtes pour un seul jeton de débit.
+        """
+        if self.batch_window <= 0 or engine_name not in BATCH_ENGINES:
+            return None
+        key = f"{engine_name} (JSON)" if structured else engine_name
+        with self._batchers_lock:
+            batcher = self._batchers.get(key)
+            if batcher is None:
+                batcher = MicroBatcher(
+                    lambda texts: self._send_batch(engine_name, texts, structured),
+                    window=self.batch_window, max_items=self.batch_max_items, max_chars=self.batch_max_chars
                 )
-                return response.text.strip()
-            except Exception as e:
-                return f"[ERROR] Gemini API: {e}"
+                self._batchers[key] = batcher
+            return batcher
 
-        # Moteur par défaut -> Google Translator (parce que c'est gratos)
+    def _detect_and_translate_gemini(self, text: str) -> Union[DetectedTranslation, str]:
+        """
+        Détecte la langue et traduit un texte en un seul appel Gemini (réponse JSON).
+        Retourne (langue source, déjà dans la langue cible, traduction) ou un message d'erreur formaté.
+        """
         try:
-            async def _translate_googletrans_async(text_to_translate, dest_lang):
-                translator = AsyncTranslator()
-                result = await translator.translate(text_to_translate, dest=dest_lang.lower())
-                return result.text.strip()
+            batcher = self._get_batcher(GEMINI_ENGINE, structured=True)
+            if batcher is not None:
+                return batcher.submit(text)
+            results = self._send_batch(GEMINI_ENGINE, [text], structured=True)
+        except EngineError as e:
+            return str(e)
+        return str(results[0]) if isinstance(results[0], EngineError) else results[0]
 
-            return self._run_async(_translate_googletrans_async(text, self.target_language))
-        except Exception as e:
-            return f"[ERROR] GoogleTrans: {e}"
+    def _call_engine(self, engine_name: str, text: str) -> str:
+        """
+        Traduit un texte avec un moteur donné (via son micro-batcher s'il est actif).
 
-    def translate_message(self, message: str) -> Tuple[str, bool, Optional[str], bool]:
+        Raises:
+            EngineError: Si le moteur a échoué.
         """
-        Orchestre la traduction d'un message, en utilisant un cache.
+        batcher = self._get_batcher(engine_name)
+        if batcher is not None:
+            return batcher.submit(text)
+
+        limiter = self.rate_limiters.get(engine_name)
+        try:
+            engine = self.engines.get(engine_name, self._engine_token(engine_name))
+            limiter.acquire()
+            with METRICS.track_call(engine_name):
+                translated_text = engine.translate(text, self.target_language)
+        except EngineError as e:
+            if e.rate_limited or e.quota:
+                limiter.report_throttled()
+            raise
+        limiter.report_success()
+        self.usage.record(engine_name, len(text))
+        return translated_text
+
+    def _translate_with_engine(self, text: str, exclude: Tuple[str, ...] = (),
+                               on_late: Optional[Callable[[str, str], None]] = None) -> Tuple[str, str]:
+        """
+        Traduit un texte avec le moteur configuré, ou un moteur de secours s'il tarde ou échoue.
+        Les moteurs dont le quota doit être préservé sont évités quand un autre moteur est disponible.
+        `on_late` reçoit (moteur, traduction) des requêtes de hedging perdantes qui aboutissent quand même.
+        Retourne (texte traduit ou message d'erreur formaté, moteur utilisé).
+        """
+        METRICS.mark("queued_engine")
+        preserved = tuple(name for name in self.router.engines if name not in exclude and self.usage.should_divert(name, text))
+        if preserved and self.router.candidates(exclude + preserved):
+            logger.debug("Preserving quota of %s for '%s'", ", ".join(preserved), text)
+            self.usage.record_diversion()
+            exclude = exclude + preserved
+        try:
+            return self.router.translate(text, exclude, on_late)
+        except EngineError as e:
+            return str(e), self.engine
+
+    def _normalize(self, message: str) -> str:
+        """Retourne la forme du message utilisée dans les clés de cache et de déduplication."""
+        if self.normalization is None:
+            return message.strip().lower()
+        return normalize_message(message, self.normalization)
+
+    def translate_message(self, message: str, on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, bool, Optional[str], bool, str]:
+        """
+        Orchestre la traduction d'un message, en utilisant le lexique de phrases et un cache.
+
+        Args:
+            message (str): Le message à traduire.
+            on_partial (Optional[Callable[[str], None]]): Reçoit les traductions partielles quand le moteur
+                les diffuse en streaming (Gemini).
 
         Returns:
-            Tuple[str, bool, Optional[str], bool]: Un tuple contenant:
+            Tuple[str, bool, Optional[str], bool, str]: Un tuple contenant:
                 - Le texte final (traduit, original, ou message d'erreur).
                 - Un booléen indiquant si la traduction a eu lieu.
                 - Le nom de la langue d'origine détectée, ou None.
                 - Un booléen indiquant si le résultat provient du cache.
+                - La source de la traduction : "phrasebook" ou le nom du moteur.
         """
-        cache_key = (message.strip().lower(), self.engine)
-        if cache_key in self.translation_cache:
-            print(f"[CACHE] Traduction trouvée pour '{message}' avec le moteur {self.engine}.")
-            cached_result = self.translation_cache[cache_key]
-            return cached_result[0], cached_result[1], cached_result[2], True
-
-        if any(banned.lower() == message.strip().lower() for banned in self.banned_words):
+        if self.passthrough.match(message):
             # Pas de traduction, donc pas de cache
-            return message, False, None, False
+            METRICS.increment("passthrough_total")
+            return message, False, None, False, self.engine
+
+        normalized = self._normalize(message)
+        phrase = self.phrasebook.lookup(normalized) if self.phrasebook else None
+        if phrase is not None:
+            METRICS.increment("cache_hits_total", cache="phrasebook")
+            translation, lang_code = phrase
+            if self._should_skip(lang_code):
+                return message, False, None, False, PHRASEBOOK_SOURCE
+            return translation, True, LANG_CODES_TO_NAMES.get(lang_code, lang_code), False, PHRASEBOOK_SOURCE
 
-        lang_code, _ = self._run_async(self._detect_language_async(message))
+        cache_key = (normalized, self.engine, self.target_language.upper())
+        cached = self._cached_translation(cache_key)
+        if cached is not None:
+            cached_result, source = cached
+            METRICS.increment("cache_hits_total", cache="translation" if source == self.engine else "fallback")
+            logger.debug("[CACHE] Traduction trouvée pour '%s' avec le moteur %s.", message, source)
+            if normalized != message.strip().lower():
+                # Hit qu'une clé brute (strip + lower) aurait probablement manqué
+                self.normalization_hits += 1
+            return cached_result[0], cached_result[1], cached_result[2], True, source
+
+        result, shared = self._inflight.do(cache_key, lambda: self._translate_uncached(message, cache_key, on_partial))
+        if shared:
+            METRICS.increment("cache_hits_total", cache="coalesced")
+            # Résultat obtenu par l'appel d'un autre message identique : aucun appel réseau pour celui-ci
+            text, was_translated, original_lang, _, source = result
+            if not was_translated and self._normalize(text) == normalized:
+                text = message  # Message laissé tel quel : on garde la casse de cette copie-ci
+            return text, was_translated, original_lang, was_translated, source
+        return result
+
+    def _cached_translation(self, cache_key: CacheKey) -> Optional[Tuple[CacheValue, str]]:
+        """
+        Cherche une traduction du message : celle du moteur configuré (cache persistant), sinon celle,
+        récente, d'un moteur de secours. Retourne (valeur en cache, moteur qui l'a produite) ou None.
+        """
+        cached_result = self.translation_cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result, self.engine
+        normalized, _, target = cache_key
+        for name in self.router.engines:
+            if name != self.engine:
+                cached_result = self.fallback_cache.get((normalized, name, target))
+                if cached_result is not None:
+                    return cached_result, name
+        return None
+
+    def _store_translation(self, cache_key: CacheKey, source: str, value: CacheValue) -> None:
+        """
+        Enregistre une traduction sous la clé du moteur qui l'a produite : sur disque pour le moteur
+        configuré, en mémoire avec une courte durée de vie pour un moteur de secours.
+        """
+        if source == self.engine:
+            self.translation_cache.put(cache_key, value)
+        else:
+            self.fallback_cache.put((cache_key[0], source, cache_key[2]), value)
+        logger.debug("[CACHE] Nouvelle traduction enregistrée pour '%s' (moteur %s).", cache_key[0], source)
+
+    def _should_skip(self, lang_code: str) -> bool:
+        """Indique si un message dans cette langue doit être laissé tel quel."""
+        return (self.exclude_english and lang_code == "en") or lang_code == self.target_language.lower()
+
+    def _can_stream(self, on_partial: Optional[Callable[[str], None]]) -> bool:
+        """Indique si la traduction peut être diffusée en streaming à l'appelant."""
+        return on_partial is not None and self.engine == GEMINI_ENGINE and self.gemini_streaming
+
+    def _translate_streaming(self, text: str, on_partial: Callable[[str], None]) -> str:
+        """Traduit un texte avec Gemini en streaming. Retourne la traduction complète ou un message d'erreur formaté."""
+        limiter = self.rate_limiters.get(GEMINI_ENGINE)
+        try:
+            engine = self.engines.get(GEMINI_ENGINE, self.token_gemini)
+            limiter.acquire()
+            with METRICS.track_call(GEMINI_ENGINE, "stream"):
+                translated_text = engine.translate_stream(text, self.target_language, on_partial)
+        except EngineError as e:
+            if e.rate_limited or e.quota:
+                limiter.report_throttled()
+            return str(e)
+        limiter.report_success()
+        self.usage.record(GEMINI_ENGINE, len(text))
+        return translated_text
+
+    def _translate_uncached(self, message: str, cache_key: Tuple[str, str, str],
+                            on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, bool, Optional[str], bool, str]:
+        """Détecte et traduit un message absent du cache, puis enregistre le résultat."""
+        if self.engine == GEMINI_ENGINE and self.gemini_single_call:
+            return self._translate_single_call(message, cache_key, on_partial)
+
+        verdict = self._cached_verdict(cache_key[0])
+        if verdict is None:
+            verdict = self._store_verdict(cache_key[0], *self._detect_language(message))
+        METRICS.mark("detected")
+        lang_code, _, skip = verdict
         if not lang_code:
-            return "Language detection failed", False, None, False
+            return "Language detection failed", False, None, False, self.engine
+
+        if skip:
+            return message, False, None, False, self.engine
+
+        if self._can_stream(on_partial):
+            return self._finalize(message, cache_key, *self._translate_streaming_or_failover(message, on_partial), lang_code)
+        # Réponse tardive du moteur perdant (souvent le principal, doublé par le hedging) : payée, donc mise en cache
+        lang_name = LANG_CODES_TO_NAMES.get(lang_code, lang_code)
+        on_late = lambda engine, text: self._store_translation(cache_key, engine, (text, True, lang_name))
+        return self._finalize(message, cache_key, *self._translate_with_engine(message, on_late=on_late), lang_code)
+
+    def _translate_streaming_or_failover(self, message: str, on_partial: Callable[[str], None]) -> Tuple[str, str]:
+        """Traduit en streaming avec Gemini ; en cas d'échec, bascule sur les moteurs de secours."""
+        METRICS.mark("queued_engine")
+        translated_text = self._translate_streaming(message, on_partial)
+        if translated_text.startswith("[ERROR]") and self.router.candidates(exclude=(GEMINI_ENGINE,)):
+            logger.warning("Gemini streaming failed, failing over: %s", translated_text)
+            return self._translate_with_engine(message, exclude=(GEMINI_ENGINE,))
+        return translated_text, GEMINI_ENGINE
+
+    def _translate_single_call(self, message: str, cache_key: Tuple[str, str, str],
+                               on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, bool, Optional[str], bool, str]:
+        """
+        Variante Gemini : la détection locale peut encore éviter l'appel, sinon un unique appel
+        renvoie à la fois la langue source et la traduction (pas de détection googletrans).
+        Si la langue est connue localement et que l'appelant le permet, la traduction est streamée.
+        En cas d'échec de Gemini, le message part vers les moteurs de secours.
+        """
+        normalized = cache_key[0]
+        verdict = self.verdicts.get(normalized)
+        if verdict is None and self.local_detector is not None:
+            local_lang, confidence = self.local_detector.detect(message)
+            if local_lang and confidence >= self.local_detection_threshold:
+                verdict = self._store_verdict(normalized, local_lang, confidence)
+
+        lang_code = None
+        if verdict is not None:
+            lang_code, _, skip = verdict
+            if skip:
+                return message, False, None, False, GEMINI_ENGINE
+            if self._can_stream(on_partial):
+                return self._finalize(message, cache_key, *self._translate_streaming_or_failover(message, on_partial), lang_code)
 
-        if (self.exclude_english and lang_code == "en") or lang_code == self.target_language.lower():
-            return message, False, None, False
+        METRICS.mark("queued_engine")
+        outcome = self._detect_and_translate_gemini(message)
+        if isinstance(outcome, str):
+            if self.router.candidates(exclude=(GEMINI_ENGINE,)):
+                logger.warning("Gemini failed, failing over: %s", outcome)
+                return self._finalize(message, cache_key, *self._translate_with_engine(message, exclude=(GEMINI_ENGINE,)), lang_code)
+            return self._finalize(message, cache_key, outcome, GEMINI_ENGINE, lang_code)
 
-        elapsed = time.time() - self.last_translation_time
-        if elapsed < 2.0:
-            time.sleep(2.0 - elapsed)
+        detected_lang, already_in_target, translated_text = outcome
+        lang_code = lang_code or detected_lang
+        if already_in_target or (lang_code and self._should_skip(lang_code)):
+            # Verdict retenu pour que les prochaines copies de ce message ne refassent pas l'appel
+            self.verdicts.put(normalized, (lang_code, 1.0, True))
+            return message, False, None, False, GEMINI_ENGINE
+        return self._finalize(message, cache_key, translated_text, GEMINI_ENGINE, lang_code)
 
-        translated_text = self._translate_with_engine(message)
-        self.last_translation_time = time.time()
-        original_lang_name = LANG_CODES_TO_NAMES.get(lang_code, lang_code)
+    def _finalize(self, message: str, cache_key: Tuple[str, str, str], translated_text: str, source: str,
+                  lang_code: Optional[str]) -> Tuple[str, bool, Optional[str], bool, str]:
+        """Met en forme le résultat d'un appel moteur et l'enregistre dans le cache s'il a réussi."""
+        METRICS.mark("translated")
+        original_lang_name = LANG_CODES_TO_NAMES.get(lang_code, lang_code) if lang_code else None
 
         if translated_text.startswith("[ERROR]"):
-            print(f"Translation Error: {translated_text}")
+            logger.warning("Translation Error: %s", translated_text)
             # Erreur, on ne met pas en cache
-            return translated_text, False, original_lang_name, False
+            return translated_text, False, original_lang_name, False, source
 
-        result_tuple = (translated_text, True, original_lang_name)
-        self.translation_cache[cache_key] = result_tuple
-        print(f"[CACHE] Nouvelle traduction enregistrée pour '{message}'.")
+        self._store_translation(cache_key, source, (translated_text, True, original_lang_name))
 
-        return translated_text, True, original_lang_name, False
+        return translated_text, True, original_lang_name, False, source
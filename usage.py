@@ -0,0 +1,214 @@
+# usage.py
+
+import calendar
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from engines import DEEPL_ENGINE, GEMINI_ENGINE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "engine_usage.json")
+# Quotas mensuels connus (en caractères), surchargeables via "usage_limits" dans la config
+DEFAULT_USAGE_LIMITS = {DEEPL_ENGINE: 500_000}
+# Quotas mensuels connus en requêtes, pour les moteurs facturés à la requête, surchargeables via
+# "usage_request_limits" (Gemini : ~1000 requêtes par jour sur l'offre gratuite)
+DEFAULT_REQUEST_LIMITS = {GEMINI_ENGINE: 30_000}
+# Part du quota gardée en réserve : en dessous, les messages de faible valeur partent vers un moteur gratuit
+DEFAULT_RESERVE_RATIO = 0.1
+# En dessous de cette part du quota, plus aucun message n'est envoyé au moteur limité
+HARD_RESERVE_RATIO = 0.01
+# Messages considérés de faible valeur (courts) quand le quota se raréfie
+DEFAULT_LOW_VALUE_CHARS = 20
+# Nombre d'enregistrements entre deux sauvegardes sur disque
+SAVE_EVERY = 50
+
+
+def _current_period() -> str:
+    """Période de comptage en cours (mois calendaire, ex: "2026-10")."""
+    return datetime.now().strftime("%Y-%m")
+
+
+def _period_bounds(period: str) -> tuple:
+    """Retourne les timestamps de début et de fin d'une période mensuelle."""
+    year, month = (int(part) for part in period.split("-"))
+    start = datetime(year, month, 1).timestamp()
+    end = start + calendar.monthrange(year, month)[1] * 86400
+    return start, end
+
+
+class UsageTracker:
+    """
+    Compteur de consommation (caractères et requêtes) par moteur, persistant d'une session à l'autre.
+
+    Les compteurs sont remis à zéro à chaque mois. Quand le service expose sa consommation
+    (DeepL), la valeur distante sert de base et seuls les caractères envoyés depuis sont ajoutés.
+    Les moteurs facturés à la requête (Gemini) ont un quota en requêtes plutôt qu'en caractères.
+    À partir du rythme de consommation, le tracker projette la date d'épuisement du quota et
+    indique quand détourner le trafic de faible valeur vers un moteur gratuit.
+    """
+
+    def __init__(self, path: str = DEFAULT_USAGE_PATH, limits: Optional[Dict[str, int]] = None,
+                 reserve_ratio: float = DEFAULT_RESERVE_RATIO, low_value_chars: int = DEFAULT_LOW_VALUE_CHARS,
+                 request_limits: Optional[Dict[str, int]] = None) -> None:
+        """
+        Args:
+            path (str): Fichier JSON de persistance (None pour ne rien écrire).
+            limits (Optional[Dict[str, int]]): Quota mensuel en caractères par moteur.
+            reserve_ratio (float): Part du quota à partir de laquelle les messages courts sont détournés.
+            low_value_chars (int): Longueur en dessous de laquelle un message est de faible valeur.
+            request_limits (Optional[Dict[str, int]]): Quota mensuel en requêtes, pour les moteurs qui n'ont
+                pas de quota en caractères (une valeur nulle désactive le quota par défaut).
+        """
+        self.path = path
+        self.limits = {**DEFAULT_USAGE_LIMITS, **(limits or {})}
+        self.request_limits = {
+            name: limit for name, limit in {**DEFAULT_REQUEST_LIMITS, **(request_limits or {})}.items()
+            if limit and name not in self.limits
+        }
+        self.reserve_ratio = reserve_ratio
+        self.low_value_chars = low_value_chars
+        self.diverted = 0
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._data = {"period": _current_period(), "engines": {}, "remote": {}}
+        self._load()
+
+    def _load(self) -> None:
+        """Charge les compteurs sauvegardés s'ils concernent la période en cours."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Usage file %s could not be read: %s", self.path, e)
+            return
+        if data.get("period") == self._data["period"]:
+            self._data = data
+
+    def _roll_period(self) -> None:
+        """Remet les compteurs à zéro au changement de mois (appelé sous verrou)."""
+        period = _current_period()
+        if self._data["period"] != period:
+            self._data = {"period": period, "engines": {}, "remote": {}}
+
+    def record(self, engine_name: str, chars: int, requests: int = 1) -> None:
+        """Comptabilise des caractères envoyés à un moteur."""
+        with self._lock:
+            self._roll_period()
+            counters = self._data["engines"].setdefault(engine_name, {"chars": 0, "requests": 0})
+            counters["chars"] += chars
+            counters["requests"] += requests
+            self._unsaved += 1
+            should_save = self._unsaved >= SAVE_EVERY
+        if should_save:
+            self.save()
+
+    def sync_remote(self, engine_name: str, used: int, limit: Optional[int]) -> None:
+        """Enregistre la consommation annoncée par le service (elle fait foi sur le comptage local)."""
+        with self._lock:
+            self._roll_period()
+            local = self._data["engines"].get(engine_name, {}).get("chars", 0)
+            self._data["remote"][engine_name] = {"used": used, "local_at_sync": local, "synced_at": time.time()}
+            if limit:
+                self.limits[engine_name] = limit
+        logger.info("%s usage: %d / %s characters", engine_name, used, limit)
+
+    def used(self, engine_name: str) -> int:
+        """Caractères consommés sur la période (base distante + envois depuis la synchronisation)."""
+        with self._lock:
+            local = self._data["engines"].get(engine_name, {}).get("chars", 0)
+            remote = self._data["remote"].get(engine_name)
+        if remote is None:
+            return local
+        return remote["used"] + local - remote["local_at_sync"]
+
+    def used_requests(self, engine_name: str) -> int:
+        """Requêtes envoyées au moteur sur la période."""
+        with self._lock:
+            return self._data["engines"].get(engine_name, {}).get("requests", 0)
+
+    def _quota(self, engine_name: str) -> Tuple[Optional[int], int]:
+        """Retourne (quota, consommation) dans l'unité du quota du moteur (caractères ou requêtes)."""
+        if engine_name in self.request_limits:
+            return self.request_limits[engine_name], self.used_requests(engine_name)
+        return self.limits.get(engine_name), self.used(engine_name)
+
+    def remaining(self, engine_name: str) -> Optional[int]:
+        """Caractères (ou requêtes) restants sur le quota, ou None si le moteur n'a pas de quota connu."""
+        limit, used = self._quota(engine_name)
+        return None if limit is None else max(0, limit - used)
+
+    def projected_exhaustion(self, engine_name: str) -> Optional[float]:
+        """Date (timestamp) à laquelle le quota sera épuisé au rythme actuel, ou None si pas de quota ou d'usage."""
+        remaining = self.remaining(engine_name)
+        _, used = self._quota(engine_name)
+        if remaining is None or used <= 0:
+            return None
+        start, _ = _period_bounds(self._data["period"])
+        # Au moins une heure d'historique pour ne pas extrapoler à partir des premières secondes
+        rate = used / max(3600.0, time.time() - start)
+        return time.time() + remaining / rate
+
+    def should_divert(self, engine_name: str, text: str) -> bool:
+        """
+        Indique si un message doit être détourné du moteur pour préserver son quota.
+
+        Sous la réserve dure, tout est détourné ; sous la réserve normale, ou si le quota sera
+        épuisé avant la fin du mois au rythme actuel, seuls les messages de faible valeur le sont.
+        Le détournement n'est comptabilisé que par `record_diversion`, quand l'appelant l'applique.
+        """
+        limit, _ = self._quota(engine_name)
+        remaining = self.remaining(engine_name)
+        if not limit or remaining is None:
+            return False
+        cost = 1 if engine_name in self.request_limits else len(text)
+        if remaining <= limit * HARD_RESERVE_RATIO or remaining < cost:
+            divert = True
+        elif len(text) < self.low_value_chars:
+            exhaustion = self.projected_exhaustion(engine_name)
+            divert = remaining < limit * self.reserve_ratio or (
+                exhaustion is not None and exhaustion < _period_bounds(self._data["period"])[1]
+            )
+        else:
+            divert = False
+        return divert
+
+    def record_diversion(self) -> None:
+        """Comptabilise un message effectivement détourné (un autre moteur était disponible)."""
+        with self._lock:
+            self.diverted += 1
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """Retourne, par moteur, la consommation du mois, le quota restant et la date d'épuisement projetée."""
+        with self._lock:
+            engines = {name: dict(counters) for name, counters in self._data["engines"].items()}
+        for name in set(engines) | set(self.limits) | set(self.request_limits):
+            counters = engines.setdefault(name, {"chars": 0, "requests": 0})
+            counters["unit"] = "requests" if name in self.request_limits else "chars"
+            counters["used"] = self._quota(name)[1]
+            counters["remaining"] = self.remaining(name)
+            exhaustion = self.projected_exhaustion(name)
+            counters["exhaustion"] = datetime.fromtimestamp(exhaustion).isoformat(timespec="minutes") if exhaustion else None
+        return engines
+
+    def save(self) -> None:
+        """Écrit les compteurs sur disque (écriture atomique)."""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._data, indent=2)
+            self._unsaved = 0
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("Usage file %s could not be written: %s", self.path, e)